@@ -0,0 +1,79 @@
+# benchmarks/bench_merge.py
+"""
+Compara a união de PDFs com PyPDF2.PdfMerger (caminho antigo) e com o
+motor PyMuPDF (core/pdf_merge_engine.py).
+
+Uso:
+    python benchmarks/bench_merge.py arquivo1.pdf arquivo2.pdf [...] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.pdf_merge_engine import merge_pdf_bytes
+
+
+def merge_pypdf2(sources):
+    """Caminho antigo da página Unir PDFs (sem o time.sleep de visualização)"""
+    import PyPDF2
+
+    merger = PyPDF2.PdfMerger()
+    for name, data in sources:
+        reader = PyPDF2.PdfReader(BytesIO(data))
+        merger.append(reader, outline_item=name.replace('.pdf', ''))
+
+    first_reader = PyPDF2.PdfReader(BytesIO(sources[0][1]))
+    if first_reader.metadata:
+        merger.add_metadata(first_reader.metadata)
+
+    output = BytesIO()
+    merger.write(output)
+    merger.close()
+    return output.getvalue()
+
+
+def merge_pymupdf(sources):
+    return merge_pdf_bytes(sources).data
+
+
+def _measure(func, sources, repeat):
+    best = None
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        data = func(sources)
+        elapsed = time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(data), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da união de PDFs")
+    parser.add_argument("files", nargs="+", help="PDFs de entrada (na ordem da união)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições (vale o melhor tempo)")
+    args = parser.parse_args()
+
+    sources = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            sources.append((os.path.basename(path), f.read()))
+
+    total_mb = sum(len(data) for _, data in sources) / (1024 * 1024)
+    print(f"📄 {len(sources)} arquivos, {total_mb:.2f} MB\n")
+
+    for name, func in [("PyPDF2", merge_pypdf2), ("PyMuPDF", merge_pymupdf)]:
+        elapsed, size, peak = _measure(func, sources, args.repeat)
+        print(f"  {name:<8} {elapsed:8.2f}s  {size / (1024 * 1024):8.2f} MB  pico Python {peak / (1024 * 1024):8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_optimizer.py
+"""
+Compara tempo e tamanho dos motores de otimização (Ghostscript x em processo).
+
+Uso:
+    python benchmarks/bench_optimizer.py arquivo1.pdf [arquivo2.pdf ...] [--setting /screen]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.pdf_optimizer_engine import (
+    optimize_inprocess, optimize_with_ghostscript, is_text_heavy, ghostscript_executable,
+    OPTIMIZER_ENGINE_GHOSTSCRIPT, OPTIMIZER_ENGINE_INPROCESS, PRESET_EBOOK
+)
+
+
+def _measure(func, *args):
+    start = time.perf_counter()
+    data = func(*args)
+    return time.perf_counter() - start, len(data)
+
+
+def bench_file(path: str, setting: str, has_gs: bool):
+    with open(path, "rb") as f:
+        pdf_data = f.read()
+
+    original_mb = len(pdf_data) / (1024 * 1024)
+    print(f"\n📄 {os.path.basename(path)} ({original_mb:.2f} MB, texto: {'sim' if is_text_heavy(pdf_data) else 'não'})")
+
+    engines = [(OPTIMIZER_ENGINE_INPROCESS, optimize_inprocess)]
+    if has_gs:
+        engines.append((OPTIMIZER_ENGINE_GHOSTSCRIPT, optimize_with_ghostscript))
+
+    for name, func in engines:
+        try:
+            elapsed, size = _measure(func, pdf_data, setting)
+        except Exception as e:
+            print(f"  {name:<12} erro: {e}")
+            continue
+        reduction = (len(pdf_data) - size) / len(pdf_data) * 100
+        print(f"  {name:<12} {elapsed:8.2f}s  {size / (1024 * 1024):8.2f} MB  {reduction:6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de otimização")
+    parser.add_argument("files", nargs="+", help="PDFs de entrada")
+    parser.add_argument("--setting", default=PRESET_EBOOK, help="/ebook ou /screen")
+    args = parser.parse_args()
+
+    has_gs = shutil.which(ghostscript_executable()) is not None
+    if not has_gs:
+        print("[WARNING] Ghostscript não encontrado; medindo apenas o motor em processo")
+
+    for path in args.files:
+        bench_file(path, args.setting, has_gs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_text_export.py
+"""
+Compara a exportação de texto com pdfplumber (caminho antigo, página a
+página) e com o motor PyMuPDF (core/pdf_text_export.py).
+
+Uso:
+    python benchmarks/bench_text_export.py processo.pdf [--repeat 3] [--no-layout]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.pdf_text_export import export_text
+
+
+def export_pdfplumber(pdf_data, output_path, preserve_layout):
+    """Caminho antigo do conversor: texto inteiro montado em memória"""
+    import pdfplumber
+
+    text_content = []
+    with pdfplumber.open(BytesIO(pdf_data)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text_content.append(page_text if preserve_layout else ' '.join(page_text.split()))
+            text_content.append("\n")
+
+    with open(output_path, "wb") as f:
+        f.write('\n'.join(text_content).encode('utf-8'))
+
+
+def export_pymupdf(pdf_data, output_path, preserve_layout):
+    export_text(pdf_data, output_path, preserve_layout)
+
+
+def _measure(func, pdf_data, preserve_layout, repeat):
+    best = None
+    peak = 0
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_path = os.path.join(work_dir, "output.txt")
+        for _ in range(repeat):
+            tracemalloc.start()
+            start = time.perf_counter()
+            func(pdf_data, output_path, preserve_layout)
+            elapsed = time.perf_counter() - start
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            best = elapsed if best is None else min(best, elapsed)
+        size = os.path.getsize(output_path)
+    return best, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da exportação para texto")
+    parser.add_argument("file", help="PDF de entrada")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições (vale o melhor tempo)")
+    parser.add_argument("--no-layout", action="store_true", help="Texto corrido (sem quebras de linha)")
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as f:
+        pdf_data = f.read()
+
+    preserve_layout = not args.no_layout
+    print(f"📄 {os.path.basename(args.file)}, {len(pdf_data) / (1024 * 1024):.2f} MB\n")
+
+    for name, func in [("pdfplumber", export_pdfplumber), ("PyMuPDF", export_pymupdf)]:
+        elapsed, size, peak = _measure(func, pdf_data, preserve_layout, args.repeat)
+        print(f"  {name:<10} {elapsed:8.2f}s  {size / 1024:10.1f} KB  pico Python {peak / (1024 * 1024):8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
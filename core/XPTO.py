@@ -19,6 +19,8 @@ class XPTO:
         block_extractor.extract_blocks(progress_callback=progress_callback)
         self.block_dict = block_extractor.blocks_per_page
 
+        self._complete_scanned_pages(progress_callback)
+
         print("[XPTO] Executando PageRangeExtractor...")
         range_extractor = PageRangeExtractor(self.index_dict, self.block_dict)
         sections = range_extractor.atualizar_paginas()
@@ -26,3 +28,32 @@ class XPTO:
         print("[XPTO] Pipeline finalizado com sucesso ✅")
 
         return sections
+
+    def _complete_scanned_pages(self, progress_callback=None):
+        """
+        Processo digitalizado (total ou parcialmente): lê por OCR apenas o
+        Sumário e a faixa do carimbo de ID das páginas sem texto.
+        """
+        from core.scanned_processo_extractor import ScannedProcessoExtractor
+        scanned = ScannedProcessoExtractor(self.pdf_path)
+
+        pages_with_text = {entry["pagina"] - 1 for entry in self.block_dict}
+        missing_pages = [pno for pno in scanned.scanned_pages() if pno not in pages_with_text]
+        if not missing_pages:
+            return
+
+        if not scanned.available:
+            print(f"[XPTO] {len(missing_pages)} páginas digitalizadas sem texto, "
+                  "mas o Tesseract não está disponível para OCR")
+            return
+
+        print(f"[XPTO] {len(missing_pages)} páginas digitalizadas - OCR do Sumário e das faixas de ID")
+
+        if not self.index_dict:
+            self.index_dict = scanned.extract_index()
+            print(f"[XPTO] Index extraído por OCR: {len(self.index_dict)} entradas")
+
+        self.block_dict = sorted(
+            self.block_dict + scanned.extract_blocks(missing_pages, progress_callback),
+            key=lambda entry: entry["pagina"]
+        )
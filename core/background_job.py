@@ -0,0 +1,205 @@
+# core/background_job.py
+
+import time
+import uuid
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from core.job_scheduler import JobCancelledError
+
+# Estados de um job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_ERROR = "error"
+JOB_CANCELLED = "cancelled"
+
+
+class BackgroundJob:
+    """
+    Tarefa longa executada fora da thread do Streamlit.
+
+    A função alvo recebe o próprio job como primeiro argumento e usa
+    `update()` para reportar progresso e `cancel_event` para saber se deve
+    parar. A página apenas consulta o estado (`snapshot()`), então o script
+    do Streamlit não fica bloqueado durante o processamento.
+    """
+
+    def __init__(self, session_id: str, label: str, target: Callable, args: tuple = (), kwargs: dict = None):
+        self.job_id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.label = label
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs or {}
+
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self.status = JOB_QUEUED
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Chamado pela função alvo (qualquer thread)
+    # ------------------------------------------------------------------
+
+    def update(self, done: Optional[int] = None, total: Optional[int] = None,
+               message: Optional[str] = None, status: Optional[str] = None):
+        """Atualiza progresso e/ou mensagem do job"""
+        with self._lock:
+            if done is not None:
+                self.done = done
+            if total is not None:
+                self.total = total
+            if message is not None:
+                self.message = message
+            if status is not None:
+                self.status = status
+
+    def check_cancelled(self):
+        """Levanta JobCancelledError se o usuário cancelou o job"""
+        if self.cancel_event.is_set():
+            raise JobCancelledError("Job cancelado pelo usuário")
+
+    # ------------------------------------------------------------------
+    # Controle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.label}", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Pede o cancelamento; a função alvo encerra processos e limpa temporários"""
+        self.cancel_event.set()
+        self.update(message="Cancelando...")
+
+    def _run(self):
+        self.update(status=JOB_RUNNING)
+        try:
+            result = self.target(self, *self.args, **self.kwargs)
+            with self._lock:
+                self.result = result
+                self.status = JOB_DONE
+        except JobCancelledError:
+            self.update(status=JOB_CANCELLED, message="Cancelado pelo usuário")
+        except Exception as e:
+            print(f"[ERROR] Job {self.label} ({self.job_id}) falhou: {e}")
+            with self._lock:
+                self.error = e
+                self.status = JOB_ERROR
+        finally:
+            self.finished_at = time.time()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_ERROR, JOB_CANCELLED)
+
+    @property
+    def progress(self) -> float:
+        """Fração concluída (0.0 a 1.0)"""
+        with self._lock:
+            return min(self.done / self.total, 1.0) if self.total else 0.0
+
+    def snapshot(self) -> Dict:
+        """Estado atual do job para exibição"""
+        with self._lock:
+            return {
+                'job_id': self.job_id,
+                'label': self.label,
+                'status': self.status,
+                'done': self.done,
+                'total': self.total,
+                'message': self.message,
+                'elapsed': (self.finished_at or time.time()) - self.created_at
+            }
+
+
+class BackgroundJobManager:
+    """
+    Registro global dos jobs em segundo plano de todas as sessões.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self._jobs: Dict[str, BackgroundJob] = {}
+            self._jobs_lock = threading.Lock()
+            self.retention = 3600  # Jobs concluídos ficam disponíveis por 1 hora
+            self.initialized = True
+
+    def start(self, session_id: str, label: str, target: Callable, *args, **kwargs) -> BackgroundJob:
+        """
+        Cria e inicia um job.
+
+        Args:
+            session_id (str): Sessão dona do job
+            label (str): Nome do job (ex.: "ocr")
+            target (callable): Função `target(job, *args, **kwargs)`
+        """
+        self.cleanup()
+
+        job = BackgroundJob(session_id, label, target, args, kwargs)
+        with self._jobs_lock:
+            self._jobs[job.job_id] = job
+        job.start()
+        return job
+
+    def get(self, job_id: Optional[str]) -> Optional[BackgroundJob]:
+        if not job_id:
+            return None
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.is_finished:
+            return False
+        job.cancel()
+        return True
+
+    def discard(self, job_id: str):
+        """Remove um job concluído (libera o resultado da memória)"""
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.is_finished:
+                del self._jobs[job_id]
+
+    def jobs_for_session(self, session_id: str) -> List[BackgroundJob]:
+        with self._jobs_lock:
+            return [job for job in self._jobs.values() if job.session_id == session_id]
+
+    def cleanup(self):
+        """Remove jobs concluídos há mais tempo que `retention`"""
+        now = time.time()
+        with self._jobs_lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.is_finished and job.finished_at and now - job.finished_at > self.retention
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+# Instância global (singleton)
+background_job_manager = BackgroundJobManager()
+
+
+def get_background_job_manager() -> BackgroundJobManager:
+    """Obtém instância do gerenciador de jobs em segundo plano"""
+    return background_job_manager
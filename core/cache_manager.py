@@ -0,0 +1,258 @@
+# core/cache_manager.py
+
+import sys
+import time
+import hashlib
+import threading
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """
+    Estima o tamanho em bytes de um valor em cache (recursivo para containers).
+    """
+    if _seen is None:
+        _seen = set()
+
+    obj_id = id(value)
+    if obj_id in _seen:
+        return 0
+    _seen.add(obj_id)
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, (bytes, bytearray, str, memoryview)):
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k, _seen) + estimate_size(v, _seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += estimate_size(item, _seen)
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value), _seen)
+
+    return size
+
+
+def make_cache_key(*args, **kwargs) -> str:
+    """
+    Gera chave estável para argumentos de função.
+    Dados binários (PDFs) entram pelo hash do conteúdo, não pelo valor.
+    """
+    digest = hashlib.md5()
+
+    def _feed(value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            digest.update(b"b:")
+            digest.update(hashlib.md5(value).digest())
+        else:
+            digest.update(repr(value).encode("utf-8", "replace"))
+        digest.update(b"|")
+
+    for arg in args:
+        _feed(arg)
+    for name in sorted(kwargs):
+        _feed(name)
+        _feed(kwargs[name])
+
+    return digest.hexdigest()
+
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value, size, expires_at):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class CacheManager:
+    """
+    Cache em memória compartilhado por todas as sessões.
+
+    - Limite de memória (`cache_size`, MB) com remoção LRU
+    - Expiração por tempo (`cache_ttl`, segundos)
+    - Pode ser desligado com `enable_cache`
+    - Contadores de hits, misses, evictions e expirações por namespace
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+            self._rlock = threading.RLock()
+            self._size_bytes = 0
+            self._stats: Dict[str, Dict[str, int]] = {}
+            self.enabled = True
+            self.max_bytes = 100 * 1024 * 1024
+            self.ttl = 3600
+            self.reload_settings()
+            self.initialized = True
+
+    def reload_settings(self):
+        """
+        Relê `enable_cache`, `cache_size` e `cache_ttl` das configurações.
+        """
+        from core.settings_manager import SettingsManager
+        settings = SettingsManager()
+
+        with self._rlock:
+            self.enabled = bool(settings.get("enable_cache", True))
+            self.max_bytes = int(settings.get("cache_size", 100) or 0) * 1024 * 1024
+            self.ttl = int(settings.get("cache_ttl", 3600) or 0)
+
+            if not self.enabled or self.max_bytes <= 0:
+                self.clear()
+            else:
+                self._evict_to_fit(0)
+
+    # ------------------------------------------------------------------
+    # Operações básicas
+    # ------------------------------------------------------------------
+
+    def _count(self, namespace: str, counter: str, amount: int = 1):
+        stats = self._stats.setdefault(namespace, {
+            "hits": 0, "misses": 0, "evictions": 0, "expirations": 0
+        })
+        stats[counter] += amount
+
+    def _drop(self, full_key):
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._size_bytes -= entry.size
+
+    def _evict_to_fit(self, incoming: int):
+        """Remove entradas menos usadas até caber `incoming` bytes (deve ser chamado com o lock)"""
+        while self._entries and self._size_bytes + incoming > self.max_bytes:
+            full_key, _ = next(iter(self._entries.items()))
+            self._drop(full_key)
+            self._count(full_key[0], "evictions")
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        """
+        Busca um valor no cache.
+
+        Returns:
+            tuple: (encontrado, valor)
+        """
+        full_key = (namespace, key)
+        with self._rlock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                self._count(namespace, "misses")
+                return False, None
+
+            if entry.expires_at is not None and entry.expires_at <= time.time():
+                self._drop(full_key)
+                self._count(namespace, "expirations")
+                self._count(namespace, "misses")
+                return False, None
+
+            self._entries.move_to_end(full_key)
+            self._count(namespace, "hits")
+            return True, entry.value
+
+    def set(self, namespace: str, key: str, value: Any, size: Optional[int] = None):
+        """
+        Armazena um valor no cache, removendo entradas antigas se necessário.
+        Valores maiores que o orçamento total não são armazenados.
+        """
+        if not self.enabled or self.max_bytes <= 0:
+            return
+
+        if size is None:
+            size = estimate_size(value)
+
+        full_key = (namespace, key)
+        with self._rlock:
+            self._drop(full_key)
+            if size > self.max_bytes:
+                return
+
+            self._evict_to_fit(size)
+            expires_at = time.time() + self.ttl if self.ttl > 0 else None
+            self._entries[full_key] = _CacheEntry(value, size, expires_at)
+            self._size_bytes += size
+
+    def clear(self, namespace: Optional[str] = None):
+        """Remove todas as entradas (ou apenas as de um namespace)"""
+        with self._rlock:
+            if namespace is None:
+                self._entries.clear()
+                self._size_bytes = 0
+                return
+            for full_key in [k for k in self._entries if k[0] == namespace]:
+                self._drop(full_key)
+
+    def memoize(self, namespace: str) -> Callable:
+        """
+        Decorador que guarda o resultado da função no cache.
+
+        Usage:
+            @get_cache_manager().memoize("slicer_preview")
+            def analisar(pdf_data): ...
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+
+                key = make_cache_key(*args, **kwargs)
+                found, value = self.get(namespace, key)
+                if found:
+                    return value
+
+                value = func(*args, **kwargs)
+                self.set(namespace, key, value)
+                return value
+
+            wrapper.cache_namespace = namespace
+            return wrapper
+        return decorator
+
+    # ------------------------------------------------------------------
+    # Estatísticas
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        """Estatísticas globais e por namespace"""
+        with self._rlock:
+            totals = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+            for stats in self._stats.values():
+                for counter, amount in stats.items():
+                    totals[counter] += amount
+
+            lookups = totals["hits"] + totals["misses"]
+            return {
+                **totals,
+                'hit_rate': totals["hits"] / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'size_mb': self._size_bytes / (1024 * 1024),
+                'max_size_mb': self.max_bytes / (1024 * 1024),
+                'ttl': self.ttl,
+                'enabled': self.enabled,
+                'namespaces': {ns: dict(stats) for ns, stats in self._stats.items()}
+            }
+
+
+# Instância global (singleton)
+cache_manager = CacheManager()
+
+
+def get_cache_manager() -> CacheManager:
+    """Obtém instância do cache global"""
+    return cache_manager
@@ -0,0 +1,300 @@
+# core/job_scheduler.py
+
+import os
+import time
+import shutil
+import itertools
+import threading
+import subprocess
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+
+class JobTicket:
+    """
+    Pedido de execução de um job pesado (OCRmyPDF, Ghostscript...).
+
+    Enquanto está na fila o ticket não ocupa slots; ao ser liberado pelo
+    escalonador passa a ocupar `slots` slots de CPU até ser devolvido.
+    """
+
+    def __init__(self, ticket_id: int, session_id: str, slots: int, label: str = ""):
+        self.ticket_id = ticket_id
+        self.session_id = session_id
+        self.slots = slots
+        self.label = label
+        self.granted = False
+        self.enqueued_at = time.time()
+        self.started_at = None
+
+
+class JobScheduler:
+    """
+    Escalonador global (por processo) para ferramentas externas pesadas.
+
+    - Limita o total de slots de CPU em uso ao valor de `max_threads` das configurações
+    - Distribui a fila entre sessões em round-robin, para que um usuário com
+      vários jobs não bloqueie os demais
+    - Aplica prioridade (nice) e limite de memória aos processos filhos
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self._cond = threading.Condition()
+            self._queues: "OrderedDict[str, deque]" = OrderedDict()
+            self._running: Dict[int, JobTicket] = {}
+            self._slots_in_use = 0
+            self._ids = itertools.count(1)
+            self.capacity = 4
+            self.nice_level = 10
+            self.memory_limit_mb = 0
+            self.reload_settings()
+            self.initialized = True
+
+    def reload_settings(self):
+        """
+        Relê `max_threads`, `job_nice_level` e `job_memory_limit` das configurações.
+        """
+        from core.settings_manager import SettingsManager
+        settings = SettingsManager()
+
+        with self._cond:
+            self.capacity = max(1, int(settings.get("max_threads", 4) or 1))
+            self.nice_level = int(settings.get("job_nice_level", 10) or 0)
+            self.memory_limit_mb = int(settings.get("job_memory_limit", 0) or 0)
+            # Tickets na fila pediram slots pela capacidade antiga: com menos
+            # slots o primeiro da fila nunca caberia
+            for queue in self._queues.values():
+                for ticket in queue:
+                    ticket.slots = min(ticket.slots, self.capacity)
+            self._dispatch()
+
+    # ------------------------------------------------------------------
+    # Fila
+    # ------------------------------------------------------------------
+
+    def _ordered_waiting(self) -> List[JobTicket]:
+        """Tickets em espera na ordem em que serão atendidos (round-robin entre sessões)"""
+        queues = [list(q) for q in self._queues.values()]
+        ordered = []
+        depth = max((len(q) for q in queues), default=0)
+        for level in range(depth):
+            for q in queues:
+                if level < len(q):
+                    ordered.append(q[level])
+        return ordered
+
+    def _dispatch(self):
+        """Libera tickets enquanto houver slots livres (deve ser chamado com o lock)"""
+        while self._queues:
+            session_id, queue = next(iter(self._queues.items()))
+            ticket = queue[0]
+
+            # Sem backfill: o primeiro da fila espera até caber, evitando starvation
+            if ticket.slots > self.capacity - self._slots_in_use:
+                break
+
+            queue.popleft()
+            del self._queues[session_id]
+            if queue:
+                # Sessão vai para o fim da rodada
+                self._queues[session_id] = queue
+
+            ticket.granted = True
+            ticket.started_at = time.time()
+            self._running[ticket.ticket_id] = ticket
+            self._slots_in_use += ticket.slots
+
+        self._cond.notify_all()
+
+    def _remove_waiting(self, ticket: JobTicket):
+        queue = self._queues.get(ticket.session_id)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.session_id]
+
+    def queue_position(self, ticket: JobTicket) -> int:
+        """
+        Posição do ticket na fila (1 = próximo a executar, 0 = já em execução).
+        """
+        with self._cond:
+            if ticket.granted:
+                return 0
+            ordered = self._ordered_waiting()
+            return ordered.index(ticket) + 1 if ticket in ordered else 0
+
+    def release(self, ticket: JobTicket):
+        """Devolve os slots de um ticket (ou o retira da fila se ainda não executou)"""
+        with self._cond:
+            if ticket.granted:
+                if self._running.pop(ticket.ticket_id, None) is not None:
+                    self._slots_in_use -= ticket.slots
+            else:
+                self._remove_waiting(ticket)
+            self._dispatch()
+
+    @contextmanager
+    def acquire(self, session_id: str, slots: int = 1, label: str = "",
+                on_wait: Optional[Callable[[int, int], None]] = None,
+                cancel_event: Optional[threading.Event] = None,
+                poll_interval: float = 0.5):
+        """
+        Aguarda slots de CPU livres e os mantém ocupados dentro do bloco `with`.
+
+        Args:
+            session_id (str): Sessão que fez o pedido (usada no round-robin)
+            slots (int): Slots desejados; limitado à capacidade total
+            label (str): Descrição do job (para estatísticas)
+            on_wait (callable): Chamado com (posição, total_na_fila) enquanto aguarda
+            cancel_event (threading.Event): Se sinalizado, desiste da fila
+            poll_interval (float): Intervalo entre atualizações de posição
+
+        Yields:
+            JobTicket: Ticket liberado; `ticket.slots` é o número efetivo de slots
+        """
+        with self._cond:
+            slots = max(1, min(int(slots or 1), self.capacity))
+            ticket = JobTicket(next(self._ids), session_id or "anon", slots, label)
+            self._queues.setdefault(ticket.session_id, deque()).append(ticket)
+            self._dispatch()
+
+        try:
+            last_position = None
+            while True:
+                with self._cond:
+                    if ticket.granted:
+                        break
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise JobCancelledError("Job cancelado enquanto aguardava na fila")
+                    ordered = self._ordered_waiting()
+                    position = ordered.index(ticket) + 1
+                    waiting = len(ordered)
+
+                if on_wait and position != last_position:
+                    on_wait(position, waiting)
+                    last_position = position
+
+                with self._cond:
+                    if not ticket.granted:
+                        self._cond.wait(timeout=poll_interval)
+
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def get_stats(self) -> Dict:
+        """Estatísticas da fila global"""
+        with self._cond:
+            return {
+                'capacity': self.capacity,
+                'slots_in_use': self._slots_in_use,
+                'running_jobs': len(self._running),
+                'waiting_jobs': sum(len(q) for q in self._queues.values()),
+                'waiting_sessions': len(self._queues)
+            }
+
+    # ------------------------------------------------------------------
+    # Processos filhos
+    # ------------------------------------------------------------------
+
+    def popen_kwargs(self) -> Dict:
+        """
+        Argumentos extras para subprocess.run/Popen (Windows: prioridade
+        reduzida e sem janela de console).
+        """
+        if os.name == 'nt':
+            si = subprocess.STARTUPINFO()
+            si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            return {
+                'startupinfo': si,
+                'creationflags': subprocess.BELOW_NORMAL_PRIORITY_CLASS
+            }
+        return {}
+
+    def limited_command(self, command: list) -> list:
+        """
+        Prefixa o comando com `nice` e `prlimit` para aplicar prioridade e
+        limite de memória ao processo filho (e aos que ele iniciar).
+
+        Não usa `preexec_fn`, que não é seguro com threads (Streamlit).
+        """
+        if os.name == 'nt':
+            return list(command)
+
+        prefix = []
+        if self.nice_level > 0 and shutil.which("nice"):
+            prefix += ["nice", "-n", str(self.nice_level)]
+        if self.memory_limit_mb > 0:
+            if shutil.which("prlimit"):
+                prefix += ["prlimit", f"--as={self.memory_limit_mb * 1024 * 1024}", "--"]
+            else:
+                print("[WARNING] prlimit não encontrado: limite de memória dos jobs ignorado")
+        return prefix + list(command)
+
+    def run(self, command: list, **kwargs) -> subprocess.CompletedProcess:
+        """
+        Executa um comando externo com os limites do escalonador.
+
+        O chamador deve estar dentro de `acquire()`.
+        """
+        return subprocess.run(self.limited_command(command), **self.popen_kwargs(), **kwargs)
+
+    def popen(self, command: list, **kwargs) -> subprocess.Popen:
+        """
+        Inicia um comando externo com os limites do escalonador, em um grupo
+        de processos próprio para que `terminate()` alcance também os filhos
+        (ex.: Tesseract iniciado pelo OCRmyPDF).
+
+        O chamador deve estar dentro de `acquire()`.
+        """
+        group_kwargs = {} if os.name == 'nt' else {'start_new_session': True}
+        return subprocess.Popen(self.limited_command(command), **self.popen_kwargs(), **group_kwargs, **kwargs)
+
+    @staticmethod
+    def terminate(process: subprocess.Popen, grace_period: float = 5.0):
+        """Encerra o processo e seus filhos (SIGTERM, depois SIGKILL)"""
+        if process.poll() is not None:
+            return
+
+        if os.name == 'nt':
+            # /T encerra a árvore de processos inteira
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+        else:
+            import signal
+            try:
+                os.killpg(process.pid, signal.SIGTERM)
+                process.wait(timeout=grace_period)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        try:
+            process.wait(timeout=grace_period)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+class JobCancelledError(Exception):
+    """Levantada quando um job é cancelado antes ou durante a execução"""
+
+
+# Instância global (singleton)
+job_scheduler = JobScheduler()
+
+
+def get_job_scheduler() -> JobScheduler:
+    """Obtém instância do escalonador global de jobs"""
+    return job_scheduler
@@ -0,0 +1,247 @@
+# core/ocr_cache.py
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from core.job_scheduler import JobCancelledError
+
+
+class OCRCache:
+    """
+    Cache em disco dos PDFs gerados pelo OCR, compartilhado por todas as sessões.
+
+    - Chave: hash SHA-256 do PDF de entrada + parâmetros que alteram a saída
+    - Limite de tamanho (`ocr_cache_size`, MB) com remoção LRU pelo horário de acesso
+    - Execuções simultâneas com a mesma chave são agrupadas: apenas a primeira
+      roda o OCR, as demais aguardam e reutilizam o resultado
+
+    Os próprios arquivos servem de índice, então remover o diretório (ou parte
+    dele) nunca deixa o cache inconsistente. O lock só protege o controle das
+    execuções em andamento; leitura e gravação dos arquivos ficam fora dele
+    (gravação em arquivo temporário + `os.replace`).
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.cache_dir = os.path.join(tempfile.gettempdir(), "pdf_slicer_ocr_cache")
+            self._state_lock = threading.Lock()
+            self._in_flight: Dict[str, threading.Event] = {}
+            self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+            self.enabled = True
+            self.max_bytes = 500 * 1024 * 1024
+            self.reload_settings()
+            self.initialized = True
+
+    def reload_settings(self):
+        """
+        Relê `enable_cache` e `ocr_cache_size` das configurações.
+        """
+        from core.settings_manager import SettingsManager
+        settings = SettingsManager()
+
+        self.enabled = bool(settings.get("enable_cache", True))
+        self.max_bytes = int(settings.get("ocr_cache_size", 500) or 0) * 1024 * 1024
+
+        if self.enabled and self.max_bytes > 0:
+            self._evict_to_fit(0)
+
+    # ------------------------------------------------------------------
+    # Chaves e arquivos
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(pdf_data: bytes, *params) -> str:
+        """
+        Chave do cache para um PDF e os parâmetros de OCR que alteram a saída.
+        """
+        digest = hashlib.sha256(pdf_data).hexdigest()
+        params_digest = hashlib.sha256(repr(params).encode("utf-8")).hexdigest()[:16]
+        return f"{digest}_{params_digest}"
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        return (os.path.join(self.cache_dir, f"{key}.pdf"),
+                os.path.join(self.cache_dir, f"{key}.json"))
+
+    def _load(self, key: str) -> Optional[Tuple[bytes, Dict]]:
+        pdf_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(pdf_path, "rb") as f:
+                data = f.read()
+        except (OSError, ValueError):
+            return None
+
+        # Atualiza horário de acesso (usado na remoção LRU)
+        now = time.time()
+        for path in (pdf_path, meta_path):
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return data, meta
+
+    def _store(self, key: str, data: bytes, meta: Dict):
+        if len(data) > self.max_bytes:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._evict_to_fit(len(data))
+
+        pdf_path, meta_path = self._paths(key)
+        # Escrita atômica: PDF primeiro, metadados por último (marcam a entrada como completa)
+        for path, content in ((pdf_path, data), (meta_path, json.dumps(meta).encode("utf-8"))):
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            except OSError:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+    def _entries(self):
+        """Entradas em disco como [(último_acesso, tamanho, chave)]"""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return entries
+
+        for name in names:
+            if not name.endswith(".pdf"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-4]))
+        return entries
+
+    def _remove(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict_to_fit(self, incoming: int):
+        """Remove as entradas acessadas há mais tempo até caber `incoming` bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total + incoming <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            with self._state_lock:
+                self._stats["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def get_or_compute(self, key: str, compute: Callable[[], Tuple[bytes, Dict]],
+                       cancel_event: Optional[threading.Event] = None) -> Tuple[bytes, Dict]:
+        """
+        Retorna (pdf, metadados) do cache ou executa `compute()` e guarda o resultado.
+
+        Se outra thread já estiver calculando a mesma chave, aguarda o resultado
+        dela em vez de rodar o OCR novamente. Se essa execução falhar, a próxima
+        thread em espera assume o cálculo. `cancel_event` interrompe a espera.
+        """
+        if not self.enabled or self.max_bytes <= 0:
+            return compute()
+
+        while True:
+            cached = self._load(key)
+            if cached is not None:
+                with self._state_lock:
+                    self._stats["hits"] += 1
+                return cached
+
+            with self._state_lock:
+                event = self._in_flight.get(key)
+                owner = event is None
+                if owner:
+                    event = threading.Event()
+                    self._in_flight[key] = event
+                else:
+                    self._stats["coalesced"] += 1
+
+            if owner:
+                # Outra execução pode ter gravado e saído entre a leitura e o lock
+                cached = self._load(key)
+                if cached is None:
+                    with self._state_lock:
+                        self._stats["misses"] += 1
+                    break
+                with self._state_lock:
+                    self._stats["hits"] += 1
+                    self._in_flight.pop(key, None)
+                event.set()
+                return cached
+
+            while not event.wait(timeout=0.5):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise JobCancelledError("OCR cancelado enquanto aguardava outra execução")
+
+        try:
+            data, meta = compute()
+            try:
+                self._store(key, data, meta)
+            except OSError as e:
+                print(f"[AVISO] Não foi possível gravar no cache de OCR: {e}")
+            return data, meta
+        finally:
+            with self._state_lock:
+                self._in_flight.pop(key, None)
+            event.set()
+
+    def clear(self) -> int:
+        """Remove todas as entradas; retorna quantas foram removidas"""
+        entries = self._entries()
+        for _, _, key in entries:
+            self._remove(key)
+        return len(entries)
+
+    def get_stats(self) -> Dict:
+        """Estatísticas do cache de OCR"""
+        entries = self._entries()
+        with self._state_lock:
+            return {
+                **self._stats,
+                'entries': len(entries),
+                'size_mb': sum(size for _, size, _ in entries) / (1024 * 1024),
+                'max_size_mb': self.max_bytes / (1024 * 1024),
+                'in_flight': len(self._in_flight),
+                'enabled': self.enabled,
+                'cache_dir': self.cache_dir
+            }
+
+
+# Instância global (singleton)
+ocr_cache = OCRCache()
+
+
+def get_ocr_cache() -> OCRCache:
+    """Obtém instância do cache de OCR"""
+    return ocr_cache
@@ -0,0 +1,463 @@
+# core/ocr_engine.py
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+from typing import Callable, List, Optional
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler, JobCancelledError
+from core.ocr_cache import get_ocr_cache
+from core.pdf_chunk_runner import join_chunks, run_chunks, split_pdf_chunks
+from core.ocr_inprocess import (
+    InProcessOCRUnavailable, inprocess_ocr_available, ocr_document_inprocess
+)
+from core.pdf_text_layer import TextLayerClassifier
+
+# Modos de OCR
+OCR_MODE_FULL = "full"            # Documento inteiro pelo OCRmyPDF
+OCR_MODE_SELECTIVE = "selective"  # Apenas páginas sem camada de texto
+
+# Motores de OCR
+OCR_ENGINE_OCRMYPDF = "ocrmypdf"  # Subprocesso OCRmyPDF (deskew, otimização, documentos grandes)
+OCR_ENGINE_INPROCESS = "inprocess"  # Tesseract via PyMuPDF, sem subprocesso nem temporários
+OCR_ENGINE_AUTO = "auto"  # Em processo para poucas páginas, OCRmyPDF para o resto
+
+# Acima disso o OCRmyPDF compensa (paralelismo por página, otimização)
+INPROCESS_MAX_PAGES = 10
+
+DEFAULT_JPEG_QUALITY = 85
+
+# Plugin que escreve o progresso do OCRmyPDF no stderr
+PROGRESS_PLUGIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_progress_plugin.py")
+PROGRESS_PREFIX = "JACK_PROGRESS"
+PROGRESS_STAGE_OCR = "OCR"
+
+# Documentos a partir deste tamanho são divididos em blocos paralelos por padrão
+DEFAULT_CHUNK_SIZE = 25
+CHUNKED_OCR_MIN_PAGES = 50
+
+
+class OCROptions:
+    """
+    Parâmetros de uma execução de OCR.
+    """
+
+    def __init__(self, language: str = "por", force_ocr: bool = True, optimize: bool = True,
+                 deskew: bool = False, jobs: int = 2, jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+                 mode: str = OCR_MODE_SELECTIVE, timeout: int = 1800, chunk_size: int = 0,
+                 engine: str = OCR_ENGINE_OCRMYPDF):
+        self.language = language
+        self.force_ocr = force_ocr
+        self.optimize = optimize
+        self.deskew = deskew
+        self.jobs = jobs
+        self.jpeg_quality = jpeg_quality
+        self.mode = mode
+        self.timeout = timeout
+        # Páginas por bloco no OCR paralelo (0 = uma única execução do OCRmyPDF)
+        self.chunk_size = chunk_size
+        self.engine = engine
+
+
+class OCRResult:
+    """
+    Resultado de uma execução de OCR.
+    """
+
+    def __init__(self, data: bytes, total_pages: int, ocr_pages: List[int], mode: str,
+                 engine: str = OCR_ENGINE_OCRMYPDF):
+        self.data = data
+        self.total_pages = total_pages
+        self.ocr_pages = ocr_pages  # 1-indexed
+        self.mode = mode
+        self.engine = engine
+
+    @property
+    def skipped_pages(self) -> int:
+        return self.total_pages - len(self.ocr_pages)
+
+
+def build_ocrmypdf_command(input_path: str, output_path: str, options: OCROptions,
+                           jobs: int, redo_text: bool = False) -> List[str]:
+    """
+    Monta a linha de comando do OCRmyPDF.
+
+    Args:
+        redo_text: Páginas que já têm algum texto (ex.: carimbo digital) devem
+            ser refeitas sem descartar o texto existente
+    """
+    command = [
+        "ocrmypdf",
+        "--language", options.language,
+        "--jobs", str(jobs),
+        "--jpeg-quality", str(options.jpeg_quality),
+        "--output-type", "pdf",
+        "--plugin", PROGRESS_PLUGIN_PATH
+    ]
+
+    if redo_text and not options.deskew:
+        # --redo-ocr preserva texto visível, mas é incompatível com --deskew
+        command.append("--redo-ocr")
+    elif options.force_ocr or redo_text:
+        command.append("--force-ocr")
+
+    if options.optimize:
+        command.extend(["--optimize", "1"])
+
+    if options.deskew:
+        command.append("--deskew")
+
+    command.extend([input_path, output_path])
+    return command
+
+
+def _parse_progress_line(line: str):
+    """Converte uma linha do plugin de progresso em (etapa, concluído, total)"""
+    parts = line.rstrip("\n").split("\t")
+    if len(parts) != 4 or parts[0] != PROGRESS_PREFIX:
+        return None
+    try:
+        return parts[1], float(parts[2]), float(parts[3])
+    except ValueError:
+        return None
+
+
+def run_ocrmypdf(input_path: str, output_path: str, options: OCROptions,
+                 session_id: Optional[str] = None,
+                 on_wait: Optional[Callable[[int, int], None]] = None,
+                 redo_text: bool = False,
+                 progress_callback: Optional[Callable[[int, int], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
+    """
+    Executa o OCRmyPDF dentro da fila global de processamento.
+
+    O stderr é lido linha a linha: o progresso da etapa de OCR (páginas
+    concluídas, total) é repassado a `progress_callback`, que pode ser chamado
+    de outra thread. Se `cancel_event` for sinalizado, o OCRmyPDF e seus
+    processos filhos são encerrados.
+
+    Raises:
+        subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError,
+        JobCancelledError
+    """
+    scheduler = get_job_scheduler()
+
+    with scheduler.acquire(session_id, slots=options.jobs, label="ocr",
+                           on_wait=on_wait, cancel_event=cancel_event) as ticket:
+        command = build_ocrmypdf_command(input_path, output_path, options, ticket.slots, redo_text)
+        process = scheduler.popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                  text=True, encoding="utf-8", errors="replace")
+
+        # Leitura do stderr em thread separada para não bloquear o controle de cancelamento
+        stderr_lines = []
+
+        def _read_stderr():
+            for line in process.stderr:
+                progress = _parse_progress_line(line)
+                if progress is None:
+                    stderr_lines.append(line)
+                elif progress_callback and progress[0] == PROGRESS_STAGE_OCR:
+                    progress_callback(int(progress[1]), int(progress[2]))
+
+        reader = threading.Thread(target=_read_stderr, daemon=True)
+        reader.start()
+
+        deadline = time.time() + options.timeout if options.timeout else None
+        try:
+            while process.poll() is None:
+                if cancel_event is not None and cancel_event.is_set():
+                    scheduler.terminate(process)
+                    raise JobCancelledError("OCR cancelado pelo usuário")
+                if deadline is not None and time.time() > deadline:
+                    scheduler.terminate(process)
+                    raise subprocess.TimeoutExpired(command, options.timeout, stderr="".join(stderr_lines))
+                time.sleep(0.2)
+        finally:
+            if process.poll() is None:
+                scheduler.terminate(process)
+            reader.join(timeout=5)
+
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, stderr="".join(stderr_lines))
+
+        return subprocess.CompletedProcess(command, process.returncode, stderr="".join(stderr_lines))
+
+
+def run_ocrmypdf_chunked(input_path: str, output_path: str, options: OCROptions,
+                         session_id: Optional[str] = None,
+                         on_wait: Optional[Callable[[int, int], None]] = None,
+                         redo_text: bool = False,
+                         progress_callback: Optional[Callable[[int, int], None]] = None,
+                         cancel_event: Optional[threading.Event] = None):
+    """
+    OCR em blocos de páginas executados em paralelo.
+
+    Cada bloco é um OCRmyPDF de 1 thread que ocupa um slot da fila global,
+    então o paralelismo efetivo acompanha a capacidade livre do servidor.
+    Os blocos são remontados em ordem, preservando rótulos de página,
+    metadados e marcadores do arquivo de entrada.
+
+    `progress_callback` recebe (páginas concluídas, total de páginas) somando
+    todos os blocos e pode ser chamado de qualquer thread.
+
+    Se um bloco falhar, os demais (em execução ou na fila) são cancelados
+    antes de o erro ser repassado.
+    """
+    source = fitz.open(input_path)
+    total_pages = source.page_count
+
+    work_dir = tempfile.mkdtemp(prefix="chunks_", dir=os.path.dirname(output_path))
+    try:
+        chunks = split_pdf_chunks(source, work_dir, options.chunk_size, "ocr")
+
+        chunk_options = OCROptions(
+            language=options.language, force_ocr=options.force_ocr, optimize=options.optimize,
+            deskew=options.deskew, jobs=1, jpeg_quality=options.jpeg_quality,
+            mode=options.mode, timeout=options.timeout
+        )
+
+        # Páginas concluídas de cada bloco, atualizadas pelas threads de trabalho
+        pages_done = {}
+        progress_lock = threading.Lock()
+
+        def _ocr_chunk(index, chunk_in, chunk_out, on_chunk_wait, chunk_cancel):
+            def _on_progress(done, total):
+                with progress_lock:
+                    pages_done[index] = done
+                    completed_pages = sum(pages_done.values())
+                if progress_callback:
+                    progress_callback(completed_pages, total_pages)
+
+            return run_ocrmypdf(chunk_in, chunk_out, chunk_options, session_id, on_chunk_wait,
+                                redo_text, _on_progress, chunk_cancel)
+
+        run_chunks(chunks, _ocr_chunk, on_wait, cancel_event=cancel_event)
+
+        result = join_chunks(source, chunks)
+        result.save(output_path, garbage=3, deflate=True)
+        result.close()
+
+    finally:
+        source.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _page_ranges(page_numbers: List[int]) -> List[tuple]:
+    """Agrupa páginas (0-indexed) em intervalos contíguos [(início, fim), ...]"""
+    ranges = []
+    for pno in sorted(page_numbers):
+        if ranges and pno == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], pno)
+        else:
+            ranges.append((pno, pno))
+    return ranges
+
+
+def splice_ocr_pages(doc, ocr_doc, page_indexes: List[int]):
+    """
+    Substitui as páginas `page_indexes` (0-indexed, ordenadas) de `doc` pelas
+    páginas de `ocr_doc`, na mesma ordem. As demais páginas não são tocadas.
+    """
+    toc = doc.get_toc(simple=False)
+
+    for ocr_index, pno in enumerate(page_indexes):
+        doc.insert_pdf(ocr_doc, from_page=ocr_index, to_page=ocr_index, start_at=pno)
+        doc.delete_page(pno + 1)
+
+    # Marcadores apontam para números de página, que não mudaram
+    if toc:
+        doc.set_toc(toc)
+
+
+def inprocess_unsupported_options(options: OCROptions) -> List[str]:
+    """Opções pedidas que só o OCRmyPDF aplica (o OCR em processo as ignoraria)"""
+    unsupported = []
+    if options.deskew:
+        unsupported.append("deskew")
+    if options.optimize:
+        unsupported.append("optimize")
+    if options.jpeg_quality != DEFAULT_JPEG_QUALITY:
+        unsupported.append("jpeg_quality")
+    return unsupported
+
+
+def choose_ocr_engine(options: OCROptions, doc, page_indexes: List[int]) -> str:
+    """
+    Escolhe o motor de OCR para as páginas `page_indexes` (0-indexed).
+
+    O OCR em processo evita a partida do OCRmyPDF, os temporários e as
+    passagens pelo pikepdf, o que domina o tempo em documentos curtos.
+    Deskew, otimização de imagens, páginas giradas e documentos grandes
+    continuam no OCRmyPDF, mesmo com o motor em processo pedido explicitamente.
+    """
+    if options.engine == OCR_ENGINE_OCRMYPDF:
+        return OCR_ENGINE_OCRMYPDF
+
+    unsupported = inprocess_unsupported_options(options)
+    if unsupported:
+        if options.engine == OCR_ENGINE_INPROCESS:
+            print(f"[WARNING] OCR em processo não suporta {', '.join(unsupported)}: usando OCRmyPDF")
+        return OCR_ENGINE_OCRMYPDF
+
+    if options.engine == OCR_ENGINE_AUTO and len(page_indexes) > INPROCESS_MAX_PAGES:
+        return OCR_ENGINE_OCRMYPDF
+
+    if any(doc[pno].rotation for pno in page_indexes):
+        return OCR_ENGINE_OCRMYPDF
+
+    if not inprocess_ocr_available(options.language):
+        return OCR_ENGINE_OCRMYPDF
+
+    return OCR_ENGINE_INPROCESS
+
+
+def _ocr_inprocess(pdf_data: bytes, page_indexes: List[int], options: OCROptions,
+                   session_id: Optional[str], on_wait, progress_callback, cancel_event) -> bytes:
+    """OCR em processo direto no documento original (não precisa recolocar páginas)"""
+    doc = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        ocr_document_inprocess(doc, page_indexes, options.language, session_id,
+                               on_wait, progress_callback, cancel_event)
+        return doc.tobytes(garbage=3, deflate=True)
+    finally:
+        doc.close()
+
+
+def ocr_cache_key(pdf_data: bytes, options: OCROptions) -> str:
+    """
+    Chave do cache de OCR. Opções que só afetam o tempo de execução
+    (threads, blocos, timeout) não entram na chave.
+    """
+    # No modo seletivo o "forçar OCR" não altera a saída
+    force_ocr = options.force_ocr if options.mode == OCR_MODE_FULL else None
+    return get_ocr_cache().make_key(
+        pdf_data, options.mode, options.language, force_ocr,
+        options.deskew, options.jpeg_quality, options.optimize, options.engine
+    )
+
+
+def ocr_pdf_bytes(pdf_data: bytes, options: OCROptions, session_id: Optional[str] = None,
+                  on_wait: Optional[Callable[[int, int], None]] = None,
+                  progress_callback: Optional[Callable[[int, int], None]] = None,
+                  cancel_event: Optional[threading.Event] = None) -> OCRResult:
+    """
+    Aplica OCR em um PDF em memória.
+
+    No modo seletivo, apenas as páginas sem camada de texto são enviadas ao
+    OCRmyPDF e depois recolocadas no documento original; páginas digitais
+    ficam intactas. Com `options.chunk_size`, as páginas são processadas em
+    blocos paralelos.
+
+    Resultados ficam no cache de OCR em disco: o mesmo PDF com as mesmas
+    opções (ex.: converter para Word e depois para Excel) roda o OCR uma vez só.
+
+    Args:
+        progress_callback: Recebe (páginas concluídas, páginas a processar);
+            pode ser chamado de outra thread
+        cancel_event: Se sinalizado, interrompe o OCR (JobCancelledError)
+    """
+    def _compute():
+        result = _ocr_pdf_bytes(pdf_data, options, session_id, on_wait, progress_callback, cancel_event)
+        return result.data, {"total_pages": result.total_pages, "ocr_pages": result.ocr_pages,
+                             "engine": result.engine}
+
+    data, meta = get_ocr_cache().get_or_compute(ocr_cache_key(pdf_data, options), _compute, cancel_event)
+    return OCRResult(data, meta["total_pages"], meta["ocr_pages"], options.mode,
+                     meta.get("engine", OCR_ENGINE_OCRMYPDF))
+
+
+def _ocr_pdf_bytes(pdf_data: bytes, options: OCROptions, session_id: Optional[str] = None,
+                   on_wait: Optional[Callable[[int, int], None]] = None,
+                   progress_callback: Optional[Callable[[int, int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> OCRResult:
+    """Execução do OCR sem passar pelo cache"""
+    classifier = TextLayerClassifier(pdf_data)
+    page_info = classifier.classify()
+    total_pages = len(page_info)
+
+    if options.mode == OCR_MODE_SELECTIVE:
+        target_pages = classifier.pages_needing_ocr()
+        if not target_pages:
+            return OCRResult(pdf_data, total_pages, [], options.mode)
+    else:
+        target_pages = [info.page_number for info in page_info]
+
+    page_indexes = [p - 1 for p in target_pages]
+
+    doc = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        engine = choose_ocr_engine(options, doc, page_indexes)
+    finally:
+        doc.close()
+
+    if engine == OCR_ENGINE_INPROCESS:
+        try:
+            data = _ocr_inprocess(pdf_data, page_indexes, options, session_id,
+                                  on_wait, progress_callback, cancel_event)
+            return OCRResult(data, total_pages, target_pages, options.mode, OCR_ENGINE_INPROCESS)
+        except (InProcessOCRUnavailable, RuntimeError) as e:
+            print(f"[WARNING] OCR em processo falhou, usando OCRmyPDF: {e}")
+
+    selective = options.mode == OCR_MODE_SELECTIVE and len(target_pages) < total_pages
+    # Páginas digitalizadas com algum texto (carimbo) não podem perder esse texto
+    redo_text = options.mode == OCR_MODE_SELECTIVE and any(
+        page_info[p - 1].has_text for p in target_pages
+    )
+
+    tmp_dir = tempfile.mkdtemp(prefix="jack_ocr_")
+    input_path = os.path.join(tmp_dir, "input.pdf")
+    output_path = os.path.join(tmp_dir, "output_ocr.pdf")
+
+    try:
+        if selective:
+            # Extrair apenas as páginas que precisam de OCR
+            source = fitz.open(stream=pdf_data, filetype="pdf")
+            subset = fitz.open()
+            for start, end in _page_ranges(page_indexes):
+                subset.insert_pdf(source, from_page=start, to_page=end)
+            subset.save(input_path)
+            subset.close()
+            source.close()
+        else:
+            with open(input_path, "wb") as f:
+                f.write(pdf_data)
+
+        if options.chunk_size and len(target_pages) > options.chunk_size:
+            run_ocrmypdf_chunked(input_path, output_path, options, session_id,
+                                 on_wait, redo_text, progress_callback, cancel_event)
+        else:
+            run_ocrmypdf(input_path, output_path, options, session_id, on_wait,
+                         redo_text, progress_callback, cancel_event)
+
+        if not selective:
+            with open(output_path, "rb") as f:
+                return OCRResult(f.read(), total_pages, target_pages, options.mode)
+
+        # Recolocar as páginas com OCR no documento original
+        doc = fitz.open(stream=pdf_data, filetype="pdf")
+        ocr_doc = fitz.open(output_path)
+        try:
+            splice_ocr_pages(doc, ocr_doc, page_indexes)
+            data = doc.tobytes(garbage=3, deflate=True)
+        finally:
+            ocr_doc.close()
+            doc.close()
+
+        return OCRResult(data, total_pages, target_pages, options.mode)
+
+    finally:
+        for path in (input_path, output_path):
+            try:
+                if os.path.exists(path):
+                    os.unlink(path)
+            except OSError:
+                pass
+        try:
+            os.rmdir(tmp_dir)
+        except OSError:
+            pass
@@ -0,0 +1,127 @@
+# core/ocr_inprocess.py
+
+import os
+import threading
+from typing import Callable, List, Optional
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler, JobCancelledError
+
+# Resolução usada no OCR em processo (a mesma do OCRmyPDF para digitalizações comuns)
+INPROCESS_OCR_DPI = 300
+
+# Fração mínima da caixa da palavra sobreposta a texto existente para ser descartada
+EXISTING_TEXT_OVERLAP = 0.5
+
+_availability = {}
+_availability_lock = threading.Lock()
+
+
+class InProcessOCRUnavailable(Exception):
+    """Tesseract/tessdata não disponíveis para o OCR em processo"""
+
+
+def get_tessdata_dir() -> Optional[str]:
+    """Diretório tessdata usado pelo MuPDF (None se o Tesseract não estiver instalado)"""
+    try:
+        return fitz.get_tessdata()
+    except (RuntimeError, AttributeError):
+        return None
+
+
+def inprocess_ocr_available(language: str) -> bool:
+    """
+    Verifica se o MuPDF consegue rodar o Tesseract para todos os idiomas
+    de `language` (ex.: "por" ou "por+eng"). O resultado fica em memória.
+    """
+    with _availability_lock:
+        if language in _availability:
+            return _availability[language]
+
+        tessdata = get_tessdata_dir()
+        available = bool(tessdata) and all(
+            os.path.exists(os.path.join(tessdata, f"{lang}.traineddata"))
+            for lang in language.split("+")
+        )
+        _availability[language] = available
+        return available
+
+
+def _overlaps_existing_text(rect: fitz.Rect, existing: List[fitz.Rect]) -> bool:
+    area = abs(rect)
+    if not area:
+        return True
+    for other in existing:
+        if abs(rect & other) / area >= EXISTING_TEXT_OVERLAP:
+            return True
+    return False
+
+
+def ocr_page_inprocess(page, language: str, font: fitz.Font) -> int:
+    """
+    Reconhece o texto da página com o Tesseract embutido no MuPDF e grava
+    uma camada de texto invisível (render_mode=3) sobre a imagem.
+
+    Palavras que já existem na camada de texto (ex.: carimbo digital do PJe)
+    não são duplicadas.
+
+    Returns:
+        int: Número de palavras adicionadas
+    """
+    existing = [fitz.Rect(w[:4]) for w in page.get_text("words")]
+
+    textpage = page.get_textpage_ocr(language=language, dpi=INPROCESS_OCR_DPI, full=True)
+    words = page.get_text("words", textpage=textpage)
+
+    writer = fitz.TextWriter(page.rect)
+    added = 0
+    for x0, y0, x1, y1, text, *_ in words:
+        rect = fitz.Rect(x0, y0, x1, y1)
+        if not text.strip() or _overlaps_existing_text(rect, existing):
+            continue
+
+        # Tamanho de fonte que faz a palavra ocupar a largura reconhecida,
+        # para que seleção e busca destaquem a região certa
+        unit_width = font.text_length(text, fontsize=1)
+        height = rect.height
+        fontsize = rect.width / unit_width if unit_width else height
+        fontsize = max(min(fontsize, height * 1.5), height * 0.5, 1)
+
+        # Linha de base próxima ao fundo da caixa (descendentes ~20% da altura)
+        writer.append((x0, y1 - height * 0.2), text, font=font, fontsize=fontsize)
+        added += 1
+
+    if added:
+        writer.write_text(page, render_mode=3)
+    return added
+
+
+def ocr_document_inprocess(doc, page_indexes: List[int], language: str,
+                           session_id: Optional[str] = None,
+                           on_wait: Optional[Callable[[int, int], None]] = None,
+                           progress_callback: Optional[Callable[[int, int], None]] = None,
+                           cancel_event: Optional[threading.Event] = None):
+    """
+    Aplica OCR em processo nas páginas `page_indexes` (0-indexed) de `doc`,
+    alterando o documento diretamente (sem subprocessos ou arquivos temporários).
+
+    Raises:
+        InProcessOCRUnavailable, JobCancelledError
+    """
+    if not inprocess_ocr_available(language):
+        raise InProcessOCRUnavailable(f"Tesseract/tessdata para '{language}' não encontrado")
+
+    font = fitz.Font("helv")
+    scheduler = get_job_scheduler()
+
+    with scheduler.acquire(session_id, slots=1, label="ocr-inprocess",
+                           on_wait=on_wait, cancel_event=cancel_event):
+        for done, pno in enumerate(page_indexes, start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelledError("OCR cancelado pelo usuário")
+
+            ocr_page_inprocess(doc[pno], language, font)
+
+            if progress_callback:
+                progress_callback(done, len(page_indexes))
@@ -0,0 +1,50 @@
+# core/ocr_progress_plugin.py
+"""
+Plugin do OCRmyPDF que reporta o progresso em linhas no stderr.
+
+Carregado com `ocrmypdf --plugin core/ocr_progress_plugin.py`; roda dentro do
+processo do OCRmyPDF, por isso não importa nada do aplicativo. Cada atualização
+gera uma linha no formato:
+
+    JACK_PROGRESS<TAB>etapa<TAB>concluído<TAB>total
+"""
+
+import sys
+
+from ocrmypdf import hookimpl
+
+PROGRESS_PREFIX = "JACK_PROGRESS"
+
+
+class StderrProgressBar:
+    """Barra de progresso sem interface: apenas escreve o estado no stderr"""
+
+    def __init__(self, *, total=None, desc=None, unit=None, disable=False, **kwargs):
+        # `disable` é ignorado: o stderr não é um terminal, mas o app quer o progresso
+        self.total = total or 0
+        self.desc = desc or ""
+        self.unit = unit or ""
+        self.current = 0
+
+    def _emit(self):
+        sys.stderr.write(f"{PROGRESS_PREFIX}\t{self.desc}\t{self.current:g}\t{self.total:g}\n")
+        sys.stderr.flush()
+
+    def __enter__(self):
+        self._emit()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def update(self, n=1, *, completed=None):
+        if completed is not None:
+            self.current = completed
+        else:
+            self.current += n
+        self._emit()
+
+
+@hookimpl
+def get_progressbar_class():
+    return StderrProgressBar
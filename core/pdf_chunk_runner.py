@@ -0,0 +1,133 @@
+# core/pdf_chunk_runner.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler
+
+
+def copy_page_labels_and_metadata(source, target):
+    """Copia metadados, rótulos de página e marcadores de `source` para `target`"""
+    metadata = {k: v for k, v in (source.metadata or {}).items() if v and k not in ("format", "encryption")}
+    if metadata:
+        target.set_metadata(metadata)
+
+    labels = source.get_page_labels()
+    if labels:
+        target.set_page_labels(labels)
+
+    toc = source.get_toc(simple=False)
+    if toc:
+        target.set_toc(toc)
+
+
+def split_pdf_chunks(source, work_dir: str, chunk_size: int, output_suffix: str) -> List[Tuple[str, str]]:
+    """
+    Grava cada bloco de `chunk_size` páginas de `source` em `work_dir`.
+
+    Returns:
+        [(arquivo do bloco, arquivo de saída do bloco)] na ordem das páginas
+    """
+    chunk_size = max(1, chunk_size)
+    chunks = []
+    for index, start in enumerate(range(0, source.page_count, chunk_size)):
+        end = min(start + chunk_size, source.page_count) - 1
+        chunk_in = os.path.join(work_dir, f"chunk_{index:04d}.pdf")
+        chunk_out = os.path.join(work_dir, f"chunk_{index:04d}_{output_suffix}.pdf")
+
+        chunk_doc = fitz.open()
+        chunk_doc.insert_pdf(source, from_page=start, to_page=end)
+        chunk_doc.save(chunk_in)
+        chunk_doc.close()
+        chunks.append((chunk_in, chunk_out))
+    return chunks
+
+
+def run_chunks(chunks: List[Tuple[str, str]], run_chunk: Callable,
+               on_wait: Optional[Callable[[int, int], None]] = None,
+               on_chunk_done: Optional[Callable[[int, int], None]] = None,
+               cancel_event: Optional[threading.Event] = None):
+    """
+    Executa `run_chunk(índice, entrada, saída, on_wait, cancel_event)` para
+    cada bloco em paralelo. Cada execução ocupa seus slots na fila global
+    (dentro de `run_chunk`), então o paralelismo acompanha a capacidade livre.
+
+    - `on_wait` recebe a posição do primeiro bloco na fila enquanto nenhum executa
+    - `on_chunk_done` recebe (blocos concluídos, total) na thread do chamador
+    - Se um bloco falhar, ou `cancel_event` for sinalizado, o evento repassado
+      a `run_chunk` é sinalizado: os processos dos demais blocos são encerrados
+      e os que estão na fila desistem, antes de o erro ser repassado
+    """
+    # Posição na fila de cada bloco, atualizada pelas threads de trabalho
+    positions = {}
+    positions_lock = threading.Lock()
+    chunks_cancel = threading.Event()
+
+    def _run(index, chunk_in, chunk_out):
+        def _on_wait(position, waiting):
+            with positions_lock:
+                positions[index] = (position, waiting)
+
+        try:
+            return run_chunk(index, chunk_in, chunk_out, _on_wait, chunks_cancel)
+        finally:
+            with positions_lock:
+                positions.pop(index, None)
+
+    scheduler_capacity = get_job_scheduler().capacity
+    executor = ThreadPoolExecutor(max_workers=max(1, min(len(chunks), scheduler_capacity)))
+    try:
+        pending = {
+            executor.submit(_run, index, chunk_in, chunk_out)
+            for index, (chunk_in, chunk_out) in enumerate(chunks)
+        }
+        completed = 0
+        last_position = None
+
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                chunks_cancel.set()
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()  # Propaga erro do bloco
+                completed += 1
+                if on_chunk_done:
+                    on_chunk_done(completed, len(chunks))
+
+            # Enquanto nenhum bloco executa, reportar a posição do primeiro na fila
+            if on_wait and completed == 0:
+                with positions_lock:
+                    all_waiting = len(positions) == len(chunks)
+                    position = min(positions.values(), default=None)
+                if all_waiting and position and position != last_position:
+                    on_wait(*position)
+                    last_position = position
+    finally:
+        # Em caso de erro, encerra os processos dos outros blocos em vez de esperá-los
+        chunks_cancel.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def join_chunks(source, chunks: List[Tuple[str, str]]):
+    """
+    Remonta as saídas dos blocos na ordem original, com rótulos de página,
+    metadados e marcadores de `source`. O chamador fecha o documento.
+    """
+    result = fitz.open()
+    try:
+        for _, chunk_out in chunks:
+            if not os.path.exists(chunk_out):
+                raise RuntimeError("Arquivo do bloco não foi criado")
+            chunk_doc = fitz.open(chunk_out)
+            result.insert_pdf(chunk_doc)
+            chunk_doc.close()
+
+        copy_page_labels_and_metadata(source, result)
+    except Exception:
+        result.close()
+        raise
+    return result
@@ -0,0 +1,166 @@
+# core/pdf_dedup.py
+
+import io
+import hashlib
+from typing import Dict, Tuple
+
+import pikepdf
+
+FONT_FILE_KEYS = ("/FontFile", "/FontFile2", "/FontFile3")
+
+# Profundidade máxima ao comparar objetos referenciados pelo stream
+MAX_KEY_DEPTH = 4
+
+
+class DedupReport:
+    """
+    Resultado da deduplicação de recursos.
+    """
+
+    def __init__(self):
+        self.fonts_removed = 0
+        self.images_removed = 0
+        self.bytes_saved = 0
+
+    @property
+    def objects_removed(self) -> int:
+        return self.fonts_removed + self.images_removed
+
+    def to_dict(self) -> Dict:
+        return {
+            'fonts_removed': self.fonts_removed,
+            'images_removed': self.images_removed,
+            'bytes_saved': self.bytes_saved
+        }
+
+
+def _is_indirect(value) -> bool:
+    # Números e booleanos chegam como tipos Python
+    return isinstance(value, pikepdf.Object) and value.is_indirect
+
+
+def _font_file_objgens(pdf: pikepdf.Pdf) -> set:
+    """Objetos dos programas de fonte embutidos (FontFile*) referenciados por FontDescriptors"""
+    objgens = set()
+    for obj in pdf.objects:
+        if isinstance(obj, pikepdf.Dictionary) and obj.get("/Type") == pikepdf.Name.FontDescriptor:
+            for key in FONT_FILE_KEYS:
+                font_file = obj.get(key)
+                if font_file is not None and _is_indirect(font_file):
+                    objgens.add(font_file.objgen)
+    return objgens
+
+
+def _object_key(value, digest, depth: int = 0):
+    """
+    Alimenta `digest` com o conteúdo de `value`. Objetos referenciados
+    (espaço de cor ICC, /SMask, /DecodeParms...) entram pelo conteúdo e não
+    pelo número do objeto, que muda de um arquivo de origem para outro.
+    """
+    if depth > MAX_KEY_DEPTH:
+        digest.update(repr(value.objgen if _is_indirect(value) else value).encode())
+    elif isinstance(value, pikepdf.Stream):
+        digest.update(b"stream")
+        digest.update(hashlib.md5(value.read_raw_bytes()).digest())
+        for key in sorted(value.keys()):
+            if key != "/Length":
+                digest.update(key.encode())
+                _object_key(value[key], digest, depth + 1)
+    elif isinstance(value, pikepdf.Dictionary):
+        digest.update(b"dict")
+        for key in sorted(value.keys()):
+            digest.update(key.encode())
+            _object_key(value[key], digest, depth + 1)
+    elif isinstance(value, pikepdf.Array):
+        digest.update(b"array")
+        for item in value:
+            _object_key(item, digest, depth + 1)
+    else:
+        digest.update(repr(value).encode())
+
+
+def _stream_key(stream: pikepdf.Stream) -> str:
+    """Hash do conteúdo bruto (ainda comprimido) e do dicionário do stream"""
+    digest = hashlib.md5()
+    _object_key(stream, digest)
+    return digest.hexdigest()
+
+
+def _rewrite_references(obj, replacements: Dict[Tuple[int, int], pikepdf.Object]):
+    """Troca, dentro de `obj` e seus objetos diretos, referências a duplicatas pela cópia mantida"""
+    if isinstance(obj, (pikepdf.Dictionary, pikepdf.Stream)):
+        for key in list(obj.keys()):
+            value = obj[key]
+            if _is_indirect(value):
+                if value.objgen in replacements:
+                    obj[key] = replacements[value.objgen]
+            elif isinstance(value, (pikepdf.Dictionary, pikepdf.Array)):
+                _rewrite_references(value, replacements)
+    elif isinstance(obj, pikepdf.Array):
+        for i, value in enumerate(obj):
+            if _is_indirect(value):
+                if value.objgen in replacements:
+                    obj[i] = replacements[value.objgen]
+            elif isinstance(value, (pikepdf.Dictionary, pikepdf.Array)):
+                _rewrite_references(value, replacements)
+
+
+def deduplicate_resources(pdf: pikepdf.Pdf) -> DedupReport:
+    """
+    Unifica fontes embutidas e imagens idênticas em `pdf` (alterado no lugar).
+
+    Documentos do mesmo sistema (PJe, e-SAJ...) repetem as mesmas fontes,
+    brasões e timbres em cada arquivo; depois de unidos, cada cópia continua
+    no PDF final. Os streams são comparados por hash do conteúdo e todas as
+    referências passam a apontar para uma única cópia. As duplicatas ficam
+    sem referência e não são gravadas no `save()`.
+    """
+    report = DedupReport()
+    font_files = _font_file_objgens(pdf)
+    canonical: Dict[str, pikepdf.Object] = {}
+    replacements: Dict[Tuple[int, int], pikepdf.Object] = {}
+
+    for obj in pdf.objects:
+        if not isinstance(obj, pikepdf.Stream):
+            continue
+
+        is_font = obj.objgen in font_files
+        is_image = obj.get("/Subtype") == pikepdf.Name.Image
+        if not (is_font or is_image):
+            continue
+
+        key = _stream_key(obj)
+        kept = canonical.get(key)
+        if kept is None:
+            canonical[key] = obj
+            continue
+
+        replacements[obj.objgen] = kept
+        report.bytes_saved += len(obj.read_raw_bytes())
+        if is_font:
+            report.fonts_removed += 1
+        else:
+            report.images_removed += 1
+
+    if replacements:
+        for obj in pdf.objects:
+            if isinstance(obj, (pikepdf.Dictionary, pikepdf.Stream, pikepdf.Array)):
+                _rewrite_references(obj, replacements)
+
+    if report.objects_removed:
+        print(f"[INFO] Deduplicação: {report.fonts_removed} fontes e {report.images_removed} imagens "
+              f"repetidas ({report.bytes_saved / (1024 * 1024):.2f} MB)")
+    return report
+
+
+def deduplicate_pdf_bytes(pdf_data: bytes) -> Tuple[bytes, DedupReport]:
+    """Versão em memória de `deduplicate_resources` (devolve o original se nada mudou)"""
+    with pikepdf.open(io.BytesIO(pdf_data)) as pdf:
+        report = deduplicate_resources(pdf)
+        if not report.objects_removed:
+            return pdf_data, report
+
+        output = io.BytesIO()
+        pdf.save(output, compress_streams=True,
+                 object_stream_mode=pikepdf.ObjectStreamMode.generate)
+        return output.getvalue(), report
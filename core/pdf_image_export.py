@@ -0,0 +1,172 @@
+# core/pdf_image_export.py
+
+import io
+import os
+import shutil
+import zipfile
+import tempfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler
+
+IMAGE_FORMAT_PNG = "png"
+IMAGE_FORMAT_JPEG = "jpeg"
+IMAGE_FORMAT_TIFF = "tiff"
+
+FILE_EXTENSIONS = {
+    IMAGE_FORMAT_PNG: "png",
+    IMAGE_FORMAT_JPEG: "jpg",
+    IMAGE_FORMAT_TIFF: "tiff",
+}
+
+# Compressão sem perdas aceita por qualquer leitor de TIFF
+TIFF_COMPRESSION = "tiff_lzw"
+
+# Abaixo disso as páginas são renderizadas no próprio processo
+PARALLEL_RENDER_MIN_PAGES = 8
+
+# Páginas por tarefa e tarefas em andamento por processo: limita quantas
+# imagens prontas ficam na memória esperando a vez de entrar no arquivo
+PAGES_PER_TASK = 4
+TASKS_IN_FLIGHT_PER_WORKER = 2
+
+
+class ImageExportOptions:
+    """
+    Opções de renderização e codificação das páginas.
+    """
+
+    def __init__(self, img_format: str = IMAGE_FORMAT_PNG, dpi: int = 300, quality: int = 90,
+                 grayscale: bool = False, alpha: bool = False):
+        self.img_format = img_format
+        self.dpi = dpi
+        self.quality = quality
+        self.grayscale = grayscale  # 1 byte por pixel em vez de 3
+        self.alpha = alpha and img_format == IMAGE_FORMAT_PNG  # fundo transparente (só PNG)
+
+    @property
+    def file_extension(self) -> str:
+        return FILE_EXTENSIONS[self.img_format]
+
+
+def render_page_pixmap(page, options: ImageExportOptions):
+    zoom = options.dpi / 72
+    colorspace = fitz.csGRAY if options.grayscale else fitz.csRGB
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=options.alpha)
+
+
+def encode_pixmap(pix, options: ImageExportOptions) -> bytes:
+    if options.img_format == IMAGE_FORMAT_JPEG:
+        return pix.tobytes("jpeg", jpg_quality=options.quality)
+    if options.img_format == IMAGE_FORMAT_TIFF:
+        return pix.pil_tobytes(format="TIFF", compression=TIFF_COMPRESSION)
+    return pix.tobytes("png")
+
+
+def render_page(doc, page_number: int, options: ImageExportOptions) -> bytes:
+    """Renderiza e codifica uma página (0-indexed)"""
+    return encode_pixmap(render_page_pixmap(doc[page_number], options), options)
+
+
+def _render_pages_worker(pdf_path: str, page_numbers: List[int],
+                         options: ImageExportOptions) -> List[Tuple[int, bytes]]:
+    """Executa em processo separado: renderiza e codifica um lote de páginas"""
+    doc = fitz.open(pdf_path)
+    try:
+        return [(pno, render_page(doc, pno, options)) for pno in page_numbers]
+    finally:
+        doc.close()
+
+
+def iter_rendered_pages(pdf_data: bytes, page_numbers: List[int], options: ImageExportOptions,
+                        session_id: Optional[str] = None) -> Iterator[Tuple[int, bytes]]:
+    """
+    Gera (página 0-indexed, imagem codificada) na ordem de `page_numbers`.
+
+    Com muitas páginas, renderização e codificação rodam em um pool de
+    processos (ocupando slots da fila global). Só uma janela de tarefas fica
+    em andamento, então a memória não cresce com o número de páginas.
+    """
+    if len(page_numbers) < PARALLEL_RENDER_MIN_PAGES:
+        doc = fitz.open(stream=pdf_data, filetype="pdf")
+        try:
+            for pno in page_numbers:
+                yield pno, render_page(doc, pno, options)
+        finally:
+            doc.close()
+        return
+
+    tasks = deque(page_numbers[i:i + PAGES_PER_TASK] for i in range(0, len(page_numbers), PAGES_PER_TASK))
+
+    work_dir = tempfile.mkdtemp(prefix="jack_images_")
+    try:
+        pdf_path = os.path.join(work_dir, "input.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_data)
+
+        scheduler = get_job_scheduler()
+        with scheduler.acquire(session_id, slots=len(tasks), label="images") as ticket:
+            window = ticket.slots * TASKS_IN_FLIGHT_PER_WORKER
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=ticket.slots, mp_context=context) as executor:
+                pending = deque()
+                while tasks or pending:
+                    while tasks and len(pending) < window:
+                        pending.append(executor.submit(_render_pages_worker, pdf_path, tasks.popleft(), options))
+                    # Resultados consumidos em ordem (necessário para o TIFF multipáginas)
+                    for item in pending.popleft().result():
+                        yield item
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def export_images_to_zip(pdf_data: bytes, page_numbers: List[int], options: ImageExportOptions,
+                         output, name_prefix: str = "page", session_id: Optional[str] = None,
+                         progress_callback: Optional[Callable[[int, int], None]] = None):
+    """
+    Grava uma imagem por página no ZIP `output` (caminho ou arquivo), à
+    medida que cada lote fica pronto. PNG/JPEG/TIFF já são comprimidos,
+    então entram no ZIP sem nova compressão.
+    """
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as zip_file:
+        for done, (pno, data) in enumerate(iter_rendered_pages(pdf_data, page_numbers, options, session_id),
+                                           start=1):
+            zip_file.writestr(f"{name_prefix}_{pno + 1}.{options.file_extension}", data)
+            if progress_callback:
+                progress_callback(done, len(page_numbers))
+
+
+def export_multipage_tiff(pdf_data: bytes, page_numbers: List[int], options: ImageExportOptions,
+                          output_path: str, session_id: Optional[str] = None,
+                          progress_callback: Optional[Callable[[int, int], None]] = None):
+    """
+    Grava um único TIFF com todas as páginas em `output_path`.
+
+    Os processos entregam cada página em PNG (sem perdas e pequeno para
+    transferir). Cada quadro é decodificado, gravado com o
+    AppendingTiffWriter e descartado antes do próximo, então a memória
+    fica limitada a uma página decodificada mais a janela de páginas em PNG.
+    (`save_all` com `append_images` não serve: o Pillow transforma o
+    gerador em lista e mantém todos os quadros decodificados.)
+    """
+    from PIL import Image, TiffImagePlugin
+
+    png_options = ImageExportOptions(IMAGE_FORMAT_PNG, options.dpi, options.quality, options.grayscale)
+    rendered = iter_rendered_pages(pdf_data, page_numbers, png_options, session_id)
+
+    try:
+        with TiffImagePlugin.AppendingTiffWriter(output_path, new=True) as tiff:
+            for done, (_, data) in enumerate(rendered, start=1):
+                with Image.open(io.BytesIO(data)) as frame:
+                    frame.save(tiff, format="TIFF", compression=TIFF_COMPRESSION,
+                               dpi=(options.dpi, options.dpi))
+                tiff.newFrame()
+                if progress_callback:
+                    progress_callback(done, len(page_numbers))
+    finally:
+        rendered.close()
@@ -0,0 +1,259 @@
+# core/pdf_merge_engine.py
+
+import os
+from typing import Callable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import pikepdf
+
+from core.pdf_dedup import DedupReport, deduplicate_resources, deduplicate_pdf_bytes
+from core.pdf_probe import get_pdf_probe
+
+
+# Chaves de metadados do PyMuPDF -> dicionário Info do PDF
+DOCINFO_KEYS = {
+    "title": "/Title",
+    "author": "/Author",
+    "subject": "/Subject",
+    "keywords": "/Keywords",
+    "creator": "/Creator",
+    "producer": "/Producer",
+    "creationDate": "/CreationDate",
+    "modDate": "/ModDate",
+}
+
+
+# União em disco sugerida a partir deste tamanho total (MB)
+DISK_MERGE_MIN_MB = 200
+
+
+class MergeResult:
+    """
+    Resultado de uma união de PDFs.
+    """
+
+    def __init__(self, data: Optional[bytes], total_files: int, total_pages: int,
+                 errors: List[Tuple[str, str]], output_path: Optional[str] = None):
+        self.data = data  # None quando o resultado foi gravado em `output_path`
+        self.total_files = total_files
+        self.total_pages = total_pages
+        self.errors = errors  # [(nome do arquivo, mensagem), ...]
+        self.output_path = output_path
+        self.dedup_report: Optional[DedupReport] = None
+
+    @property
+    def final_size(self) -> int:
+        if self.output_path:
+            return os.path.getsize(self.output_path)
+        return len(self.data)
+
+
+def _bookmark_title(filename: str) -> str:
+    return filename[:-4] if filename.lower().endswith(".pdf") else filename
+
+
+def _normalized_outline(outline: List[list], page_count: Optional[int] = None) -> List[list]:
+    """
+    Marcadores [nível, título, página 1-indexed] com destino válido e níveis
+    renumerados pela pilha de ancestrais mantidos: filhos de um marcador
+    descartado (sem página) sobem de nível, e saltos de nível (1 -> 3) viram
+    um único degrau. Assim `set_toc` nunca recebe hierarquia inválida.
+    """
+    normalized = []
+    stack = []  # níveis originais dos ancestrais mantidos
+    for level, title, page in outline:
+        if page <= 0 or (page_count is not None and page > page_count):
+            continue
+        while stack and stack[-1] >= level:
+            stack.pop()
+        stack.append(level)
+        normalized.append([len(stack), title, page])
+    return normalized
+
+
+def merge_pdf_bytes(sources: List[Tuple[str, bytes]], add_bookmarks: bool = True,
+                    preserve_metadata: bool = True,
+                    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                    deduplicate: bool = True) -> MergeResult:
+    """
+    Une PDFs com PyMuPDF (`insert_pdf`), lendo cada arquivo uma única vez.
+
+    Os marcadores são montados em uma lista e gravados com um único
+    `set_toc` no final: um marcador por arquivo, com os marcadores originais
+    do arquivo aninhados abaixo dele. Os metadados do primeiro arquivo vêm
+    do PdfProbe já calculado no upload.
+
+    Args:
+        sources: [(nome do arquivo, bytes), ...] na ordem final
+        progress_callback: (arquivos processados, total, nome) na thread do chamador
+        deduplicate: Unifica fontes e imagens repetidas entre os arquivos
+
+    Returns:
+        MergeResult: Arquivos com erro (ex.: protegidos por senha) ficam em `errors`
+    """
+    output = fitz.open()
+    toc = []
+    errors = []
+    merged_files = 0
+
+    try:
+        for i, (name, data) in enumerate(sources):
+            if progress_callback:
+                progress_callback(i, len(sources), name)
+
+            probe = get_pdf_probe(data, with_text_map=False)
+            if probe.error:
+                errors.append((name, probe.error))
+                continue
+
+            try:
+                doc = fitz.open(stream=data, filetype="pdf")
+            except Exception as e:
+                errors.append((name, str(e)))
+                continue
+
+            try:
+                start_page = output.page_count
+                output.insert_pdf(doc)
+            except Exception as e:
+                errors.append((name, str(e)))
+                continue
+            finally:
+                doc.close()
+
+            # Marcadores originais deslocados para a posição do arquivo
+            level_offset = 1 if add_bookmarks else 0
+            if add_bookmarks:
+                toc.append([1, _bookmark_title(name), start_page + 1])
+            for level, title, page in _normalized_outline(probe.outline, probe.page_count):
+                toc.append([level + level_offset, title, start_page + page])
+
+            merged_files += 1
+
+        if progress_callback:
+            progress_callback(len(sources), len(sources), "")
+
+        if toc:
+            output.set_toc(toc)
+
+        if preserve_metadata and sources:
+            first = get_pdf_probe(sources[0][1], with_text_map=False)
+            metadata = {k: v for k, v in first.metadata.items() if k not in ("format", "encryption")}
+            if metadata:
+                output.set_metadata(metadata)
+
+        total_pages = output.page_count
+        data = output.tobytes(garbage=3, deflate=True) if total_pages else b""
+    finally:
+        output.close()
+
+    dedup_report = None
+    if deduplicate and data:
+        data, dedup_report = deduplicate_pdf_bytes(data)
+
+    result = MergeResult(data, merged_files, total_pages, errors)
+    result.dedup_report = dedup_report
+    return result
+
+
+def _outline_items(toc: List[list]) -> List[pikepdf.OutlineItem]:
+    """Converte [nível, título, página (0-indexed)] em itens aninhados do pikepdf"""
+    roots = []
+    stack = []  # (nível, item)
+    for level, title, page in toc:
+        item = pikepdf.OutlineItem(title, page)
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        if stack:
+            stack[-1][1].children.append(item)
+        else:
+            roots.append(item)
+        stack.append((level, item))
+    return roots
+
+
+def merge_pdf_files(sources: List[Tuple[str, str]], output_path: str, add_bookmarks: bool = True,
+                    preserve_metadata: bool = True,
+                    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                    deduplicate: bool = True) -> MergeResult:
+    """
+    Une PDFs já gravados em disco, escrevendo o resultado em `output_path`.
+
+    Usa pikepdf (qpdf): as páginas copiadas continuam apontando para o
+    conteúdo dos arquivos de origem, que só é lido durante a gravação e
+    escrito direto no arquivo de saída. A memória usada depende da estrutura
+    dos documentos (dicionários de páginas), não do tamanho total dos arquivos.
+
+    Args:
+        sources: [(nome do arquivo, caminho), ...] na ordem final
+        progress_callback: (arquivos processados, total, nome) na thread do chamador
+        deduplicate: Unifica fontes e imagens repetidas entre os arquivos
+            (os streams são lidos um a um só para calcular o hash)
+
+    Returns:
+        MergeResult: Com `output_path` preenchido e `data` None
+    """
+    opened = []
+    toc = []
+    errors = []
+    metadata = {}
+    dedup_report = None
+
+    try:
+        with pikepdf.new() as output:
+            for i, (name, path) in enumerate(sources):
+                if progress_callback:
+                    progress_callback(i, len(sources), name)
+
+                try:
+                    source = pikepdf.open(path)
+                except Exception as e:
+                    errors.append((name, str(e)))
+                    continue
+                opened.append(source)
+
+                start_page = len(output.pages)
+                output.pages.extend(source.pages)
+
+                # Marcadores e metadados lidos com PyMuPDF (sem carregar as páginas)
+                try:
+                    with fitz.open(path) as doc:
+                        outline = doc.get_toc(simple=True)
+                        if preserve_metadata and not metadata:
+                            metadata = {k: v for k, v in (doc.metadata or {}).items()
+                                        if v and k not in ("format", "encryption")}
+                except Exception as e:
+                    print(f"[WARNING] Marcadores de {name} não lidos: {e}")
+                    outline = []
+
+                level_offset = 1 if add_bookmarks else 0
+                if add_bookmarks:
+                    toc.append([1, _bookmark_title(name), start_page])
+                for level, title, page in _normalized_outline(outline, len(source.pages)):
+                    toc.append([level + level_offset, title, start_page + page - 1])
+
+            if progress_callback:
+                progress_callback(len(sources), len(sources), "")
+
+            total_pages = len(output.pages)
+            if toc:
+                with output.open_outline() as outline_root:
+                    outline_root.root.extend(_outline_items(toc))
+
+            for key, value in metadata.items():
+                if key in DOCINFO_KEYS:
+                    output.docinfo[DOCINFO_KEYS[key]] = value
+
+            if deduplicate and total_pages:
+                dedup_report = deduplicate_resources(output)
+
+            if total_pages:
+                output.save(output_path, compress_streams=True,
+                            object_stream_mode=pikepdf.ObjectStreamMode.generate)
+    finally:
+        for source in opened:
+            source.close()
+
+    result = MergeResult(None, len(opened), total_pages, errors, output_path if total_pages else None)
+    result.dedup_report = dedup_report
+    return result
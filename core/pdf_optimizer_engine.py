@@ -0,0 +1,415 @@
+# core/pdf_optimizer_engine.py
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+from typing import Callable, List, Optional
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler, JobCancelledError
+from core.pdf_chunk_runner import join_chunks, run_chunks, split_pdf_chunks
+from core.pdf_size_planner import split_pdf_to_size
+
+# Motores de otimização
+OPTIMIZER_ENGINE_GHOSTSCRIPT = "ghostscript"  # pdfwrite: reinterpreta e regrava todas as páginas
+OPTIMIZER_ENGINE_INPROCESS = "inprocess"  # PyMuPDF: só imagens grandes + limpeza da estrutura
+OPTIMIZER_ENGINE_AUTO = "auto"
+
+# Presets equivalentes aos do Ghostscript
+PRESET_EBOOK = "/ebook"
+PRESET_SCREEN = "/screen"
+
+# Parâmetros de imagem do motor em processo por preset (mesmas resoluções do Ghostscript)
+INPROCESS_PRESETS = {
+    PRESET_EBOOK: {"dpi_target": 150, "dpi_threshold": 225, "quality": 75},
+    PRESET_SCREEN: {"dpi_target": 72, "dpi_threshold": 108, "quality": 50},
+}
+
+# Modo "tamanho máximo": configurações de imagem da melhor para a pior qualidade.
+# (None, None) = só limpeza da estrutura, sem tocar nas imagens
+TARGET_SIZE_LADDER = [
+    (None, None),
+    (200, 80),
+    (150, 75),
+    (150, 60),
+    (120, 55),
+    (100, 50),
+    (72, 50),
+    (72, 35),
+    (50, 30),
+]
+TARGET_SAMPLE_PAGES = 8
+TARGET_SAFETY_MARGIN = 0.95  # Estimativa precisa ficar abaixo de 95% do limite
+
+# Ghostscript em blocos paralelos (gs usa um único núcleo por processo)
+GS_CHUNK_SIZE = 50
+CHUNKED_GS_MIN_PAGES = 100
+
+# Documento "de texto": imagens cobrem pouco das páginas e quase todas têm texto
+TEXT_HEAVY_MAX_IMAGE_COVERAGE = 0.5
+TEXT_HEAVY_MIN_TEXT_PAGES = 0.8
+
+
+class OptimizeResult:
+    """
+    Resultado de uma otimização.
+    """
+
+    def __init__(self, data: bytes, engine: str, elapsed: float, original_size: int):
+        self.data = data
+        self.engine = engine
+        self.elapsed = elapsed
+        self.original_size = original_size
+        self.setting_label = ""
+        self.estimates: List[tuple] = []  # (configuração, tamanho estimado em bytes)
+        self.parts: List[bytes] = []  # Preenchido quando foi preciso dividir para caber no limite
+
+    @property
+    def optimized_size(self) -> int:
+        return len(self.data)
+
+    @property
+    def compression_ratio(self) -> float:
+        """Redução em % em relação ao original"""
+        if not self.original_size:
+            return 0.0
+        return (self.original_size - self.optimized_size) / self.original_size * 100
+
+
+def ghostscript_executable() -> str:
+    return "gswin64c" if os.name == 'nt' else "gs"
+
+
+def build_ghostscript_command(input_path: str, output_path: str, setting: str,
+                              extra_args: Optional[List[str]] = None) -> List[str]:
+    """Monta a linha de comando do Ghostscript pdfwrite"""
+    command = [
+        ghostscript_executable(),
+        "-sDEVICE=pdfwrite",
+        "-dCompatibilityLevel=1.4",
+        f"-dPDFSETTINGS={setting}",
+        "-dNOPAUSE",
+        "-dQUIET",
+        "-dBATCH",
+        "-dPreserveEPSInfo=true",
+        "-dAutoRotatePages=/None",
+    ]
+    if extra_args:
+        command.extend(extra_args)
+    command.extend([f"-sOutputFile={output_path}", input_path])
+    return command
+
+
+def is_text_heavy(pdf_data: bytes) -> bool:
+    """
+    True se o conteúdo das páginas é majoritariamente texto. Nesses PDFs o
+    ganho vem da estrutura (object streams, deduplicação) e não de
+    reinterpretar as páginas com o Ghostscript.
+    """
+    from core.pdf_probe import get_pdf_probe
+    probe = get_pdf_probe(pdf_data)
+    if probe.error or not probe.text_map:
+        return False
+
+    pages = probe.text_map
+    mean_coverage = sum(info.image_coverage for info in pages) / len(pages)
+    text_pages = sum(1 for info in pages if info.has_text and not info.is_scanned) / len(pages)
+    return mean_coverage < TEXT_HEAVY_MAX_IMAGE_COVERAGE and text_pages >= TEXT_HEAVY_MIN_TEXT_PAGES
+
+
+def get_page_count(pdf_data: bytes) -> int:
+    from core.pdf_probe import get_pdf_probe
+    return get_pdf_probe(pdf_data, with_text_map=False).page_count
+
+
+def choose_optimizer_engine(pdf_data: bytes, engine: str = OPTIMIZER_ENGINE_AUTO) -> str:
+    if engine != OPTIMIZER_ENGINE_AUTO:
+        return engine
+    return OPTIMIZER_ENGINE_INPROCESS if is_text_heavy(pdf_data) else OPTIMIZER_ENGINE_GHOSTSCRIPT
+
+
+def optimize_inprocess(pdf_data: bytes, setting: str = PRESET_EBOOK,
+                       image_params: Optional[dict] = None) -> bytes:
+    """
+    Otimização em processo com PyMuPDF:
+
+    - Recomprime apenas imagens acima da resolução do preset
+    - Reduz fontes embutidas aos glifos usados
+    - Regrava com garbage=4 (remove objetos órfãos e unifica objetos
+      idênticos, como fontes e imagens repetidas), compressão e object streams
+
+    `image_params` ({dpi_target, dpi_threshold, quality}) substitui o preset;
+    um dicionário vazio mantém as imagens como estão.
+
+    Se o resultado ficar maior que o original, o original é devolvido.
+    """
+    params = image_params if image_params is not None else \
+        INPROCESS_PRESETS.get(setting, INPROCESS_PRESETS[PRESET_EBOOK])
+
+    doc = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        if not params:
+            pass
+        elif hasattr(doc, "rewrite_images"):
+            doc.rewrite_images(
+                dpi_threshold=params["dpi_threshold"],
+                dpi_target=params["dpi_target"],
+                quality=params["quality"]
+            )
+        else:
+            print("[WARNING] PyMuPDF sem rewrite_images (>= 1.24.10); imagens não serão recomprimidas")
+
+        try:
+            doc.subset_fonts()
+        except Exception as e:
+            print(f"[WARNING] Não foi possível reduzir as fontes: {e}")
+
+        data = doc.tobytes(
+            garbage=4,
+            clean=True,
+            deflate=True,
+            deflate_images=True,
+            deflate_fonts=True,
+            use_objstms=1
+        )
+    finally:
+        doc.close()
+
+    return data if len(data) < len(pdf_data) else pdf_data
+
+
+def run_ghostscript(input_path: str, output_path: str, setting: str,
+                    session_id: Optional[str] = None,
+                    on_wait: Optional[Callable[[int, int], None]] = None,
+                    extra_args: Optional[List[str]] = None,
+                    cancel_event: Optional[threading.Event] = None):
+    """
+    Executa o Ghostscript dentro da fila global (1 slot: gs é single-thread).
+
+    Se `cancel_event` for sinalizado, o gs é encerrado.
+
+    Raises:
+        subprocess.CalledProcessError, FileNotFoundError (gs ausente), JobCancelledError
+    """
+    scheduler = get_job_scheduler()
+    command = build_ghostscript_command(input_path, output_path, setting, extra_args)
+    with scheduler.acquire(session_id, slots=1, label="ghostscript", on_wait=on_wait,
+                           cancel_event=cancel_event):
+        process = scheduler.popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            while True:
+                try:
+                    stdout, stderr = process.communicate(timeout=0.2)
+                    break
+                except subprocess.TimeoutExpired:
+                    if cancel_event is not None and cancel_event.is_set():
+                        scheduler.terminate(process)
+                        raise JobCancelledError("Ghostscript cancelado")
+        finally:
+            if process.poll() is None:
+                scheduler.terminate(process)
+
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+
+def optimize_with_ghostscript(pdf_data: bytes, setting: str = PRESET_EBOOK,
+                              session_id: Optional[str] = None,
+                              on_wait: Optional[Callable[[int, int], None]] = None) -> bytes:
+    tmp_dir = tempfile.mkdtemp(prefix="jack_gs_")
+    input_path = os.path.join(tmp_dir, "input.pdf")
+    output_path = os.path.join(tmp_dir, "output_otimizado.pdf")
+    try:
+        with open(input_path, "wb") as f:
+            f.write(pdf_data)
+
+        run_ghostscript(input_path, output_path, setting, session_id, on_wait)
+
+        if not os.path.exists(output_path):
+            raise RuntimeError("Arquivo otimizado não foi criado")
+        with open(output_path, "rb") as f:
+            return f.read()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def optimize_with_ghostscript_chunked(pdf_data: bytes, setting: str = PRESET_EBOOK,
+                                      session_id: Optional[str] = None,
+                                      on_wait: Optional[Callable[[int, int], None]] = None,
+                                      progress_callback: Optional[Callable[[int, int], None]] = None,
+                                      chunk_size: int = GS_CHUNK_SIZE) -> bytes:
+    """
+    Ghostscript em blocos de páginas executados em paralelo.
+
+    Cada bloco é um processo gs que ocupa um slot da fila global. Os blocos
+    são gerados sem subconjunto de fontes (-dSubsetFonts=false), então a
+    mesma fonte sai idêntica em todos eles; na remontagem, garbage=4 mantém
+    uma única cópia e só então as fontes são reduzidas aos glifos usados.
+
+    `progress_callback` recebe (blocos concluídos, total de blocos) e é
+    chamado na thread do chamador. Se um bloco falhar, os gs dos demais são
+    encerrados antes de o erro ser repassado.
+    """
+    source = fitz.open(stream=pdf_data, filetype="pdf")
+    work_dir = tempfile.mkdtemp(prefix="jack_gs_chunks_")
+    try:
+        chunks = split_pdf_chunks(source, work_dir, chunk_size, "gs")
+
+        def _optimize_chunk(index, chunk_in, chunk_out, on_chunk_wait, chunk_cancel):
+            return run_ghostscript(chunk_in, chunk_out, setting, session_id, on_chunk_wait,
+                                   extra_args=["-dSubsetFonts=false"], cancel_event=chunk_cancel)
+
+        run_chunks(chunks, _optimize_chunk, on_wait, progress_callback)
+
+        result = join_chunks(source, chunks)
+        try:
+            result.subset_fonts()
+        except Exception as e:
+            print(f"[WARNING] Não foi possível reduzir as fontes: {e}")
+
+        data = result.tobytes(garbage=4, deflate=True, use_objstms=1)
+        result.close()
+        return data
+
+    finally:
+        source.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def optimize_pdf_bytes(pdf_data: bytes, setting: str = PRESET_EBOOK,
+                       engine: str = OPTIMIZER_ENGINE_AUTO,
+                       session_id: Optional[str] = None,
+                       on_wait: Optional[Callable[[int, int], None]] = None,
+                       chunked: bool = False,
+                       chunk_size: int = GS_CHUNK_SIZE,
+                       progress_callback: Optional[Callable[[int, int], None]] = None) -> OptimizeResult:
+    """
+    Otimiza um PDF em memória com o motor escolhido.
+
+    No modo automático, PDFs majoritariamente de texto usam o motor em
+    processo; os demais (digitalizações) usam o Ghostscript, e o motor em
+    processo é usado como alternativa se o Ghostscript não estiver instalado.
+
+    Args:
+        chunked: Ghostscript em blocos paralelos de `chunk_size` páginas
+            (ignorado se o documento tiver um único bloco)
+        progress_callback: (blocos concluídos, total de blocos) no modo em blocos
+    """
+    selected = choose_optimizer_engine(pdf_data, engine)
+    start = time.time()
+
+    if selected == OPTIMIZER_ENGINE_GHOSTSCRIPT:
+        try:
+            if chunked and get_page_count(pdf_data) > chunk_size:
+                data = optimize_with_ghostscript_chunked(pdf_data, setting, session_id, on_wait,
+                                                         progress_callback, chunk_size)
+            else:
+                data = optimize_with_ghostscript(pdf_data, setting, session_id, on_wait)
+            return OptimizeResult(data, selected, time.time() - start, len(pdf_data))
+        except FileNotFoundError:
+            if engine != OPTIMIZER_ENGINE_AUTO or shutil.which(ghostscript_executable()):
+                raise
+            print("[WARNING] Ghostscript não encontrado, usando otimização em processo")
+            selected = OPTIMIZER_ENGINE_INPROCESS
+
+    # Trabalho de CPU no processo do app: ocupa um slot da fila como o gs
+    scheduler = get_job_scheduler()
+    with scheduler.acquire(session_id, slots=1, label="optimizer-inprocess", on_wait=on_wait):
+        data = optimize_inprocess(pdf_data, setting)
+    return OptimizeResult(data, selected, time.time() - start, len(pdf_data))
+
+
+def _ladder_params(dpi: Optional[int], quality: Optional[int]) -> dict:
+    if dpi is None:
+        return {}
+    return {"dpi_target": dpi, "dpi_threshold": int(dpi * 1.5), "quality": quality}
+
+
+def _ladder_label(dpi: Optional[int], quality: Optional[int]) -> str:
+    if dpi is None:
+        return "Somente estrutura"
+    return f"{dpi} dpi, qualidade {quality}"
+
+
+def _sample_document(pdf_data: bytes, sample_pages: int) -> bytes:
+    """PDF com até `sample_pages` páginas espalhadas uniformemente pelo documento"""
+    source = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        total = source.page_count
+        if total <= sample_pages:
+            return pdf_data
+
+        step = total / sample_pages
+        sample = fitz.open()
+        for i in range(sample_pages):
+            pno = int(i * step)
+            sample.insert_pdf(source, from_page=pno, to_page=pno)
+        data = sample.tobytes(garbage=1)
+        sample.close()
+        return data
+    finally:
+        source.close()
+
+
+def estimate_target_sizes(pdf_data: bytes, sample_pages: int = TARGET_SAMPLE_PAGES) -> List[tuple]:
+    """
+    Estima o tamanho final do documento para cada configuração de
+    TARGET_SIZE_LADDER otimizando apenas uma amostra de páginas.
+
+    A estimativa é a taxa de redução da amostra aplicada ao arquivo inteiro.
+
+    Returns:
+        list: [(dpi, qualidade, tamanho estimado em bytes), ...]
+    """
+    sample = _sample_document(pdf_data, sample_pages)
+    estimates = []
+    for dpi, quality in TARGET_SIZE_LADDER:
+        optimized = optimize_inprocess(sample, image_params=_ladder_params(dpi, quality))
+        ratio = len(optimized) / len(sample)
+        estimates.append((dpi, quality, int(len(pdf_data) * ratio)))
+    return estimates
+
+
+def optimize_to_target_size(pdf_data: bytes, target_mb: float,
+                            session_id: Optional[str] = None,
+                            on_wait: Optional[Callable[[int, int], None]] = None) -> OptimizeResult:
+    """
+    Modo "caber em N MB" (limites de upload dos tribunais).
+
+    Estima o resultado de cada configuração em uma amostra de páginas,
+    escolhe a de melhor qualidade prevista para caber e faz uma única
+    passagem completa. Se ainda assim o arquivo passar do limite, ele é
+    dividido em partes que respeitam o limite (`result.parts`) pelo
+    planejador de tamanho do Dividir PDF.
+    """
+    max_bytes = int(target_mb * 1024 * 1024)
+    start = time.time()
+
+    scheduler = get_job_scheduler()
+    with scheduler.acquire(session_id, slots=1, label="optimizer-target", on_wait=on_wait):
+        if len(pdf_data) <= max_bytes:
+            estimates = [(None, None, len(pdf_data))]
+        else:
+            estimates = estimate_target_sizes(pdf_data)
+
+        # Primeira configuração prevista para caber; senão a mais agressiva
+        dpi, quality, _ = next(
+            (e for e in estimates if e[2] <= max_bytes * TARGET_SAFETY_MARGIN),
+            estimates[-1]
+        )
+        data = optimize_inprocess(pdf_data, image_params=_ladder_params(dpi, quality))
+
+        parts = []
+        if len(data) > max_bytes:
+            parts = [part for _, _, part in split_pdf_to_size(data, max_bytes)]
+
+    result = OptimizeResult(data, OPTIMIZER_ENGINE_INPROCESS, time.time() - start, len(pdf_data))
+    result.setting_label = _ladder_label(dpi, quality)
+    result.estimates = [(_ladder_label(d, q), size) for d, q, size in estimates]
+    result.parts = parts
+    return result
@@ -0,0 +1,126 @@
+# core/pdf_probe.py
+
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from core.cache_manager import get_cache_manager, make_cache_key
+from core.pdf_text_layer import PageTextInfo, TextLayerClassifier
+
+
+class PdfProbe:
+    """
+    Informações de um PDF lidas uma única vez com PyMuPDF.
+
+    Calculado por conteúdo (hash) e guardado no cache global, então reruns do
+    Streamlit e páginas diferentes (conversor, divisor, juntar, preview,
+    validação) não voltam a ler o arquivo.
+    """
+
+    def __init__(self, file_hash: str, file_size: int):
+        self.file_hash = file_hash
+        self.file_size = file_size
+        self.page_count = 0
+        self.page_sizes: List[Tuple[float, float]] = []  # (largura, altura) em pontos
+        self.is_encrypted = False
+        self.needs_password = False
+        self.outline: List[list] = []  # [nível, título, página]
+        self.metadata: Dict[str, str] = {}
+        self.text_map: Optional[List[PageTextInfo]] = None
+        self.error: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Derivados
+    # ------------------------------------------------------------------
+
+    @property
+    def file_size_mb(self) -> float:
+        return self.file_size / (1024 * 1024)
+
+    @property
+    def has_outline(self) -> bool:
+        return bool(self.outline)
+
+    @property
+    def has_text_first_page(self) -> bool:
+        return bool(self.text_map) and self.text_map[0].text_chars > 0
+
+    @property
+    def needs_ocr(self) -> bool:
+        """Alguma página é digitalizada (sem camada de texto utilizável)"""
+        return any(info.needs_ocr for info in self.text_map or [])
+
+    @property
+    def scanned_pages(self) -> List[int]:
+        """Páginas digitalizadas (1-indexed)"""
+        return [info.page_number for info in self.text_map or [] if info.needs_ocr]
+
+    @property
+    def has_summary_text(self) -> bool:
+        return any(info.has_summary_keyword for info in self.text_map or [])
+
+
+def probe_pdf(pdf_data: bytes, with_text_map: bool = True) -> PdfProbe:
+    """
+    Lê páginas, tamanhos, criptografia, marcadores, metadados e (opcionalmente)
+    o mapa de texto por página. Erros ficam em `probe.error`.
+    """
+    probe = PdfProbe(hashlib.md5(pdf_data).hexdigest(), len(pdf_data))
+
+    try:
+        doc = fitz.open(stream=pdf_data, filetype="pdf")
+    except Exception as e:
+        probe.error = str(e)
+        return probe
+
+    try:
+        probe.is_encrypted = bool(doc.is_encrypted or doc.metadata.get("encryption"))
+        probe.needs_password = bool(doc.needs_pass)
+        if probe.needs_password:
+            probe.error = "PDF protegido por senha"
+            return probe
+
+        probe.page_count = doc.page_count
+        probe.metadata = {k: v for k, v in (doc.metadata or {}).items() if v}
+        probe.outline = doc.get_toc(simple=True)
+
+        if with_text_map:
+            probe.text_map = []
+            for page in doc:
+                probe.page_sizes.append((page.rect.width, page.rect.height))
+                probe.text_map.append(TextLayerClassifier.classify_page(page))
+        else:
+            for pno in range(doc.page_count):
+                # page_cropbox não carrega a página inteira
+                rect = doc.page_cropbox(pno)
+                probe.page_sizes.append((rect.width, rect.height))
+
+    except Exception as e:
+        probe.error = str(e)
+    finally:
+        doc.close()
+
+    return probe
+
+
+@get_cache_manager().memoize("pdf_probe")
+def _cached_probe(pdf_data: bytes, with_text_map: bool) -> PdfProbe:
+    return probe_pdf(pdf_data, with_text_map)
+
+
+def get_pdf_probe(pdf_data: bytes, with_text_map: bool = True) -> PdfProbe:
+    """
+    PdfProbe do arquivo, memoizado por hash do conteúdo.
+
+    Args:
+        with_text_map: Inclui o mapa de texto por página. Desligue quando só a
+            estrutura interessa (ex.: vários arquivos no Juntar PDFs)
+    """
+    if not with_text_map:
+        # Um probe completo já em cache também serve
+        found, probe = get_cache_manager().get("pdf_probe", make_cache_key(pdf_data, True))
+        if found:
+            return probe
+
+    return _cached_probe(pdf_data, with_text_map)
@@ -0,0 +1,223 @@
+# core/pdf_separator_detector.py
+
+import os
+import re
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler
+
+# Resolução da renderização: suficiente para tinta e barras, ~90 mil pixels por página A4
+DETECT_DPI = 40
+
+# Margem ignorada (bordas escuras do scanner, furos de arquivo)
+MARGIN_RATIO = 0.05
+
+# Pixel de "tinta" (cinza) e pixel de barra (preto)
+INK_LEVEL = 160
+BAR_LEVEL = 96
+
+# Página em branco: fração máxima de pixels com tinta (sujeira do scanner, vazamento do verso)
+BLANK_MAX_INK = 0.005
+
+# Folha de código de barras: colunas com traço vertical de pelo menos 0,3" (texto tem ~0,15")
+BAR_MIN_HEIGHT_INCH = 0.3
+BAR_MIN_COLUMNS_INCH = 0.3
+# As barras ficam agrupadas (largura máxima do grupo) e o resto da folha é quase vazio
+BAR_MAX_SPAN_INCH = 4.0
+BARCODE_MAX_INK = 0.10
+# Confirmação em resolução maior: barras e espaços estreitos alternados ao
+# longo da folha (um logotipo ou carimbo escuro é um único traço largo)
+BARCODE_SCAN_DPI = 200
+BAR_MAX_WIDTH_INCH = 0.15
+BAR_MIN_COUNT = 10
+
+# Abaixo disso a detecção roda no próprio processo
+PARALLEL_DETECT_MIN_PAGES = 40
+PAGES_PER_BATCH = 25
+
+# Tabelas de tradução: pixel -> 1 (escuro) ou 0
+_INK_TABLE = bytes(1 if value < INK_LEVEL else 0 for value in range(256))
+_BAR_TABLE = bytes(1 if value < BAR_LEVEL else 0 for value in range(256))
+
+
+class PageInkInfo:
+    """
+    Estatísticas de pixels de uma página renderizada em baixa resolução.
+    """
+
+    def __init__(self, page_number: int, ink_ratio: float, bar_columns: int, bar_span: int,
+                 dpi: int = DETECT_DPI, bar_count: int = 0):
+        self.page_number = page_number  # 1-indexed
+        self.ink_ratio = ink_ratio
+        self.bar_columns = bar_columns  # colunas com traço vertical alto
+        self.bar_span = bar_span  # largura (px) do grupo dessas colunas
+        self.dpi = dpi
+        self.bar_count = bar_count  # barras estreitas seguidas (só nas candidatas)
+
+    def is_blank(self, max_ink: float = BLANK_MAX_INK) -> bool:
+        return self.ink_ratio <= max_ink
+
+    @property
+    def is_barcode_candidate(self) -> bool:
+        """Traços verticais agrupados em folha quase vazia (ainda sem olhar o padrão)"""
+        return (self.bar_columns >= BAR_MIN_COLUMNS_INCH * self.dpi
+                and self.bar_span <= BAR_MAX_SPAN_INCH * self.dpi
+                and self.ink_ratio <= BARCODE_MAX_INK)
+
+    @property
+    def is_barcode(self) -> bool:
+        return self.is_barcode_candidate and self.bar_count >= BAR_MIN_COUNT
+
+    def to_dict(self) -> dict:
+        return {
+            "pagina": self.page_number,
+            "ink_ratio": round(self.ink_ratio, 4),
+            "bar_columns": self.bar_columns,
+            "bar_count": self.bar_count,
+            "is_blank": self.is_blank(),
+            "is_barcode": self.is_barcode
+        }
+
+
+def _bar_rows(page, dpi: int):
+    """
+    Renderiza a página em tons de cinza, girada 90°: cada linha do pixmap é
+    uma coluna da página, e traços verticais viram sequências contínuas de
+    bytes, contadas com `bytes.translate` e regex (sem laço por pixel).
+
+    Returns:
+        (fração de pixels com tinta, colunas com traço vertical alto)
+    """
+    clip = page.rect + (page.rect.width * MARGIN_RATIO, page.rect.height * MARGIN_RATIO,
+                        -page.rect.width * MARGIN_RATIO, -page.rect.height * MARGIN_RATIO)
+    zoom = dpi / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom).prerotate(90), clip=clip,
+                          colorspace=fitz.csGRAY, alpha=False)
+
+    samples = pix.samples
+    total = pix.width * pix.height or 1
+    # Cinza sem alfa: 1 byte por pixel, linhas sem preenchimento (stride == width)
+    ink_pixels = samples.translate(_INK_TABLE).count(1)
+    bars = samples.translate(_BAR_TABLE)
+    bar_run = re.compile(b"\x01{%d,}" % max(int(BAR_MIN_HEIGHT_INCH * dpi), 2))
+
+    bar_rows = [row for row in range(pix.height)
+                if bar_run.search(bars, row * pix.stride, row * pix.stride + pix.width)]
+    return ink_pixels / total, bar_rows
+
+
+def count_narrow_bars(bar_rows: List[int], max_width: int) -> int:
+    """
+    Maior sequência de barras estreitas separadas por espaços estreitos ao
+    longo da folha (colunas com traço alto, em ordem).
+    """
+    best = count = 0
+    run_start = previous = None
+    for row in bar_rows + [None]:
+        if row is not None and previous is not None and row == previous + 1:
+            previous = row
+            continue
+        if previous is not None:
+            # Fim de uma barra (run_start..previous)
+            if previous - run_start + 1 > max_width:
+                count = 0
+            else:
+                count += 1
+                best = max(best, count)
+            if row is not None and row - previous - 1 > max_width:
+                count = 0  # espaço largo: começa outro grupo
+        run_start = previous = row
+    return best
+
+
+def classify_page(page, dpi: int = DETECT_DPI) -> PageInkInfo:
+    """
+    Estatísticas da página em baixa resolução. Páginas candidatas a código
+    de barras são renderizadas de novo em BARCODE_SCAN_DPI para contar as
+    barras estreitas alternadas com espaços.
+    """
+    ink_ratio, bar_rows = _bar_rows(page, dpi)
+    bar_span = bar_rows[-1] - bar_rows[0] + 1 if bar_rows else 0
+    info = PageInkInfo(page.number + 1, ink_ratio, len(bar_rows), bar_span, dpi)
+
+    if info.is_barcode_candidate:
+        scan_dpi = max(dpi, BARCODE_SCAN_DPI)
+        _, scan_rows = _bar_rows(page, scan_dpi)
+        info.bar_count = count_narrow_bars(scan_rows, max(int(BAR_MAX_WIDTH_INCH * scan_dpi), 1))
+
+    return info
+
+
+def _classify_pages(doc, page_numbers: List[int], dpi: int) -> List[PageInkInfo]:
+    return [classify_page(doc[pno], dpi) for pno in page_numbers]
+
+
+def _classify_pages_worker(pdf_path: str, page_numbers: List[int], dpi: int) -> List[PageInkInfo]:
+    """Executa em processo separado: classifica um lote de páginas a partir do arquivo"""
+    doc = fitz.open(pdf_path)
+    try:
+        return _classify_pages(doc, page_numbers, dpi)
+    finally:
+        doc.close()
+
+
+def detect_page_ink(pdf_data: bytes, session_id: Optional[str] = None,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    dpi: int = DETECT_DPI) -> List[PageInkInfo]:
+    """
+    Calcula as estatísticas de todas as páginas, em ordem.
+
+    Documentos grandes são classificados em lotes por um pool de processos
+    (ocupando slots da fila global). `progress_callback` recebe
+    (páginas classificadas, total) na thread do chamador.
+    """
+    doc = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        total_pages = doc.page_count
+        if total_pages < PARALLEL_DETECT_MIN_PAGES:
+            results = []
+            for pno in range(total_pages):
+                results.append(classify_page(doc[pno], dpi))
+                if progress_callback:
+                    progress_callback(pno + 1, total_pages)
+            return results
+    finally:
+        doc.close()
+
+    batches = [list(range(start, min(start + PAGES_PER_BATCH, total_pages)))
+               for start in range(0, total_pages, PAGES_PER_BATCH)]
+
+    work_dir = tempfile.mkdtemp(prefix="jack_separators_")
+    try:
+        pdf_path = os.path.join(work_dir, "input.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_data)
+
+        results = {}
+        scheduler = get_job_scheduler()
+        with scheduler.acquire(session_id, slots=len(batches), label="separators") as ticket:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=ticket.slots, mp_context=context) as executor:
+                futures = [executor.submit(_classify_pages_worker, pdf_path, batch, dpi) for batch in batches]
+                for future in as_completed(futures):
+                    for info in future.result():
+                        results[info.page_number] = info
+                    if progress_callback:
+                        progress_callback(len(results), total_pages)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return [results[page_number] for page_number in sorted(results)]
+
+
+def find_separator_pages(infos: List[PageInkInfo], detect_blank: bool = True, detect_barcode: bool = True,
+                         blank_max_ink: float = BLANK_MAX_INK) -> List[int]:
+    """Páginas (1-indexed) classificadas como separadoras"""
+    return [info.page_number for info in infos
+            if (detect_blank and info.is_blank(blank_max_ink)) or (detect_barcode and info.is_barcode)]
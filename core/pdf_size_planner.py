@@ -0,0 +1,200 @@
+# core/pdf_size_planner.py
+
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+# Referências indiretas ("12 0 R", "12 3 R") dentro do texto de um objeto
+REF_RE = re.compile(rb"(\d+)\s+\d+\s+R\b")
+
+# Ligações que sobem na árvore (página pai, anotação -> página): não são custo da página
+PARENT_REF_RE = re.compile(rb"/(?:Parent|P)\s+\d+\s+\d+\s+R\b")
+
+# Custo fixo de um PDF (cabeçalho, catálogo, árvore de páginas, trailer) e de cada objeto na tabela xref
+BASE_OVERHEAD = 1024
+OBJECT_OVERHEAD = 20
+
+# Tentativas de ajuste quando uma parte gravada ainda passa do limite
+MAX_ADJUST_ROUNDS = 10
+
+# Folga sobre o limite calibrado, para a parte não passar por pouco
+PLAN_SAFETY_MARGIN = 0.99
+
+
+class PageCost:
+    """
+    Custo em bytes de uma página: objetos que ela referencia (conteúdo,
+    recursos, anotações) e o tamanho de cada um. Recursos compartilhados
+    (fontes, timbres) só contam uma vez por parte.
+    """
+
+    def __init__(self, page_number: int, objects: Dict[int, int]):
+        self.page_number = page_number  # 0-indexed
+        self.objects = objects  # xref -> bytes
+
+    @property
+    def standalone_size(self) -> int:
+        return sum(self.objects.values())
+
+    def marginal_size(self, present: set) -> int:
+        """Bytes acrescentados a uma parte que já contém os objetos `present`"""
+        return sum(size + OBJECT_OVERHEAD for xref, size in self.objects.items() if xref not in present)
+
+
+def _object_size(doc, xref: int) -> int:
+    size = len(doc.xref_object(xref, compressed=True))
+    if doc.xref_is_stream(xref):
+        size += len(doc.xref_stream_raw(xref) or b"")
+    return size
+
+
+def _object_refs(doc, xref: int, page_xrefs: set) -> List[int]:
+    text = doc.xref_object(xref, compressed=True).encode("latin-1", "replace")
+    text = PARENT_REF_RE.sub(b"", text)
+    # Destinos de links apontam para outras páginas: não seguir
+    return [int(ref) for ref in REF_RE.findall(text) if int(ref) not in page_xrefs]
+
+
+def estimate_page_costs(doc) -> List[PageCost]:
+    """
+    Percorre, uma vez, os objetos alcançáveis a partir de cada página e mede
+    o tamanho de cada objeto uma única vez (memoizado por xref).
+    """
+    page_xrefs = {doc.page_xref(pno) for pno in range(doc.page_count)}
+    sizes: Dict[int, int] = {}
+    refs: Dict[int, List[int]] = {}
+    costs = []
+
+    for pno in range(doc.page_count):
+        root = doc.page_xref(pno)
+        objects = {}
+        stack = [root]
+        while stack:
+            xref = stack.pop()
+            if xref in objects:
+                continue
+            if xref not in sizes:
+                try:
+                    sizes[xref] = _object_size(doc, xref)
+                    refs[xref] = _object_refs(doc, xref, page_xrefs)
+                except Exception:
+                    sizes[xref] = 0
+                    refs[xref] = []
+            objects[xref] = sizes[xref]
+            stack.extend(refs[xref])
+
+        costs.append(PageCost(pno, objects))
+
+    return costs
+
+
+def plan_size_parts(costs: List[PageCost], max_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Define as partes (intervalos de páginas 0-indexed, inclusivos) somando o
+    custo marginal de cada página até o limite. Uma página sozinha maior que
+    o limite vira uma parte própria.
+    """
+    parts = []
+    start = 0
+    present = set()
+    size = BASE_OVERHEAD
+
+    for cost in costs:
+        added = cost.marginal_size(present)
+        if present and size + added > max_bytes:
+            parts.append((start, cost.page_number - 1))
+            start = cost.page_number
+            present = set()
+            size = BASE_OVERHEAD
+            added = cost.marginal_size(present)
+
+        present.update(cost.objects)
+        size += added
+
+    if costs:
+        parts.append((start, costs[-1].page_number))
+    return parts
+
+
+def _serialize_part(doc, start: int, end: int) -> bytes:
+    part = fitz.open()
+    try:
+        part.insert_pdf(doc, from_page=start, to_page=end)
+        return part.tobytes(garbage=3, deflate=True)
+    finally:
+        part.close()
+
+
+def _prefix_estimates(costs: List[PageCost], start: int, limit: float) -> List[int]:
+    """
+    Tamanho estimado das partes start..start, start..start+1, ... enquanto
+    couberem em `limit` (a primeira página sempre entra).
+    """
+    estimates = []
+    present = set()
+    size = BASE_OVERHEAD
+    for cost in costs[start:]:
+        added = cost.marginal_size(present)
+        if estimates and size + added > limit:
+            break
+        present.update(cost.objects)
+        size += added
+        estimates.append(size)
+    return estimates
+
+
+def split_pdf_to_size(pdf_data: bytes, max_bytes: int,
+                      progress_callback: Optional[Callable[[int, int], None]] = None
+                      ) -> List[Tuple[int, int, bytes]]:
+    """
+    Divide o PDF em partes de até `max_bytes`.
+
+    O custo de cada página é calculado uma vez e as partes são montadas em
+    sequência. A razão entre o tamanho gravado e o estimado das partes já
+    feitas calibra o limite usado no planejamento (com uma pequena folga).
+    Se uma parte gravada ainda passar do limite, as últimas páginas saem
+    dela (quantas a estimativa indicar) e passam para a parte seguinte, em
+    vez de a parte ser dividida ao meio.
+
+    Returns:
+        list: [(primeira página, última página, bytes), ...] com páginas 1-indexed
+    """
+    doc = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        costs = estimate_page_costs(doc)
+        parts = []
+        written_size = 0
+        estimated_size = 0
+        start = 0
+
+        while start < len(costs):
+            ratio = written_size / estimated_size if estimated_size else 1.0
+            estimates = _prefix_estimates(costs, start, max_bytes * PLAN_SAFETY_MARGIN / ratio)
+            end = start + len(estimates) - 1
+            data = _serialize_part(doc, start, end)
+
+            for _ in range(MAX_ADJUST_ROUNDS):
+                if len(data) <= max_bytes or end == start:
+                    break
+                # Razão real/estimado desta parte decide quantas páginas saem
+                part_ratio = len(data) / estimates[end - start]
+                target = max_bytes * PLAN_SAFETY_MARGIN / part_ratio
+                new_end = start
+                while new_end + 1 < end and estimates[new_end + 1 - start] <= target:
+                    new_end += 1
+                end = new_end
+                data = _serialize_part(doc, start, end)
+
+            parts.append((start + 1, end + 1, data))
+            written_size += len(data)
+            estimated_size += estimates[end - start]
+            start = end + 1
+
+            if progress_callback:
+                remaining = plan_size_parts(costs[start:], max_bytes) if start < len(costs) else []
+                progress_callback(len(parts), len(parts) + len(remaining))
+
+        return parts
+    finally:
+        doc.close()
@@ -0,0 +1,214 @@
+# core/pdf_split_engine.py
+
+import os
+import shutil
+import zipfile
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler
+from core.utils import sanitize_filename
+
+# Abaixo disso as partes são geradas no próprio processo (partida do pool não compensa)
+PARALLEL_SPLIT_MIN_PARTS = 8
+
+# Lotes por processo: lotes menores equilibram melhor partes de tamanhos diferentes
+BATCHES_PER_WORKER = 4
+
+# (primeira página, última página, nome do arquivo); páginas 0-indexed, inclusivas
+PartSpec = Tuple[int, int, str]
+
+
+def page_ranges(page_numbers: List[int]) -> List[tuple]:
+    """Agrupa páginas em intervalos contíguos [(início, fim), ...] mantendo a ordem dada"""
+    ranges = []
+    for pno in page_numbers:
+        if ranges and pno == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], pno)
+        else:
+            ranges.append((pno, pno))
+    return ranges
+
+
+def build_part(doc, start: int, end: int) -> bytes:
+    """Copia as páginas `start`..`end` (0-indexed) em uma única chamada de insert_pdf"""
+    part = fitz.open()
+    try:
+        part.insert_pdf(doc, from_page=start, to_page=end)
+        return part.tobytes()
+    finally:
+        part.close()
+
+
+def build_pages_document(doc, page_numbers: List[int]) -> bytes:
+    """Documento com as páginas `page_numbers` (0-indexed), copiadas por intervalos"""
+    output = fitz.open()
+    try:
+        for start, end in page_ranges(page_numbers):
+            output.insert_pdf(doc, from_page=start, to_page=end)
+        return output.tobytes()
+    finally:
+        output.close()
+
+
+def outline_parts(outline: List[list], level: int, total_pages: int,
+                  base_name: str) -> List[PartSpec]:
+    """
+    Uma parte por marcador de nível até `level`, indo da página do marcador
+    até a página anterior ao próximo marcador desses níveis.
+
+    `outline` é o sumário simples do PyMuPDF ([nível, título, página 1-indexed]).
+    Páginas antes do primeiro marcador viram uma parte própria; marcadores
+    que caem na mesma página do anterior (ou sem destino) são ignorados.
+    """
+    starts = []  # (página 0-indexed, título)
+    for bm_level, title, page in outline:
+        if bm_level > level or not 1 <= page <= total_pages:
+            continue
+        if starts and page - 1 <= starts[-1][0]:
+            continue
+        starts.append((page - 1, title))
+
+    if not starts:
+        return []
+    if starts[0][0] > 0:
+        starts.insert(0, (0, "inicio"))
+
+    parts = []
+    width = len(str(len(starts)))
+    for i, (start, title) in enumerate(starts):
+        end = starts[i + 1][0] - 1 if i + 1 < len(starts) else total_pages - 1
+        name = sanitize_filename(f"{base_name}_{i + 1:0{width}d}_{title}.pdf", limit=120)
+        parts.append((start, end, name))
+    return parts
+
+
+def separator_parts(separator_pages: List[int], total_pages: int, base_name: str,
+                    keep_separators: bool = False) -> List[PartSpec]:
+    """
+    Divide o documento nas páginas separadoras (1-indexed). Separadoras
+    seguidas contam como uma só; com `keep_separators` a folha separadora
+    abre a parte seguinte, senão é descartada.
+    """
+    separators = set(separator_pages)
+    ranges = []  # (início, fim) 0-indexed
+    start = None
+    has_content = False
+    for pno in range(total_pages):
+        if pno + 1 not in separators:
+            if start is None:
+                start = pno
+            has_content = True
+            continue
+
+        if has_content:
+            ranges.append((start, pno - 1))
+            start = None
+            has_content = False
+        if keep_separators and start is None:
+            start = pno
+        elif not keep_separators:
+            start = None
+
+    # Separadoras no fim do lote não geram parte
+    if has_content:
+        ranges.append((start, total_pages - 1))
+
+    width = len(str(len(ranges)))
+    return [(s, e, f"{base_name}_{i + 1:0{width}d}_pags_{s + 1}-{e + 1}.pdf")
+            for i, (s, e) in enumerate(ranges)]
+
+
+def _build_parts_worker(pdf_path: str, parts: List[PartSpec]) -> List[Tuple[str, bytes]]:
+    """Executa em processo separado: gera um lote de partes a partir do arquivo"""
+    doc = fitz.open(pdf_path)
+    try:
+        return [(name, build_part(doc, start, end)) for start, end, name in parts]
+    finally:
+        doc.close()
+
+
+def write_parts_to_zip(pdf_data: bytes, parts: List[PartSpec], zip_file: zipfile.ZipFile,
+                       session_id: Optional[str] = None,
+                       progress_callback: Optional[Callable[[int, int], None]] = None):
+    """
+    Gera as partes e grava cada uma no ZIP assim que fica pronta.
+
+    Com muitas partes, os lotes são distribuídos em um pool de processos
+    (ocupando slots da fila global) que leem o PDF de um arquivo temporário.
+    `progress_callback` recebe (partes gravadas, total) na thread do chamador.
+    """
+    if len(parts) < PARALLEL_SPLIT_MIN_PARTS:
+        doc = fitz.open(stream=pdf_data, filetype="pdf")
+        try:
+            for done, (start, end, name) in enumerate(parts, start=1):
+                zip_file.writestr(name, build_part(doc, start, end))
+                if progress_callback:
+                    progress_callback(done, len(parts))
+        finally:
+            doc.close()
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="jack_split_")
+    try:
+        pdf_path = os.path.join(work_dir, "input.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_data)
+
+        scheduler = get_job_scheduler()
+        with scheduler.acquire(session_id, slots=len(parts), label="split") as ticket:
+            batch_count = min(len(parts), ticket.slots * BATCHES_PER_WORKER)
+            batch_size = -(-len(parts) // batch_count)
+            batches = [parts[i:i + batch_size] for i in range(0, len(parts), batch_size)]
+
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=ticket.slots, mp_context=context) as executor:
+                futures = [executor.submit(_build_parts_worker, pdf_path, batch) for batch in batches]
+                done = 0
+                for future in as_completed(futures):
+                    for name, data in future.result():
+                        zip_file.writestr(name, data)
+                        done += 1
+                    if progress_callback:
+                        progress_callback(done, len(parts))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def remove_pages(pdf_data: bytes, page_numbers: List[int], incremental: bool = False) -> bytes:
+    """
+    Remove as páginas `page_numbers` (0-indexed) do próprio documento, sem
+    copiar as páginas mantidas.
+
+    Por padrão o PDF é regravado sem os objetos órfãos: conteúdo, imagens e
+    anotações das páginas removidas não ficam no arquivo. Com `incremental`
+    (opt-in), só a atualização (nova árvore de páginas) é anexada ao final
+    do arquivo original: o custo acompanha o número de páginas removidas,
+    mas o conteúdo delas continua no arquivo e pode ser recuperado.
+    """
+    work_dir = tempfile.mkdtemp(prefix="jack_remove_")
+    try:
+        pdf_path = os.path.join(work_dir, "input.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_data)
+
+        doc = fitz.open(pdf_path)
+        try:
+            doc.delete_pages(sorted(set(page_numbers)))
+
+            if incremental and doc.can_save_incrementally():
+                doc.saveIncr()
+                doc.close()
+                with open(pdf_path, "rb") as f:
+                    return f.read()
+
+            return doc.tobytes(garbage=1, deflate=True)
+        finally:
+            if not doc.is_closed:
+                doc.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,230 @@
+# core/pdf_table_export.py
+
+import os
+import re
+import shutil
+import tempfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler
+
+SHEET_LAYOUT_SINGLE = "single"  # tudo em uma planilha, página após página
+SHEET_LAYOUT_PAGE = "page"  # uma planilha por página
+SHEET_LAYOUT_TABLE = "table"  # uma planilha por tabela (só as tabelas)
+
+# find_tables() leva dezenas de milissegundos por página: o pool compensa cedo
+PARALLEL_TABLES_MIN_PAGES = 40
+TABLE_CHUNK_PAGES = 20
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Limites do Excel
+MAX_SHEET_ROWS = 1048576
+MAX_CELL_CHARS = 32767
+MAX_SHEET_TITLE = 31
+INVALID_TITLE_RE = re.compile(r"[\[\]:*?/\\]")
+
+# Caracteres de controle que o openpyxl recusa em células
+ILLEGAL_CHARACTERS_RE = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+
+
+class PageTables:
+    """
+    Conteúdo de uma página para a planilha: tabelas detectadas e, quando
+    não há tabelas (ou a detecção está desligada), as linhas de texto.
+    """
+
+    def __init__(self, page_number: int, tables: List[List[list]], lines: List[str]):
+        self.page_number = page_number  # 1-indexed
+        self.tables = tables  # [tabela][linha][coluna] -> str ou None
+        self.lines = lines
+
+
+def extract_page_tables(page, detect_tables: bool = True) -> PageTables:
+    tables = []
+    if detect_tables:
+        try:
+            tables = [table.extract() for table in page.find_tables().tables]
+        except Exception as e:
+            print(f"[WARNING] Tabelas da página {page.number + 1} não detectadas: {e}")
+
+    lines = []
+    if not tables:
+        lines = [line.strip() for line in page.get_text("text", sort=True).split('\n') if line.strip()]
+
+    return PageTables(page.number + 1, tables, lines)
+
+
+def _extract_tables_worker(pdf_path: str, start: int, end: int, detect_tables: bool) -> List[PageTables]:
+    """Executa em processo separado: detecta as tabelas de um bloco de páginas"""
+    doc = fitz.open(pdf_path)
+    try:
+        return [extract_page_tables(doc[pno], detect_tables) for pno in range(start, end + 1)]
+    finally:
+        doc.close()
+
+
+def iter_page_tables(pdf_data: bytes, detect_tables: bool = True,
+                     session_id: Optional[str] = None) -> Iterator[PageTables]:
+    """
+    Gera o conteúdo de cada página, em ordem.
+
+    Documentos grandes são divididos em blocos de páginas processados em um
+    pool de processos (ocupando slots da fila global); só uma janela de
+    blocos fica em andamento.
+    """
+    doc = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        total_pages = doc.page_count
+        if total_pages < PARALLEL_TABLES_MIN_PAGES or not detect_tables:
+            for pno in range(total_pages):
+                yield extract_page_tables(doc[pno], detect_tables)
+            return
+    finally:
+        doc.close()
+
+    chunks = deque((start, min(start + TABLE_CHUNK_PAGES, total_pages) - 1)
+                   for start in range(0, total_pages, TABLE_CHUNK_PAGES))
+
+    work_dir = tempfile.mkdtemp(prefix="jack_tables_")
+    try:
+        pdf_path = os.path.join(work_dir, "input.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_data)
+
+        scheduler = get_job_scheduler()
+        with scheduler.acquire(session_id, slots=len(chunks), label="tables") as ticket:
+            window = ticket.slots * CHUNKS_IN_FLIGHT_PER_WORKER
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=ticket.slots, mp_context=context) as executor:
+                pending = deque()
+                while chunks or pending:
+                    while chunks and len(pending) < window:
+                        start, end = chunks.popleft()
+                        pending.append(executor.submit(_extract_tables_worker, pdf_path, start, end, detect_tables))
+                    for page_tables in pending.popleft().result():
+                        yield page_tables
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _cell_value(value):
+    if value is None:
+        return None
+    value = ILLEGAL_CHARACTERS_RE.sub("", str(value))
+    return value[:MAX_CELL_CHARS] if value else None
+
+
+class _SheetWriter:
+    """
+    Planilhas do workbook write-only: as linhas são gravadas em sequência
+    e não ficam na memória. Uma planilha cheia continua em outra.
+    """
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self.titles = set()
+        self.sheet = None
+        self.title = None
+        self.rows = 0
+
+    def _unique_title(self, title: str) -> str:
+        title = INVALID_TITLE_RE.sub("", title)[:MAX_SHEET_TITLE] or "Planilha"
+        candidate = title
+        counter = 2
+        while candidate.lower() in self.titles:
+            suffix = f" ({counter})"
+            candidate = f"{title[:MAX_SHEET_TITLE - len(suffix)]}{suffix}"
+            counter += 1
+        self.titles.add(candidate.lower())
+        return candidate
+
+    def new_sheet(self, title: str):
+        self.title = title
+        self.sheet = self.workbook.create_sheet(self._unique_title(title))
+        self.rows = 0
+
+    def append(self, row: list = ()):
+        if self.rows >= MAX_SHEET_ROWS:
+            self.new_sheet(self.title)
+        self.sheet.append([_cell_value(value) for value in row])
+        self.rows += 1
+
+
+def export_tables_to_excel(pdf_data: bytes, output_path: str, detect_tables: bool = True,
+                           sheet_layout: str = SHEET_LAYOUT_SINGLE, session_id: Optional[str] = None,
+                           progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Grava o conteúdo do PDF em uma planilha Excel em `output_path`.
+
+    Usa o modo write-only do openpyxl: cada linha vai para o arquivo assim
+    que é escrita, então a memória não cresce com o número de células.
+    Tabelas são detectadas com `find_tables()` do PyMuPDF.
+
+    Returns:
+        int: Quantidade de tabelas encontradas
+    """
+    import openpyxl
+
+    with fitz.open(stream=pdf_data, filetype="pdf") as doc:
+        total_pages = doc.page_count
+
+    workbook = openpyxl.Workbook(write_only=True)
+    writer = _SheetWriter(workbook)
+    # Modo por tabela: o texto só entra se o documento não tiver nenhuma tabela
+    text_pages = []
+    total_tables = 0
+
+    if sheet_layout == SHEET_LAYOUT_SINGLE:
+        writer.new_sheet("PDF Content")
+
+    for page in iter_page_tables(pdf_data, detect_tables, session_id):
+        if sheet_layout == SHEET_LAYOUT_TABLE:
+            for table_number, table in enumerate(page.tables, 1):
+                writer.new_sheet(f"Pág {page.page_number} - Tabela {table_number}")
+                for row in table:
+                    writer.append(row)
+            if page.tables:
+                text_pages = None
+            elif text_pages is not None and page.lines:
+                text_pages.append(page)
+        else:
+            if sheet_layout == SHEET_LAYOUT_PAGE:
+                writer.new_sheet(f"Página {page.page_number}")
+            else:
+                writer.append([f"=== Página {page.page_number} ==="])
+                writer.append()
+
+            for table in page.tables:
+                for row in table:
+                    writer.append(row)
+                writer.append()  # Espaço entre tabelas
+            for line in page.lines:
+                writer.append([line])
+
+            if sheet_layout == SHEET_LAYOUT_SINGLE:
+                writer.append()
+                writer.append()  # Espaço entre páginas
+
+        total_tables += len(page.tables)
+        if progress_callback:
+            progress_callback(page.page_number, total_pages)
+
+    if sheet_layout == SHEET_LAYOUT_TABLE and not total_tables:
+        # Nenhuma tabela no documento: o texto vai para uma planilha só
+        writer.new_sheet("PDF Content")
+        for page in text_pages:
+            writer.append([f"=== Página {page.page_number} ==="])
+            for line in page.lines:
+                writer.append([line])
+            writer.append()
+
+    if writer.sheet is None:
+        writer.new_sheet("PDF Content")
+
+    workbook.save(output_path)
+    return total_tables
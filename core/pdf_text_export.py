@@ -0,0 +1,144 @@
+# core/pdf_text_export.py
+
+import os
+import shutil
+import tempfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler
+
+# Extração de texto custa poucos milissegundos por página: o pool só
+# compensa a partida dos processos em documentos grandes
+PARALLEL_TEXT_MIN_PAGES = 300
+TEXT_CHUNK_PAGES = 100
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Blocos de texto do get_text("blocks"): (x0, y0, x1, y1, texto, nº do bloco, tipo)
+TEXT_BLOCK_TYPE = 0
+
+
+def page_header(page_number: int) -> str:
+    return f"--- Página {page_number} ---\n"
+
+
+def extract_page_text(page, preserve_layout: bool = True) -> str:
+    """
+    Texto de uma página.
+
+    Com `preserve_layout`, os blocos vêm em ordem de leitura (de cima para
+    baixo, da esquerda para a direita), mantendo as quebras de linha de cada
+    bloco e uma linha em branco entre blocos. Sem ele, o texto vira um único
+    parágrafo com espaços simples.
+    """
+    if not preserve_layout:
+        return ' '.join(page.get_text("text").split())
+
+    blocks = [block[4].strip() for block in page.get_text("blocks", sort=True)
+              if block[6] == TEXT_BLOCK_TYPE]
+    return '\n\n'.join(block for block in blocks if block)
+
+
+def extract_pages_text(doc, start: int, end: int, preserve_layout: bool = True,
+                       include_page_numbers: bool = False) -> Tuple[str, int]:
+    """
+    Texto das páginas `start`..`end` (0-indexed, inclusivas), já formatado
+    para o arquivo, e a quantidade de caracteres extraídos (sem cabeçalhos).
+    """
+    chunks = []
+    text_chars = 0
+    for pno in range(start, end + 1):
+        if include_page_numbers:
+            chunks.append(page_header(pno + 1))
+        text = extract_page_text(doc[pno], preserve_layout)
+        if text:
+            chunks.append(text)
+            chunks.append("\n")
+            text_chars += len(text)
+        chunks.append("\n")
+    return ''.join(chunks), text_chars
+
+
+def _extract_text_worker(pdf_path: str, start: int, end: int, preserve_layout: bool,
+                         include_page_numbers: bool) -> Tuple[str, int]:
+    """Executa em processo separado: extrai o texto de um bloco de páginas"""
+    doc = fitz.open(pdf_path)
+    try:
+        return extract_pages_text(doc, start, end, preserve_layout, include_page_numbers)
+    finally:
+        doc.close()
+
+
+def iter_text_chunks(pdf_data: bytes, preserve_layout: bool = True, include_page_numbers: bool = False,
+                     session_id: Optional[str] = None) -> Iterator[tuple]:
+    """
+    Gera (última página do bloco, texto do bloco, caracteres extraídos) em ordem.
+
+    Documentos grandes são divididos em blocos de páginas extraídos em um
+    pool de processos (ocupando slots da fila global); só uma janela de
+    blocos fica em andamento.
+    """
+    doc = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        total_pages = doc.page_count
+        if total_pages < PARALLEL_TEXT_MIN_PAGES:
+            for start in range(0, total_pages, TEXT_CHUNK_PAGES):
+                end = min(start + TEXT_CHUNK_PAGES, total_pages) - 1
+                yield (end + 1,) + extract_pages_text(doc, start, end, preserve_layout, include_page_numbers)
+            return
+    finally:
+        doc.close()
+
+    chunks = deque((start, min(start + TEXT_CHUNK_PAGES, total_pages) - 1)
+                   for start in range(0, total_pages, TEXT_CHUNK_PAGES))
+
+    work_dir = tempfile.mkdtemp(prefix="jack_text_")
+    try:
+        pdf_path = os.path.join(work_dir, "input.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_data)
+
+        scheduler = get_job_scheduler()
+        with scheduler.acquire(session_id, slots=len(chunks), label="text") as ticket:
+            window = ticket.slots * CHUNKS_IN_FLIGHT_PER_WORKER
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=ticket.slots, mp_context=context) as executor:
+                pending = deque()
+                while chunks or pending:
+                    while chunks and len(pending) < window:
+                        start, end = chunks.popleft()
+                        future = executor.submit(_extract_text_worker, pdf_path, start, end,
+                                                 preserve_layout, include_page_numbers)
+                        pending.append((end, future))
+                    end, future = pending.popleft()
+                    yield (end + 1,) + future.result()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def export_text(pdf_data: bytes, output_path: str, preserve_layout: bool = True,
+                include_page_numbers: bool = False, session_id: Optional[str] = None,
+                progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Grava o texto do PDF em `output_path` (UTF-8), bloco a bloco, sem montar
+    o texto inteiro na memória.
+
+    Returns:
+        int: Caracteres extraídos, sem os cabeçalhos de página (0 = PDF sem texto)
+    """
+    with fitz.open(stream=pdf_data, filetype="pdf") as doc:
+        total_pages = doc.page_count
+
+    text_chars = 0
+    with open(output_path, "w", encoding="utf-8") as output:
+        for pages_done, chunk, chunk_chars in iter_text_chunks(pdf_data, preserve_layout,
+                                                               include_page_numbers, session_id):
+            output.write(chunk)
+            text_chars += chunk_chars
+            if progress_callback:
+                progress_callback(pages_done, total_pages)
+    return text_chars
@@ -0,0 +1,116 @@
+# core/pdf_text_layer.py
+
+import fitz  # PyMuPDF
+from typing import List
+
+
+# Abaixo disso a página é considerada sem camada de texto
+MIN_TEXT_CHARS = 20
+
+# Página coberta por imagem com pouco texto = digitalização
+# (cobre o carimbo/rodapé digital que o PJe adiciona sobre páginas escaneadas)
+SCANNED_MIN_IMAGE_COVERAGE = 0.6
+SCANNED_MAX_TEXT_CHARS = 300
+
+# Palavras que indicam uma página de sumário/índice
+SUMMARY_KEYWORDS = ['sumário', 'índice', 'contents', 'index', 'conteúdo']
+# O sumário fica no início do documento: páginas seguintes citam "índice"
+# (ex.: índice de correção) e não contam
+SUMMARY_MAX_PAGES = 5
+
+
+class PageTextInfo:
+    """
+    Resumo da camada de texto de uma página.
+    """
+
+    def __init__(self, page_number: int, text_chars: int, image_coverage: float, fonts: List[str],
+                 has_summary_keyword: bool = False):
+        self.page_number = page_number  # 1-indexed
+        self.text_chars = text_chars
+        self.image_coverage = image_coverage
+        self.fonts = fonts
+        self.has_summary_keyword = has_summary_keyword
+
+    @property
+    def has_text(self) -> bool:
+        return self.text_chars >= MIN_TEXT_CHARS
+
+    @property
+    def is_scanned(self) -> bool:
+        if self.image_coverage >= SCANNED_MIN_IMAGE_COVERAGE and self.text_chars < SCANNED_MAX_TEXT_CHARS:
+            return True
+        return not self.has_text and self.image_coverage > 0
+
+    @property
+    def needs_ocr(self) -> bool:
+        return self.is_scanned
+
+    def to_dict(self) -> dict:
+        return {
+            "pagina": self.page_number,
+            "text_chars": self.text_chars,
+            "image_coverage": round(self.image_coverage, 3),
+            "fonts": self.fonts,
+            "has_text": self.has_text,
+            "is_scanned": self.is_scanned,
+            "has_summary_keyword": self.has_summary_keyword
+        }
+
+
+class TextLayerClassifier:
+    """
+    Classifica cada página do PDF como digital (com texto) ou digitalizada.
+    """
+
+    def __init__(self, pdf_data: bytes):
+        self.pdf_data = pdf_data
+        self.pages: List[PageTextInfo] = []
+
+    @staticmethod
+    def classify_page(page) -> PageTextInfo:
+        page_area = abs(page.rect) or 1.0
+
+        text = page.get_text("text").strip()
+        has_summary_keyword = (page.number < SUMMARY_MAX_PAGES
+                               and any(keyword in text.lower() for keyword in SUMMARY_KEYWORDS))
+
+        # Área coberta por imagens (limitada à página, sobreposições ignoradas)
+        covered = 0.0
+        for info in page.get_image_info():
+            bbox = fitz.Rect(info["bbox"]) & page.rect
+            if not bbox.is_empty:
+                covered += abs(bbox)
+        image_coverage = min(covered / page_area, 1.0)
+
+        fonts = sorted({font[3] for font in page.get_fonts() if font[3]})
+
+        return PageTextInfo(page.number + 1, len(text), image_coverage, fonts, has_summary_keyword)
+
+    def classify(self) -> List[PageTextInfo]:
+        self.pages = get_text_layer_map(self.pdf_data)
+        return self.pages
+
+    def pages_needing_ocr(self) -> List[int]:
+        """Páginas (1-indexed) sem camada de texto utilizável"""
+        if not self.pages:
+            self.classify()
+        return [info.page_number for info in self.pages if info.needs_ocr]
+
+
+def get_text_layer_map(pdf_data: bytes) -> List[PageTextInfo]:
+    """
+    Mapa da camada de texto de todas as páginas, calculado uma vez por
+    conteúdo (hash) junto com o PdfProbe e compartilhado por preview,
+    validação, conversor e OCR.
+    """
+    from core.pdf_probe import get_pdf_probe
+    probe = get_pdf_probe(pdf_data)
+    if probe.error:
+        raise ValueError(probe.error)
+    return list(probe.text_map)
+
+
+def document_needs_ocr(pdf_data: bytes) -> bool:
+    """True se alguma página for digitalizada (sem camada de texto utilizável)"""
+    return any(info.needs_ocr for info in get_text_layer_map(pdf_data))
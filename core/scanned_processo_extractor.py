@@ -0,0 +1,364 @@
+# core/scanned_processo_extractor.py
+
+import re
+import unicodedata
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+from core.job_scheduler import get_job_scheduler
+from core.ocr_inprocess import inprocess_ocr_available
+from core.pdf_text_layer import get_text_layer_map
+
+# Busca do Sumário: cabeçalho das últimas páginas em baixa resolução
+SUMMARY_SEARCH_PAGES = 30
+SUMMARY_HEADER_FRACTION = 0.25  # Fração superior da página onde fica o título
+SUMMARY_HEADER_DPI = 100
+
+# Páginas do Sumário: resolução cheia para ler IDs e datas sem erros
+SUMMARY_DPI = 300
+
+# Faixa do carimbo com o ID do documento (mesma região do PDFPageBlockExtractor)
+STRIP_DPI = 150
+FOOTER_STRIP_HEIGHT = 100
+LANDSCAPE_STRIP_X0 = 500
+RIGHT_MARGIN_WIDTH = 60
+
+# Páginas por tarefa enviada ao pool de processos
+STRIP_BATCH_SIZE = 10
+
+DATE_RE = re.compile(r"\d{2}/\d{2}/\d{4}(?:\s+\d{2}:\d{2}(?::\d{2})?)?")
+ROW_RE = re.compile(r"^(\d{4,})\s+(\d{2}/\d{2}/\d{4}(?:\s+\d{2}:\d{2})?)\s+(.+)$")
+ID_CANDIDATE_RE = re.compile(r"\d{6,}")
+
+
+def _normalize(text: str) -> str:
+    """Maiúsculas sem acentos (o OCR costuma perder o acento de SUMÁRIO)"""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).upper()
+
+
+def _ocr_clip(page, clip: fitz.Rect, dpi: int, language: str, rotate: int = 0) -> List[tuple]:
+    """
+    Renderiza apenas `clip` em tons de cinza e roda o OCR sobre a imagem.
+
+    Returns:
+        list: Palavras (x0, y0, x1, y1, texto) em coordenadas da página.
+            Com `rotate`, as caixas são aproximadas pela própria região.
+    """
+    zoom = dpi / 72
+    matrix = fitz.Matrix(zoom, zoom).prerotate(rotate)
+    pix = page.get_pixmap(matrix=matrix, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+    pix.set_dpi(dpi, dpi)
+
+    ocr_doc = fitz.open("pdf", pix.pdfocr_tobytes(language=language))
+    try:
+        ocr_page = ocr_doc[0]
+        words = ocr_page.get_text("words")
+        scale_x = clip.width / ocr_page.rect.width if ocr_page.rect.width else 1
+        scale_y = clip.height / ocr_page.rect.height if ocr_page.rect.height else 1
+    finally:
+        ocr_doc.close()
+
+    if rotate:
+        return [(clip.x0, clip.y0, clip.x1, clip.y1, w[4]) for w in words]
+
+    return [
+        (clip.x0 + w[0] * scale_x, clip.y0 + w[1] * scale_y,
+         clip.x0 + w[2] * scale_x, clip.y0 + w[3] * scale_y, w[4])
+        for w in words
+    ]
+
+
+def _group_lines(words: List[tuple]) -> List[List[tuple]]:
+    """Agrupa palavras em linhas pela posição vertical, cada linha ordenada por x"""
+    if not words:
+        return []
+
+    heights = sorted(w[3] - w[1] for w in words)
+    tolerance = max(heights[len(heights) // 2] * 0.5, 1)
+
+    lines = []
+    for word in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+        center = (word[1] + word[3]) / 2
+        if lines and abs(center - lines[-1][0]) <= tolerance:
+            lines[-1][1].append(word)
+        else:
+            lines.append([center, [word]])
+
+    return [sorted(line, key=lambda w: w[0]) for _, line in lines]
+
+
+# ----------------------------------------------------------------------
+# Workers do pool de processos (nível de módulo, sem Streamlit)
+# ----------------------------------------------------------------------
+
+def _find_summary_worker(pdf_path: str, page_indexes: List[int], language: str) -> List[int]:
+    """Páginas (0-indexed) cujo cabeçalho contém SUMÁRIO"""
+    found = []
+    doc = fitz.open(pdf_path)
+    try:
+        for pno in page_indexes:
+            page = doc[pno]
+            rect = page.rect
+            clip = fitz.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * SUMMARY_HEADER_FRACTION)
+            words = _ocr_clip(page, clip, SUMMARY_HEADER_DPI, language)
+            if "SUMARIO" in _normalize(" ".join(w[4] for w in words)):
+                found.append(pno)
+    finally:
+        doc.close()
+    return found
+
+
+def _summary_words_worker(pdf_path: str, pno: int, language: str) -> List[tuple]:
+    """Palavras de uma página do Sumário em resolução cheia"""
+    doc = fitz.open(pdf_path)
+    try:
+        page = doc[pno]
+        return _ocr_clip(page, page.rect, SUMMARY_DPI, language)
+    finally:
+        doc.close()
+
+
+def _strip_blocks_worker(pdf_path: str, page_indexes: List[int], language: str) -> List[Dict]:
+    """
+    OCR da faixa do carimbo (rodapé ou margem direita) de cada página.
+
+    Returns:
+        list: Entradas no formato de PDFPageBlockExtractor.blocks_per_page
+    """
+    results = []
+    doc = fitz.open(pdf_path)
+    try:
+        for pno in page_indexes:
+            page = doc[pno]
+            rect = page.rect
+            landscape = rect.width > rect.height
+
+            if landscape:
+                clip = fitz.Rect(min(LANDSCAPE_STRIP_X0, rect.x1 - RIGHT_MARGIN_WIDTH), rect.y0, rect.x1, rect.y1)
+                words = _ocr_clip(page, clip, STRIP_DPI, language)
+            else:
+                clip = fitz.Rect(rect.x0, rect.y1 - FOOTER_STRIP_HEIGHT, rect.x1, rect.y1)
+                words = _ocr_clip(page, clip, STRIP_DPI, language)
+
+                # Sem número no rodapé: carimbo vertical na margem direita
+                if not any(ID_CANDIDATE_RE.search(w[4]) for w in words):
+                    margin = fitz.Rect(rect.x1 - RIGHT_MARGIN_WIDTH, rect.y0, rect.x1, rect.y1)
+                    # rotate=90 deixa o texto escrito de baixo para cima na horizontal
+                    words = _ocr_clip(page, margin, STRIP_DPI, language, rotate=90)
+
+            blocos = []
+            for line in _group_lines(words):
+                blocos.append({
+                    "x0": min(w[0] for w in line),
+                    "y0": min(w[1] for w in line),
+                    "x1": max(w[2] for w in line),
+                    "y1": max(w[3] for w in line),
+                    "texto": " ".join(w[4] for w in line).strip()
+                })
+
+            results.append({
+                "pagina": pno + 1,
+                "orientacao": "paisagem" if landscape else "retrato",
+                "max_x": rect.x1,
+                "max_y": rect.y1,
+                "blocos_filtrados": blocos,
+                "ocr": True
+            })
+    finally:
+        doc.close()
+    return results
+
+
+class ScannedProcessoExtractor:
+    """
+    Recupera Sumário e blocos de ID de processos digitalizados sem aplicar
+    OCR no documento inteiro.
+
+    - Sumário: procura o título no cabeçalho das últimas páginas em baixa
+      resolução e lê apenas as páginas do Sumário em resolução cheia
+    - Blocos: lê apenas a faixa do carimbo (rodapé ou margem direita) das
+      páginas digitalizadas, em baixa resolução
+
+    Os resultados têm o mesmo formato de PDFIndexExtractor e
+    PDFPageBlockExtractor, para uso direto no PageRangeExtractor.
+    """
+
+    def __init__(self, pdf_path: str, language: str = "por", session_id: Optional[str] = None):
+        self.pdf_path = pdf_path
+        self.language = language
+        self.session_id = session_id
+        self._scanned_pages = None
+
+    @property
+    def available(self) -> bool:
+        """OCR em processo disponível (Tesseract + idioma instalados)"""
+        return inprocess_ocr_available(self.language)
+
+    def scanned_pages(self) -> List[int]:
+        """Páginas digitalizadas (0-indexed)"""
+        if self._scanned_pages is None:
+            # Mapa compartilhado: normalmente já calculado pelo preview/validação
+            with open(self.pdf_path, "rb") as f:
+                pages = get_text_layer_map(f.read())
+            self._scanned_pages = [info.page_number - 1 for info in pages if info.is_scanned]
+        return self._scanned_pages
+
+    def _run_batches(self, worker, batches: List[tuple], progress_callback=None) -> List:
+        """
+        Executa `worker(pdf_path, *args)` para cada lote em um pool de processos,
+        ocupando slots da fila global. Retorna os resultados na ordem dos lotes.
+        """
+        if not batches:
+            return []
+
+        scheduler = get_job_scheduler()
+        with scheduler.acquire(self.session_id, slots=len(batches), label="slicer-ocr") as ticket:
+            context = multiprocessing.get_context("spawn")
+            results = [None] * len(batches)
+            with ProcessPoolExecutor(max_workers=ticket.slots, mp_context=context) as executor:
+                futures = {
+                    executor.submit(worker, self.pdf_path, *args): index
+                    for index, args in enumerate(batches)
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    results[futures[future]] = future.result()
+                    if progress_callback:
+                        progress_callback(done, len(batches))
+        return results
+
+    # ------------------------------------------------------------------
+    # Sumário
+    # ------------------------------------------------------------------
+
+    def find_summary_start_page(self) -> int:
+        """Última página (0-indexed) com SUMÁRIO no cabeçalho, ou -1"""
+        scanned = set(self.scanned_pages())
+        doc = fitz.open(self.pdf_path)
+        total_pages = doc.page_count
+        doc.close()
+
+        candidates = [
+            pno for pno in range(max(0, total_pages - SUMMARY_SEARCH_PAGES), total_pages)
+            if pno in scanned
+        ]
+        batches = [
+            (candidates[i:i + STRIP_BATCH_SIZE], self.language)
+            for i in range(0, len(candidates), STRIP_BATCH_SIZE)
+        ]
+
+        found = [pno for result in self._run_batches(_find_summary_worker, batches) for pno in result]
+        if not found:
+            return -1
+
+        start_page = max(found)
+        print(f"[INFO] Sumário (OCR) encontrado na página {start_page + 1}")
+        return start_page
+
+    def _parse_summary_lines(self, lines: List[List[tuple]], columns: Dict) -> List[Dict]:
+        from core.pdf_index_extractor import PDFIndexExtractor
+        validator = PDFIndexExtractor(self.pdf_path)
+
+        rows = []
+        for line in lines:
+            text = " ".join(w[4] for w in line)
+            normalized = _normalize(text)
+
+            # Cabeçalho da tabela: guarda a posição das colunas
+            if "DATA" in normalized and ("DOCUMENTO" in normalized or "TIPO" in normalized):
+                for word in line:
+                    key = _normalize(word[4]).strip(".:")
+                    if key in ("DATA", "DOCUMENTO", "TIPO"):
+                        columns[key] = word[0]
+                continue
+
+            if columns.get("DATA") and columns.get("DOCUMENTO"):
+                cells = {"ID": [], "DATA": [], "DOCUMENTO": [], "TIPO": []}
+                for word in line:
+                    # Margem de 5pt: o OCR desloca levemente o início das palavras
+                    x = word[0] + 5
+                    if x < columns["DATA"]:
+                        cells["ID"].append(word[4])
+                    elif x < columns["DOCUMENTO"]:
+                        cells["DATA"].append(word[4])
+                    elif columns.get("TIPO") and x >= columns["TIPO"]:
+                        cells["TIPO"].append(word[4])
+                    else:
+                        cells["DOCUMENTO"].append(word[4])
+                id_val = " ".join(cells["ID"]).strip()
+                data_val = " ".join(cells["DATA"]).strip()
+                doc_val = " ".join(cells["DOCUMENTO"]).strip()
+                type_val = " ".join(cells["TIPO"]).strip()
+            else:
+                match = ROW_RE.match(text.strip())
+                if match:
+                    id_val, data_val, doc_val = match.groups()
+                    type_val = ""
+                else:
+                    id_val, data_val, doc_val, type_val = "", "", text.strip(), ""
+
+            date_match = DATE_RE.search(data_val)
+            if id_val and date_match and validator.is_valid_date(date_match.group(0)):
+                rows.append({
+                    "id": id_val,
+                    "data": date_match.group(0),
+                    "documento": doc_val,
+                    "tipo": type_val,
+                    "pagina_inicial": "",
+                    "pagina_final": ""
+                })
+            elif rows and not id_val and (doc_val or type_val):
+                # Título do documento quebrado em mais de uma linha
+                if doc_val:
+                    rows[-1]["documento"] = f"{rows[-1]['documento']} {doc_val}".strip()
+                if type_val:
+                    rows[-1]["tipo"] = f"{rows[-1]['tipo']} {type_val}".strip()
+
+        return rows
+
+    def extract_index(self) -> List[Dict]:
+        """Sumário no formato de PDFIndexExtractor.extract_index()"""
+        start_page = self.find_summary_start_page()
+        if start_page == -1:
+            print("[INFO] Nenhum Sumário encontrado (OCR).")
+            return []
+
+        doc = fitz.open(self.pdf_path)
+        total_pages = doc.page_count
+        doc.close()
+
+        batches = [(pno, self.language) for pno in range(start_page, total_pages)]
+        pages_words = self._run_batches(_summary_words_worker, batches)
+
+        index = []
+        columns = {}
+        for words in pages_words:
+            index.extend(self._parse_summary_lines(_group_lines(words), columns))
+
+        print(f"[INFO] Total de itens no Sumário (OCR) extraídos: {len(index)}")
+        return index
+
+    # ------------------------------------------------------------------
+    # Blocos de ID
+    # ------------------------------------------------------------------
+
+    def extract_blocks(self, page_indexes: Optional[List[int]] = None, progress_callback=None) -> List[Dict]:
+        """
+        Blocos da faixa do carimbo das páginas digitalizadas, no formato
+        de PDFPageBlockExtractor.blocks_per_page.
+        """
+        if page_indexes is None:
+            page_indexes = self.scanned_pages()
+
+        batches = [
+            (page_indexes[i:i + STRIP_BATCH_SIZE], self.language)
+            for i in range(0, len(page_indexes), STRIP_BATCH_SIZE)
+        ]
+        results = self._run_batches(_strip_blocks_worker, batches, progress_callback)
+        blocks = [entry for batch in results for entry in batch]
+
+        print(f"[INFO] Faixas de ID lidas por OCR: {len(blocks)} páginas")
+        return blocks
@@ -70,9 +70,10 @@ class SessionManager:
         filename = f"{file_id}_{uploaded_file.name}"
         file_path = upload_dir / filename
         
-        # Salvar arquivo
+        # Salvar arquivo (cópia em blocos, sem duplicar o conteúdo em memória)
+        uploaded_file.seek(0)
         with open(file_path, 'wb') as f:
-            f.write(uploaded_file.getvalue())
+            shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
         
         # Registrar na sessão
         if session_id not in self.sessions:
@@ -86,7 +87,7 @@ class SessionManager:
             'file_id': file_id,
             'original_name': uploaded_file.name,
             'path': str(file_path),
-            'size': len(uploaded_file.getvalue()),
+            'size': file_path.stat().st_size,
             'uploaded_at': time.time()
         })
         
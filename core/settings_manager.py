@@ -33,11 +33,14 @@ class SettingsManager:
             "max_threads": 4,
             "chunk_size": 1024,
             "compress_output": True,
+            "job_nice_level": 10,  # prioridade dos processos externos (0 = normal)
+            "job_memory_limit": 0,  # MB por processo externo (0 = sem limite)
             
             # Cache
             "enable_cache": True,
             "cache_size": 100,  # MB
             "cache_ttl": 3600,  # segundos
+            "ocr_cache_size": 500,  # MB em disco
             
             # Arquivos temporários
             "temp_file_retention": 3600,  # segundos
@@ -122,9 +125,12 @@ class SettingsManager:
             "max_threads": 4,
             "chunk_size": 1024,
             "compress_output": True,
+            "job_nice_level": 10,
+            "job_memory_limit": 0,
             "enable_cache": True,
             "cache_size": 100,
             "cache_ttl": 3600,
+            "ocr_cache_size": 500,
             "temp_file_retention": 3600,
             "max_upload_size": 100,
             "session_timeout": 1800,
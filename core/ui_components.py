@@ -424,165 +424,111 @@ def advanced_file_uploader(
     return uploaded_file
 
 
-def pdf_preview(file_data: bytes, filename: str):
+def analyze_pdf_preview(file_data: bytes) -> dict:
     """
-    Preview do PDF com informações básicas
+    Extrai as informações básicas exibidas no preview (sem renderizar nada)
     
     Args:
         file_data: Dados do arquivo PDF
-        filename: Nome do arquivo
     """
     try:
-        import PyPDF2
-        from io import BytesIO
-        
-        # Criar leitor PDF
-        pdf_reader = PyPDF2.PdfReader(BytesIO(file_data))
-        num_pages = len(pdf_reader.pages)
-        
-        # Extrair primeira página para preview
-        first_page = pdf_reader.pages[0]
-        full_text = first_page.extract_text()
-        text_preview = full_text[:800] + "..." if len(full_text) > 800 else full_text
+        from core.pdf_probe import get_pdf_probe
         
-        # Container do preview mais bonito
-        st.markdown("### 📄 Informações do Arquivo")
-        
-        # Métricas em linha
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric(
-                "📄 Páginas", 
-                num_pages,
-                help="Número total de páginas do documento"
-            )
-        
-        with col2:
-            file_size_mb = len(file_data) / (1024*1024)
-            st.metric(
-                "📊 Tamanho", 
-                f"{file_size_mb:.1f} MB",
-                help="Tamanho do arquivo em megabytes"
-            )
-        
-        with col3:
-            st.metric(
-                "📝 Texto", 
-                "Sim" if text_preview.strip() else "Não",
-                help="Indica se foi possível extrair texto da primeira página"
-            )
-        
-        # Preview removido conforme solicitado
+        # Probe compartilhado com validação, conversor, divisor e OCR
+        probe = get_pdf_probe(file_data)
+        if probe.error:
+            raise ValueError(probe.error)
         
         return {
-            "num_pages": num_pages,
-            "has_text": bool(text_preview.strip()),
-            "file_size": len(file_data)
+            "num_pages": probe.page_count,
+            "has_text": probe.has_text_first_page,
+            "file_size": probe.file_size
         }
         
     except Exception as e:
-        st.error(f"❌ Erro ao analisar PDF: {str(e)}")
         return {
             "num_pages": 0,
             "has_text": False,
-            "file_size": len(file_data)
+            "file_size": len(file_data),
+            "error": str(e)
         }
 
 
-def validate_pdf_structure(file_data: bytes):
+def pdf_preview(file_data: bytes, filename: str, preview_info: Optional[dict] = None):
     """
-    Valida a estrutura do PDF e verifica se tem sumário
+    Preview do PDF com informações básicas
+    
+    Args:
+        file_data: Dados do arquivo PDF
+        filename: Nome do arquivo
+        preview_info: Resultado de analyze_pdf_preview (calculado se omitido)
+    """
+    if preview_info is None:
+        preview_info = analyze_pdf_preview(file_data)
+    
+    if preview_info.get("error"):
+        st.error(f"❌ Erro ao analisar PDF: {preview_info['error']}")
+        return preview_info
+    
+    # Container do preview mais bonito
+    st.markdown("### 📄 Informações do Arquivo")
+    
+    # Métricas em linha
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(
+            "📄 Páginas", 
+            preview_info["num_pages"],
+            help="Número total de páginas do documento"
+        )
+    
+    with col2:
+        file_size_mb = preview_info["file_size"] / (1024*1024)
+        st.metric(
+            "📊 Tamanho", 
+            f"{file_size_mb:.1f} MB",
+            help="Tamanho do arquivo em megabytes"
+        )
+    
+    with col3:
+        st.metric(
+            "📝 Texto", 
+            "Sim" if preview_info["has_text"] else "Não",
+            help="Indica se foi possível extrair texto da primeira página"
+        )
+    
+    # Preview removido conforme solicitado
+    
+    return preview_info
+
+
+def analyze_pdf_structure(file_data: bytes) -> dict:
+    """
+    Verifica bookmarks e sumário do PDF (sem renderizar nada)
     
     Args:
         file_data: Dados do arquivo PDF
     """
     try:
-        import PyPDF2
-        import pdfplumber
-        from io import BytesIO
+        from core.pdf_probe import get_pdf_probe
         
-        # Análise com PyPDF2
-        pdf_reader = PyPDF2.PdfReader(BytesIO(file_data))
+        # Probe compartilhado (marcadores e mapa de texto já lidos uma vez)
+        probe = get_pdf_probe(file_data)
+        if probe.error:
+            return {"error": probe.error}
         
         # Verificar bookmarks/outline
-        has_bookmarks = pdf_reader.outline is not None and len(pdf_reader.outline) > 0
-        
-        # Análise com pdfplumber para detectar sumário
-        has_summary_text = False
-        summary_keywords = ['sumário', 'índice', 'contents', 'index', 'conteúdo']
-        
-        with pdfplumber.open(BytesIO(file_data)) as pdf:
-            # Verificar primeiras 5 páginas
-            for i, page in enumerate(pdf.pages[:5]):
-                text = page.extract_text()
-                if text:
-                    text_lower = text.lower()
-                    if any(keyword in text_lower for keyword in summary_keywords):
-                        has_summary_text = True
-                        break
-        
-        # Container de validação
-        st.markdown("### 🔍 Validação da Estrutura")
+        has_bookmarks = probe.has_outline
         
-        col1, col2, col3 = st.columns(3)
+        # Sumário em qualquer página
+        has_summary_text = probe.has_summary_text
         
-        with col1:
-            if has_bookmarks:
-                st.success("📑 PDF possui bookmarks/outline")
-            else:
-                st.warning("⚠️ PDF não possui bookmarks")
-        
-        with col2:
-            if has_summary_text:
-                st.success("📋 Sumário detectado no texto")
-            else:
-                st.warning("⚠️ Sumário não detectado")
-        
-        with col3:
-            compatibility_score = 0
-            if has_bookmarks:
-                compatibility_score += 50
-            if has_summary_text:
-                compatibility_score += 50
-            
-            if compatibility_score >= 75:
-                st.success(f"🎯 Compatibilidade: {compatibility_score}%")
-            elif compatibility_score >= 50:
-                st.info(f"⚡ Compatibilidade: {compatibility_score}%")
-            else:
-                st.error(f"⚠️ Compatibilidade: {compatibility_score}%")
-        
-        # Recomendações
-        if compatibility_score < 75:
-            st.markdown("### 💡 Recomendações")
-            
-            if not has_bookmarks and not has_summary_text:
-                st.warning("""
-                **⚠️ PDF com baixa compatibilidade**
-                - Este PDF não possui bookmarks nem sumário detectável
-                - O processamento pode não encontrar seções
-                - Recomenda-se usar um PDF com estrutura de índice
-                """)
-            elif not has_bookmarks:
-                st.info("""
-                **ℹ️ PDF sem bookmarks**
-                - O PDF possui sumário textual mas sem bookmarks
-                - O processamento tentará extrair do texto
-                - Resultados podem variar dependendo do formato
-                """)
-            elif not has_summary_text:
-                st.info("""
-                **ℹ️ PDF com bookmarks mas sem sumário textual**
-                - O PDF possui estrutura mas sumário não detectado
-                - O processamento usará os bookmarks disponíveis
-                """)
-        else:
-            st.success("""
-            **✅ PDF com excelente compatibilidade!**
-            - Estrutura adequada para processamento
-            - Alta probabilidade de sucesso na extração
-            """)
+        compatibility_score = 0
+        if has_bookmarks:
+            compatibility_score += 50
+        if has_summary_text:
+            compatibility_score += 50
         
         return {
             "has_bookmarks": has_bookmarks,
@@ -592,5 +538,142 @@ def validate_pdf_structure(file_data: bytes):
         }
         
     except Exception as e:
-        st.error(f"❌ Erro na validação: {str(e)}")
-        return None
\ No newline at end of file
+        return {"error": str(e)}
+
+
+def validate_pdf_structure(file_data: bytes, structure_info: Optional[dict] = None):
+    """
+    Valida a estrutura do PDF e verifica se tem sumário
+    
+    Args:
+        file_data: Dados do arquivo PDF
+        structure_info: Resultado de analyze_pdf_structure (calculado se omitido)
+    """
+    if structure_info is None:
+        structure_info = analyze_pdf_structure(file_data)
+    
+    if structure_info.get("error"):
+        st.error(f"❌ Erro na validação: {structure_info['error']}")
+        return None
+    
+    has_bookmarks = structure_info["has_bookmarks"]
+    has_summary_text = structure_info["has_summary_text"]
+    compatibility_score = structure_info["compatibility_score"]
+    
+    # Container de validação
+    st.markdown("### 🔍 Validação da Estrutura")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if has_bookmarks:
+            st.success("📑 PDF possui bookmarks/outline")
+        else:
+            st.warning("⚠️ PDF não possui bookmarks")
+    
+    with col2:
+        if has_summary_text:
+            st.success("📋 Sumário detectado no texto")
+        else:
+            st.warning("⚠️ Sumário não detectado")
+    
+    with col3:
+        if compatibility_score >= 75:
+            st.success(f"🎯 Compatibilidade: {compatibility_score}%")
+        elif compatibility_score >= 50:
+            st.info(f"⚡ Compatibilidade: {compatibility_score}%")
+        else:
+            st.error(f"⚠️ Compatibilidade: {compatibility_score}%")
+    
+    # Recomendações
+    if compatibility_score < 75:
+        st.markdown("### 💡 Recomendações")
+        
+        if not has_bookmarks and not has_summary_text:
+            st.warning("""
+            **⚠️ PDF com baixa compatibilidade**
+            - Este PDF não possui bookmarks nem sumário detectável
+            - O processamento pode não encontrar seções
+            - Recomenda-se usar um PDF com estrutura de índice
+            """)
+        elif not has_bookmarks:
+            st.info("""
+            **ℹ️ PDF sem bookmarks**
+            - O PDF possui sumário textual mas sem bookmarks
+            - O processamento tentará extrair do texto
+            - Resultados podem variar dependendo do formato
+            """)
+        elif not has_summary_text:
+            st.info("""
+            **ℹ️ PDF com bookmarks mas sem sumário textual**
+            - O PDF possui estrutura mas sumário não detectado
+            - O processamento usará os bookmarks disponíveis
+            """)
+    else:
+        st.success("""
+        **✅ PDF com excelente compatibilidade!**
+        - Estrutura adequada para processamento
+        - Alta probabilidade de sucesso na extração
+        """)
+    
+    return structure_info
+
+
+def queue_position_notice(placeholder=None):
+    """
+    Cria callback para exibir a posição na fila global de processamento
+    
+    Args:
+        placeholder: Elemento (st.empty()) onde a posição será exibida
+    
+    Returns:
+        Função (posição, total_na_fila) para usar com JobScheduler.acquire
+    """
+    if placeholder is None:
+        placeholder = st.empty()
+    
+    def on_wait(position: int, waiting: int):
+        placeholder.info(
+            f"⏳ Servidor ocupado - aguardando na fila: posição {position} de {waiting}"
+        )
+    
+    return on_wait
+
+def background_job_monitor(job, poll_interval: float = 1.0, cancel_key: Optional[str] = None) -> Optional[dict]:
+    """
+    Exibe o progresso de um BackgroundJob e um botão de cancelamento.
+    
+    Enquanto o job não termina, a página é recarregada a cada `poll_interval`
+    segundos para atualizar o progresso.
+    
+    Args:
+        job: BackgroundJob (ou None)
+        poll_interval (float): Intervalo entre atualizações (segundos)
+        cancel_key (str): Chave do botão de cancelar (padrão: derivada do job)
+    
+    Returns:
+        dict: Estado do job (snapshot) ou None se não houver job
+    """
+    if job is None:
+        return None
+    
+    from core.background_job import JOB_QUEUED, JOB_RUNNING
+    
+    state = job.snapshot()
+    if state['status'] not in (JOB_QUEUED, JOB_RUNNING):
+        return state
+    
+    if state['total']:
+        fraction = min(state['done'] / state['total'], 1.0)
+        text = f"{state['message'] or 'Processando'} - {state['done']} de {state['total']} páginas"
+    else:
+        fraction = 0.0
+        text = state['message'] or "Preparando..."
+    
+    st.progress(fraction, text=f"{text} ({state['elapsed']:.0f}s)")
+    
+    if st.button("⏹️ Cancelar", key=cancel_key or f"cancel_{state['job_id']}"):
+        job.cancel()
+    
+    time.sleep(poll_interval)
+    st.rerun()
@@ -1,7 +1,13 @@
 import streamlit as st
-import os
-import tempfile
 import subprocess
+from core.ocr_engine import (
+    OCROptions, ocr_pdf_bytes, OCR_MODE_FULL, OCR_MODE_SELECTIVE,
+    DEFAULT_CHUNK_SIZE, CHUNKED_OCR_MIN_PAGES
+)
+from core.pdf_text_layer import TextLayerClassifier
+from core.background_job import get_background_job_manager, JOB_CANCELLED, JOB_ERROR
+from core.session_manager import get_session_manager
+from core.ui_components import background_job_monitor
 
 def ocr_page():
     st.title("🧠 Aplicar OCR")
@@ -20,9 +26,27 @@ def ocr_page():
         st.success(f"📄 Arquivo carregado: {uploaded_file.name}")
         st.info(f"📊 Tamanho: {file_size / (1024*1024):.2f} MB")
         
+        # Camada de texto por página
+        try:
+            page_info = TextLayerClassifier(uploaded_file.getvalue()).classify()
+            scanned_pages = sum(1 for info in page_info if info.needs_ocr)
+            st.info(f"🔍 Páginas digitalizadas (sem texto): {scanned_pages} de {len(page_info)}")
+        except Exception:
+            page_info = []
+        
         # Opções de OCR
         st.markdown("### 🛠️ Configurações de OCR")
         
+        ocr_mode = st.radio(
+            "🎯 Páginas a processar:",
+            [OCR_MODE_SELECTIVE, OCR_MODE_FULL],
+            format_func=lambda x: {
+                OCR_MODE_SELECTIVE: "Apenas páginas sem texto (mais rápido, preserva páginas digitais)",
+                OCR_MODE_FULL: "Documento completo"
+            }[x],
+            help="No modo seletivo, só as páginas digitalizadas passam pelo OCR e são recolocadas no documento original"
+        )
+        
         col1, col2 = st.columns(2)
         
         with col1:
@@ -43,7 +67,8 @@ def ocr_page():
             force_ocr = st.checkbox(
                 "🔄 Forçar OCR completo",
                 value=True,
-                help="Aplica OCR mesmo em páginas que já têm texto"
+                disabled=ocr_mode == OCR_MODE_SELECTIVE,
+                help="Aplica OCR mesmo em páginas que já têm texto (apenas no modo documento completo)"
             )
         
         with col2:
@@ -69,7 +94,7 @@ def ocr_page():
                 min_value=1,
                 max_value=8,
                 value=4,
-                help="Número de threads para processamento paralelo"
+                help="Número de threads para processamento paralelo (limitado pela capacidade do servidor)"
             )
         
         with col2:
@@ -81,9 +106,31 @@ def ocr_page():
                 help="Qualidade das imagens no PDF resultante"
             )
         
+        # OCR em blocos paralelos para documentos grandes
+        chunked = st.checkbox(
+            "🧩 Processar em blocos paralelos",
+            value=len(page_info) >= CHUNKED_OCR_MIN_PAGES,
+            help="Divide o documento em blocos de páginas processados em paralelo. "
+                 "Recomendado para processos digitalizados grandes"
+        )
+        chunk_size = 0
+        if chunked:
+            chunk_size = st.slider(
+                "📑 Páginas por bloco:",
+                min_value=5,
+                max_value=100,
+                value=DEFAULT_CHUNK_SIZE,
+                step=5,
+                help="Blocos menores aumentam o paralelismo; cada bloco usa 1 thread da fila global"
+            )
+        
         # Botão para aplicar OCR
         if st.button("🧠 Aplicar OCR", type="primary"):
-            apply_ocr(uploaded_file, ocr_language, force_ocr, optimize_output, deskew, jobs, jpeg_quality)
+            apply_ocr(uploaded_file, ocr_language, force_ocr, optimize_output, deskew, jobs, jpeg_quality,
+                      ocr_mode, chunk_size)
+        
+        # Progresso / resultado do OCR em segundo plano
+        show_ocr_job()
     
     else:
         pass
@@ -116,6 +163,7 @@ def ocr_page():
             - **Otimizar saída**: Reduz tamanho do arquivo final
             - **Corrigir inclinação**: Corrige automaticamente páginas tortas
             - **Threads**: Processamento paralelo para velocidade
+            - **Blocos paralelos**: Divide processos grandes em blocos de páginas processados ao mesmo tempo
             - **Qualidade JPEG**: Controla qualidade das imagens no PDF final
             
             **Requisitos do sistema:**
@@ -131,166 +179,172 @@ def ocr_page():
             
             st.markdown("**💡 Dica:** Use o OCR antes de converter PDFs digitalizados para Word ou Excel!")
 
-def apply_ocr(uploaded_file, language, force_ocr, optimize, deskew, jobs, jpeg_quality):
-    """Aplica OCR no PDF usando OCRmyPDF"""
+def apply_ocr(uploaded_file, language, force_ocr, optimize, deskew, jobs, jpeg_quality,
+              mode=OCR_MODE_SELECTIVE, chunk_size=0):
+    """Inicia o OCR em segundo plano; o progresso é exibido por show_ocr_job()"""
     
-    # Salvar arquivo temporário
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_input:
-        tmp_input.write(uploaded_file.getvalue())
-        input_path = tmp_input.name
+    options = OCROptions(
+        language=language,
+        force_ocr=force_ocr,
+        optimize=optimize,
+        deskew=deskew,
+        jobs=jobs,
+        jpeg_quality=jpeg_quality,
+        mode=mode,
+        timeout=1800,  # 30 min timeout (por bloco no modo em blocos)
+        chunk_size=chunk_size
+    )
     
-    # Arquivo de saída temporário
-    with tempfile.NamedTemporaryFile(delete=False, suffix='_ocr.pdf') as tmp_output:
-        output_path = tmp_output.name
+    # Cancelar job anterior desta sessão, se ainda estiver rodando
+    manager = get_background_job_manager()
+    previous_job_id = st.session_state.get("ocr_job_id")
+    if previous_job_id:
+        manager.cancel(previous_job_id)
+        manager.discard(previous_job_id)
     
-    try:
-        # Container para feedback
-        status_container = st.container()
+    session_id = get_session_manager().get_session_id()
+    job = manager.start(session_id, "ocr", run_ocr_job, uploaded_file.getvalue(), options, session_id)
+    st.session_state.ocr_job_id = job.job_id
+    st.session_state.ocr_job_filename = uploaded_file.name
+    st.session_state.ocr_job_settings = f"""
+        🛠️ **Configurações:**
+        - Modo: {'Apenas páginas sem texto' if mode == OCR_MODE_SELECTIVE else 'Documento completo'}
+        - Idioma: {language}
+        - Forçar OCR: {'Sim' if force_ocr else 'Não'}
+        - Otimizar: {'Sim' if optimize else 'Não'}
+        - Corrigir inclinação: {'Sim' if deskew else 'Não'}
+        - Threads: {jobs}
+        - Blocos paralelos: {f'{chunk_size} páginas por bloco' if chunk_size else 'Não'}
+        - Qualidade JPEG: {jpeg_quality}%
+        """
+
+def run_ocr_job(job, pdf_data, options, session_id):
+    """Executa o OCR dentro de um BackgroundJob (fora da thread do Streamlit)"""
+    
+    def on_wait(position, waiting):
+        job.update(message=f"⏳ Servidor ocupado - aguardando na fila: posição {position} de {waiting}")
+    
+    def on_progress(done, total):
+        job.update(done=done, total=total, message="🧠 Reconhecendo texto")
+    
+    job.update(message="🔍 Analisando páginas...")
+    result = ocr_pdf_bytes(
+        pdf_data,
+        options,
+        session_id=session_id,
+        on_wait=on_wait,
+        progress_callback=on_progress,
+        cancel_event=job.cancel_event
+    )
+    return {"result": result, "original_size": len(pdf_data)}
+
+def show_ocr_job():
+    """Exibe progresso, cancelamento e resultado do OCR da sessão"""
+    
+    manager = get_background_job_manager()
+    job = manager.get(st.session_state.get("ocr_job_id"))
+    if job is None:
+        return
+    
+    st.markdown("### 🔄 Aplicando OCR...")
+    st.info(st.session_state.get("ocr_job_settings", ""))
+    
+    state = background_job_monitor(job)
+    
+    if state['status'] == JOB_CANCELLED:
+        st.warning("⏹️ OCR cancelado. Arquivos temporários foram removidos.")
+        return
+    
+    if state['status'] == JOB_ERROR:
+        show_ocr_error(job.error)
+        return
+    
+    result = job.result["result"]
+    original_size = job.result["original_size"]
+    ocr_size = len(result.data)
+    
+    # Mostrar resultados
+    if result.ocr_pages:
+        st.success(f"✅ OCR aplicado com sucesso em {state['elapsed']:.0f}s!")
+    else:
+        st.info("✅ Todas as páginas já possuem texto pesquisável - nenhum OCR necessário")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("📊 Tamanho Original", f"{original_size / (1024*1024):.2f} MB")
+    with col2:
+        st.metric("📄 Tamanho com OCR", f"{ocr_size / (1024*1024):.2f} MB")
+    with col3:
+        st.metric("🧠 Páginas com OCR", f"{len(result.ocr_pages)} de {result.total_pages}")
+    
+    # Nome do arquivo com OCR
+    original_name = st.session_state.get("ocr_job_filename", "documento.pdf")
+    ocr_name = original_name.replace('.pdf', '_ocr.pdf')
+    
+    # Botão de download
+    st.download_button(
+        label="📥 Baixar PDF com OCR",
+        data=result.data,
+        file_name=ocr_name,
+        mime="application/pdf",
+        type="primary"
+    )
+
+def show_ocr_error(error):
+    """Mostra a mensagem adequada para o erro do OCR"""
+    
+    if isinstance(error, subprocess.TimeoutExpired):
+        st.error("⏱️ Timeout: O processamento OCR demorou muito tempo")
+        st.error("Tente com um arquivo menor ou ajuste as configurações")
+    
+    elif isinstance(error, subprocess.CalledProcessError):
+        st.error(f"❌ Erro ao executar OCRmyPDF: {error}")
+        st.error("Verifique se o OCRmyPDF está instalado e configurado")
+        
+        # Mostrar detalhes do erro
+        if error.stderr:
+            with st.expander("🔍 Detalhes do Erro"):
+                st.code(error.stderr)
+    
+    elif isinstance(error, FileNotFoundError):
+        st.error("❌ OCRmyPDF não encontrado")
+        st.error("Instale o OCRmyPDF para usar esta funcionalidade")
         
-        with status_container:
-            st.markdown("### 🔄 Aplicando OCR...")
+        with st.expander("📥 Como instalar o OCRmyPDF"):
+            st.markdown("""
+            **Windows:**
+            ```bash
+            pip install ocrmypdf
+            ```
             
-            # Mostrar configurações
-            st.info(f"""
-            🛠️ **Configurações:**
-            - Idioma: {language}
-            - Forçar OCR: {'Sim' if force_ocr else 'Não'}
-            - Otimizar: {'Sim' if optimize else 'Não'}
-            - Corrigir inclinação: {'Sim' if deskew else 'Não'}
-            - Threads: {jobs}
-            - Qualidade JPEG: {jpeg_quality}%
-            """)
+            Você também precisa instalar o Tesseract:
+            1. Baixe em: https://github.com/UB-Mannheim/tesseract/wiki
+            2. Execute o instalador
+            3. Adicione ao PATH do sistema
             
-            with st.spinner("🧠 Processando OCR... Isso pode levar alguns minutos..."):
-                # Comando OCRmyPDF
-                command = [
-                    "ocrmypdf",
-                    "--language", language,
-                    "--jobs", str(jobs),
-                    "--jpeg-quality", str(jpeg_quality),
-                    "--output-type", "pdf"
-                ]
-                
-                # Adicionar opções condicionais
-                if force_ocr:
-                    command.append("--force-ocr")
-                
-                if optimize:
-                    command.append("--optimize")
-                    command.append("1")
-                
-                if deskew:
-                    command.append("--deskew")
-                
-                # Adicionar arquivos de entrada e saída
-                command.extend([input_path, output_path])
-                
-                # Executar comando
-                try:
-                    if os.name == 'nt':
-                        # Windows
-                        si = subprocess.STARTUPINFO()
-                        si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                        result = subprocess.run(command, check=True, startupinfo=si, 
-                                              capture_output=True, text=True, timeout=1800)  # 30 min timeout
-                    else:
-                        # Linux/Mac
-                        result = subprocess.run(command, check=True, capture_output=True, 
-                                              text=True, timeout=1800)  # 30 min timeout
-                    
-                    # Verificar se arquivo foi criado
-                    if not os.path.exists(output_path):
-                        st.error("❌ Arquivo com OCR não foi criado")
-                        return
-                    
-                    # Comparar tamanhos
-                    original_size = len(uploaded_file.getvalue())
-                    ocr_size = os.path.getsize(output_path)
-                    
-                    # Mostrar resultados
-                    st.success("✅ OCR aplicado com sucesso!")
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("📊 Tamanho Original", f"{original_size / (1024*1024):.2f} MB")
-                    with col2:
-                        st.metric("📄 Tamanho com OCR", f"{ocr_size / (1024*1024):.2f} MB")
-                    
-                    # Ler arquivo com OCR
-                    with open(output_path, 'rb') as f:
-                        ocr_data = f.read()
-                    
-                    # Nome do arquivo com OCR
-                    original_name = uploaded_file.name
-                    ocr_name = original_name.replace('.pdf', '_ocr.pdf')
-                    
-                    # Botão de download
-                    st.download_button(
-                        label="📥 Baixar PDF com OCR",
-                        data=ocr_data,
-                        file_name=ocr_name,
-                        mime="application/pdf",
-                        type="primary"
-                    )
-                    
-                
-                except subprocess.TimeoutExpired:
-                    st.error("⏱️ Timeout: O processamento OCR demorou muito tempo")
-                    st.error("Tente com um arquivo menor ou ajuste as configurações")
-                
-                except subprocess.CalledProcessError as e:
-                    st.error(f"❌ Erro ao executar OCRmyPDF: {e}")
-                    st.error("Verifique se o OCRmyPDF está instalado e configurado")
-                    
-                    # Mostrar detalhes do erro
-                    if e.stderr:
-                        with st.expander("🔍 Detalhes do Erro"):
-                            st.code(e.stderr)
-                
-                except FileNotFoundError:
-                    st.error("❌ OCRmyPDF não encontrado")
-                    st.error("Instale o OCRmyPDF para usar esta funcionalidade")
-                    
-                    with st.expander("📥 Como instalar o OCRmyPDF"):
-                        st.markdown("""
-                        **Windows:**
-                        ```bash
-                        pip install ocrmypdf
-                        ```
-                        
-                        Você também precisa instalar o Tesseract:
-                        1. Baixe em: https://github.com/UB-Mannheim/tesseract/wiki
-                        2. Execute o instalador
-                        3. Adicione ao PATH do sistema
-                        
-                        **Linux (Ubuntu/Debian):**
-                        ```bash
-                        sudo apt-get install ocrmypdf tesseract-ocr tesseract-ocr-por
-                        ```
-                        
-                        **Linux (CentOS/RHEL):**
-                        ```bash
-                        sudo yum install ocrmypdf tesseract tesseract-langpack-por
-                        ```
-                        
-                        **macOS:**
-                        ```bash
-                        brew install ocrmypdf tesseract tesseract-lang
-                        ```
-                        
-                        **Python (via pip):**
-                        ```bash
-                        pip install ocrmypdf
-                        ```
-                        """)
-                
-    finally:
-        # Limpar arquivos temporários
-        try:
-            os.unlink(input_path)
-            os.unlink(output_path)
-        except:
-            pass
+            **Linux (Ubuntu/Debian):**
+            ```bash
+            sudo apt-get install ocrmypdf tesseract-ocr tesseract-ocr-por
+            ```
+            
+            **Linux (CentOS/RHEL):**
+            ```bash
+            sudo yum install ocrmypdf tesseract tesseract-langpack-por
+            ```
+            
+            **macOS:**
+            ```bash
+            brew install ocrmypdf tesseract tesseract-lang
+            ```
+            
+            **Python (via pip):**
+            ```bash
+            pip install ocrmypdf
+            ```
+            """)
+    
+    else:
+        st.error(f"❌ Erro inesperado no OCR: {error}")
 
 def check_ocrmypdf_available():
     """Verifica se o OCRmyPDF está disponível"""
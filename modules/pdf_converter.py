@@ -1,10 +1,23 @@
 import streamlit as st
 import os
 import tempfile
-import zipfile
 import subprocess
-from io import BytesIO
 import base64
+import uuid
+import fitz  # PyMuPDF
+from core.pdf_probe import get_pdf_probe
+from core.pdf_text_layer import document_needs_ocr
+from core.pdf_image_export import (
+    ImageExportOptions, IMAGE_FORMAT_PNG, IMAGE_FORMAT_JPEG, IMAGE_FORMAT_TIFF,
+    render_page, export_images_to_zip, export_multipage_tiff
+)
+from core.pdf_text_export import export_text
+from core.pdf_table_export import (
+    export_tables_to_excel, SHEET_LAYOUT_SINGLE, SHEET_LAYOUT_PAGE, SHEET_LAYOUT_TABLE
+)
+from core.ocr_engine import OCROptions, ocr_pdf_bytes, OCR_MODE_SELECTIVE, OCR_ENGINE_AUTO, DEFAULT_CHUNK_SIZE
+from core.session_manager import get_session_manager
+from core.ui_components import queue_position_notice
 
 def clear_converter_data():
     """
@@ -47,16 +60,16 @@ def pdf_converter_page():
         
         # Obter informações do PDF e verificar se tem texto
         try:
-            import PyPDF2
-            from io import BytesIO
-            
-            pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_data))
-            total_pages = len(pdf_reader.pages)
-            file_size_mb = len(pdf_data) / (1024 * 1024)
+            # Lido uma vez por arquivo e reaproveitado nos reruns
+            probe = get_pdf_probe(pdf_data)
+            if probe.error:
+                raise ValueError(probe.error)
+            total_pages = probe.page_count
+            file_size_mb = probe.file_size_mb
             
             # Verificar se PDF tem texto pesquisável
-            has_text = check_pdf_has_text(pdf_data)
-            needs_ocr = not has_text
+            needs_ocr = probe.needs_ocr
+            has_text = not needs_ocr
             
             # Exibir informações do arquivo
             col1, col2, col3 = st.columns(3)
@@ -203,14 +216,22 @@ def convert_to_documents(pdf_data, total_pages, filename):
         with st.expander("⚙️ Opções de Tabela"):
             detect_tables = st.checkbox("Detectar tabelas automaticamente", value=True,
                                       help="Procura e converte tabelas automaticamente")
-            merge_cells = st.checkbox("Manter células mescladas", value=False,
-                                    help="Preserva formatação de células mescladas")
+            layout_options = ["Uma planilha", "Uma planilha por página"]
+            if detect_tables:
+                layout_options.append("Uma planilha por tabela")
+            layout_choice = st.radio("Organização das planilhas:", layout_options,
+                                     help="Por tabela = só as tabelas, cada uma em sua planilha")
+            sheet_layout = {
+                "Uma planilha": SHEET_LAYOUT_SINGLE,
+                "Uma planilha por página": SHEET_LAYOUT_PAGE,
+                "Uma planilha por tabela": SHEET_LAYOUT_TABLE,
+            }[layout_choice]
         
         st.markdown("---")
         col1, col2 = st.columns(2)
         with col1:
             if st.button("🪄 Converter para Excel", type="primary", use_container_width=True, key="convert_excel"):
-                convert_to_excel(pdf_data, filename, detect_tables, merge_cells)
+                convert_to_excel(pdf_data, filename, detect_tables, sheet_layout)
         with col2:
             if st.button("🔄 Começar Novamente", type="secondary", use_container_width=True, key="restart_excel"):
                 clear_converter_data()
@@ -291,6 +312,26 @@ def convert_to_images(pdf_data, total_pages, filename):
                                   help="Maior valor = melhor qualidade e maior tamanho")
             else:
                 quality = 90  # Default para outros formatos
+        
+        grayscale = st.checkbox(
+            "⚫ Tons de cinza",
+            value=False,
+            help="Ideal para documentos digitalizados: renderização mais rápida e arquivos até 3x menores"
+        )
+        transparent = False
+        if "PNG" in format_choice:
+            transparent = st.checkbox(
+                "🔲 Fundo transparente",
+                value=False,
+                help="Mantém o canal alfa (transparência). Deixe desmarcado para imagens menores com fundo branco"
+            )
+        multipage_tiff = False
+        if "TIFF" in format_choice:
+            multipage_tiff = st.checkbox(
+                "📚 Um único TIFF com todas as páginas",
+                value=True,
+                help="Gera um TIFF multipáginas em vez de um ZIP com uma imagem por página"
+            )
     
     # Opções de páginas
     with st.expander("📄 Seleção de Páginas"):
@@ -347,7 +388,8 @@ def convert_to_images(pdf_data, total_pages, filename):
             else:
                 page_list = None
             
-            convert_to_image_format(pdf_data, filename, format_choice, dpi, quality, page_list)
+            convert_to_image_format(pdf_data, filename, format_choice, dpi, quality, page_list,
+                                    grayscale, transparent, multipage_tiff)
     with col2:
         if st.button("🔄 Começar Novamente", type="secondary", use_container_width=True, key="restart_images"):
             clear_converter_data()
@@ -715,7 +757,7 @@ def convert_to_word_pdf2docx(pdf_data, filename, preserve_layout, include_images
 
 
 def convert_to_text(pdf_data, filename, preserve_layout, include_page_numbers):
-    """Converte PDF para texto usando pdfplumber"""
+    """Converte PDF para texto usando PyMuPDF (blocos de páginas em paralelo)"""
     try:
         with st.spinner("🪄 Extraindo texto..."):
             # Verificar se precisa de OCR
@@ -729,143 +771,155 @@ def convert_to_text(pdf_data, filename, preserve_layout, include_page_numbers):
                     pdf_data = ocr_pdf_data  # Usar PDF com OCR
                 else:
                     st.warning("⚠️ Falha no OCR - Convertendo PDF original")
-            import pdfplumber
-            from io import BytesIO
-            
-            text_content = []
             
-            with pdfplumber.open(BytesIO(pdf_data)) as pdf:
-                for i, page in enumerate(pdf.pages, 1):
-                    if include_page_numbers:
-                        text_content.append(f"\n--- Página {i} ---\n")
-                    
-                    page_text = page.extract_text()
-                    if page_text:
-                        if preserve_layout:
-                            text_content.append(page_text)
-                        else:
-                            # Remover quebras de linha excessivas
-                            clean_text = ' '.join(page_text.split())
-                            text_content.append(clean_text)
-                    
-                    text_content.append("\n")
-            
-            final_text = '\n'.join(text_content)
-            
-            # Verificar se há conteúdo
-            if not final_text.strip():
-                st.error("❌ Nenhum texto foi extraído do PDF!")
-                return
-            
-            # Download
             base_name = filename.replace('.pdf', '') if filename.endswith('.pdf') else filename
             output_filename = f"{base_name}.txt"
-            text_data = final_text.encode('utf-8')
             
-            st.success("✅ Conversão para texto concluída!")
-            st.info(f"📝 **Arquivo gerado**: {output_filename} ({len(text_data)/1024:.1f} KB)")
-            st.info(f"📊 **Caracteres extraídos**: {len(final_text):,}")
+            # Texto gravado em arquivo na pasta da sessão, bloco a bloco
+            session_manager = get_session_manager()
+            output_path = str(session_manager.get_session_dir() / "output" / f"{uuid.uuid4().hex}_{output_filename}")
             
-            st.download_button(
-                label="📥 Baixar arquivo de texto",
-                data=text_data,
-                file_name=output_filename,
-                mime="text/plain",
-                type="primary"
-            )
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            
+            def update_progress(done, total):
+                progress_bar.progress(done / total)
+                status_text.text(f"📝 {done} de {total} páginas extraídas")
+            
+            try:
+                text_chars = export_text(pdf_data, output_path, preserve_layout, include_page_numbers,
+                                         session_manager.get_session_id(), update_progress)
+                
+                progress_bar.empty()
+                status_text.empty()
+                
+                # Verificar se há conteúdo
+                if not text_chars:
+                    st.error("❌ Nenhum texto foi extraído do PDF!")
+                    return
+                
+                file_size = os.path.getsize(output_path)
+                st.success("✅ Conversão para texto concluída!")
+                st.info(f"📝 **Arquivo gerado**: {output_filename} ({file_size/1024:.1f} KB)")
+                st.info(f"📊 **Caracteres extraídos**: {text_chars:,}")
+                
+                with open(output_path, 'rb') as output_file:
+                    st.download_button(
+                        label="📥 Baixar arquivo de texto",
+                        data=output_file,
+                        file_name=output_filename,
+                        mime="text/plain",
+                        type="primary"
+                    )
+            finally:
+                # O Streamlit já guardou o conteúdo para o download
+                if os.path.exists(output_path):
+                    os.unlink(output_path)
             
     except Exception as e:
         st.error(f"❌ Erro na conversão para texto: {str(e)}")
 
 
-def convert_to_image_format(pdf_data, filename, format_choice, dpi, quality, page_list):
-    """Converte PDF para imagens usando PyMuPDF"""
+def convert_to_image_format(pdf_data, filename, format_choice, dpi, quality, page_list,
+                            grayscale=False, transparent=False, multipage_tiff=False):
+    """Converte PDF para imagens usando PyMuPDF (renderização em paralelo)"""
     try:
-        with st.spinner("🪄 Convertendo para imagens..."):
-            import fitz
-            
-            # Determinar formato
-            if "PNG" in format_choice:
-                img_format = "png"
-                file_ext = "png"
-            elif "JPEG" in format_choice:
-                img_format = "jpeg"
-                file_ext = "jpg"
-            else:  # TIFF
-                img_format = "tiff"
-                file_ext = "tiff"
-            
-            doc = fitz.open(stream=pdf_data, filetype="pdf")
+        # Determinar formato
+        if "PNG" in format_choice:
+            img_format = IMAGE_FORMAT_PNG
+        elif "JPEG" in format_choice:
+            img_format = IMAGE_FORMAT_JPEG
+        else:  # TIFF
+            img_format = IMAGE_FORMAT_TIFF
+        
+        options = ImageExportOptions(img_format, dpi, quality, grayscale, transparent)
+        total_pages = get_pdf_probe(pdf_data, with_text_map=False).page_count
+        
+        # Determinar páginas a converter
+        if page_list:
+            pages_to_convert = [p-1 for p in page_list if 0 <= p-1 < total_pages]
+        else:
+            pages_to_convert = list(range(total_pages))
+        
+        if not pages_to_convert:
+            st.error("❌ Nenhuma página válida selecionada")
+            return
+        
+        base_name = filename.replace('.pdf', '')
+        mime = "image/jpeg" if img_format == IMAGE_FORMAT_JPEG else f"image/{img_format}"
+        
+        if len(pages_to_convert) == 1:
+            # Uma única imagem
+            with st.spinner("🪄 Convertendo para imagem..."):
+                doc = fitz.open(stream=pdf_data, filetype="pdf")
+                try:
+                    img_data = render_page(doc, pages_to_convert[0], options)
+                finally:
+                    doc.close()
             
-            # Determinar páginas a converter
-            if page_list:
-                pages_to_convert = [p-1 for p in page_list if 0 <= p-1 < doc.page_count]
+            st.success("✅ Conversão para imagem concluída!")
+            st.download_button(
+                label="📥 Baixar imagem",
+                data=img_data,
+                file_name=f"{base_name}_page_{pages_to_convert[0]+1}.{options.file_extension}",
+                mime=mime,
+                type="primary"
+            )
+            return
+        
+        # Várias páginas: gravadas direto em arquivo na pasta da sessão
+        session_manager = get_session_manager()
+        output_dir = session_manager.get_session_dir() / "output"
+        
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        
+        def update_progress(done, total):
+            progress_bar.progress(done / total)
+            status_text.text(f"🖼️ {done} de {total} páginas convertidas")
+        
+        multipage = img_format == IMAGE_FORMAT_TIFF and multipage_tiff
+        if multipage:
+            output_name = f"{base_name}.tiff"
+            label, mime = "📥 Baixar TIFF", "image/tiff"
+            success_msg = f"✅ TIFF com {len(pages_to_convert)} páginas gerado!"
+        else:
+            output_name = f"{base_name}_images.zip"
+            label, mime = "📥 Baixar imagens (ZIP)", "application/zip"
+            success_msg = f"✅ {len(pages_to_convert)} imagens convertidas!"
+        output_path = str(output_dir / f"{uuid.uuid4().hex}_{output_name}")
+        
+        try:
+            if multipage:
+                export_multipage_tiff(pdf_data, pages_to_convert, options, output_path,
+                                      session_manager.get_session_id(), update_progress)
             else:
-                pages_to_convert = range(doc.page_count)
+                export_images_to_zip(pdf_data, pages_to_convert, options, output_path,
+                                     session_id=session_manager.get_session_id(), progress_callback=update_progress)
             
-            if len(pages_to_convert) == 1:
-                # Uma única imagem
-                page = doc[pages_to_convert[0]]
-                mat = fitz.Matrix(dpi/72, dpi/72)
-                pix = page.get_pixmap(matrix=mat)
-                
-                if img_format == "jpeg":
-                    img_data = pix.jpeg_image(quality=quality)
-                elif img_format == "png":
-                    img_data = pix.png_image()
-                else:  # TIFF
-                    img_data = pix.pil_tobytes(format="TIFF")
-                
-                output_filename = f"{filename.replace('.pdf', '')}_page_{pages_to_convert[0]+1}.{file_ext}"
-                
-                st.success("✅ Conversão para imagem concluída!")
+            st.success(success_msg)
+            with open(output_path, 'rb') as output_file:
                 st.download_button(
-                    label="📥 Baixar imagem",
-                    data=img_data,
-                    file_name=output_filename,
-                    mime=f"image/{img_format}",
+                    label=label,
+                    data=output_file,
+                    file_name=output_name,
+                    mime=mime,
                     type="primary"
                 )
-            else:
-                # Múltiplas imagens em ZIP
-                zip_buffer = BytesIO()
-                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                    
-                    for page_num in pages_to_convert:
-                        page = doc[page_num]
-                        mat = fitz.Matrix(dpi/72, dpi/72)
-                        pix = page.get_pixmap(matrix=mat)
-                        
-                        if img_format == "jpeg":
-                            img_data = pix.jpeg_image(quality=quality)
-                        elif img_format == "png":
-                            img_data = pix.png_image()
-                        else:  # TIFF
-                            img_data = pix.pil_tobytes(format="TIFF")
-                        
-                        img_filename = f"page_{page_num+1}.{file_ext}"
-                        zip_file.writestr(img_filename, img_data)
-                
-                zip_buffer.seek(0)
-                output_filename = f"{filename.replace('.pdf', '')}_images.zip"
-                
-                st.success(f"✅ {len(pages_to_convert)} imagens convertidas!")
-                st.download_button(
-                    label="📥 Baixar imagens (ZIP)",
-                    data=zip_buffer.getvalue(),
-                    file_name=output_filename,
-                    mime="application/zip",
-                    type="primary"
-                )
-            
-            doc.close()
+        finally:
+            # Também em caso de erro: sem progresso parado na tela nem arquivo parcial na sessão
+            progress_bar.empty()
+            status_text.empty()
+            # O Streamlit já guardou o conteúdo para o download
+            if os.path.exists(output_path):
+                os.unlink(output_path)
             
     except Exception as e:
         st.error(f"❌ Erro na conversão para imagens: {str(e)}")
 
 
-def convert_to_excel(pdf_data, filename, detect_tables, merge_cells):
-    """Converte PDF para Excel (implementação básica)"""
+def convert_to_excel(pdf_data, filename, detect_tables, sheet_layout=SHEET_LAYOUT_SINGLE):
+    """Converte PDF para Excel (tabelas via PyMuPDF, planilha gravada em streaming)"""
     try:
         with st.spinner("🪄 Convertendo para Excel..."):
             # Verificar se precisa de OCR
@@ -879,79 +933,52 @@ def convert_to_excel(pdf_data, filename, detect_tables, merge_cells):
                     pdf_data = ocr_pdf_data  # Usar PDF com OCR
                 else:
                     st.warning("⚠️ Falha no OCR - Convertendo PDF original")
-            import pdfplumber
-            import openpyxl
-            from io import BytesIO
-            
-            # Criar workbook
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "PDF Content"
-            
-            current_row = 1
-            
-            with pdfplumber.open(BytesIO(pdf_data)) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    # Adicionar separador de página
-                    ws.cell(row=current_row, column=1, value=f"=== Página {page_num} ===")
-                    current_row += 2
-                    
-                    if detect_tables:
-                        # Tentar extrair tabelas
-                        tables = page.extract_tables()
-                        if tables:
-                            for table in tables:
-                                for row_data in table:
-                                    for col_num, cell_value in enumerate(row_data, 1):
-                                        if cell_value:
-                                            ws.cell(row=current_row, column=col_num, value=str(cell_value))
-                                    current_row += 1
-                                current_row += 1  # Espaço entre tabelas
-                        else:
-                            # Se não há tabelas, extrair texto
-                            text = page.extract_text()
-                            if text:
-                                for line in text.split('\n'):
-                                    if line.strip():
-                                        ws.cell(row=current_row, column=1, value=line.strip())
-                                        current_row += 1
-                    else:
-                        # Extrair apenas texto
-                        text = page.extract_text()
-                        if text:
-                            for line in text.split('\n'):
-                                if line.strip():
-                                    ws.cell(row=current_row, column=1, value=line.strip())
-                                    current_row += 1
-                    
-                    current_row += 2  # Espaço entre páginas
             
-            # Salvar em BytesIO
-            excel_buffer = BytesIO()
-            wb.save(excel_buffer)
-            excel_buffer.seek(0)
-            
-            # Verificar se o arquivo tem conteúdo
-            excel_data = excel_buffer.getvalue()
-            if len(excel_data) == 0:
-                st.error("❌ Arquivo Excel está vazio!")
-                return
-            
-            # Download
             base_name = filename.replace('.pdf', '') if filename.endswith('.pdf') else filename
             output_filename = f"{base_name}.xlsx"
             
-            st.success("✅ Conversão para Excel concluída!")
-            st.info(f"📊 **Arquivo gerado**: {output_filename} ({len(excel_data)/1024/1024:.1f} MB)")
-            st.warning("⚠️ **Importante**: Se o arquivo baixar como PDF, renomeie a extensão para .xlsx")
+            # Planilha gravada direto em arquivo na pasta da sessão
+            session_manager = get_session_manager()
+            output_path = str(session_manager.get_session_dir() / "output" / f"{uuid.uuid4().hex}_{output_filename}")
             
-            st.download_button(
-                label="📥 Baixar arquivo Excel",
-                data=excel_data,
-                file_name=output_filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                type="primary"
-            )
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            
+            def update_progress(done, total):
+                progress_bar.progress(done / total)
+                status_text.text(f"📊 {done} de {total} páginas processadas")
+            
+            try:
+                total_tables = export_tables_to_excel(pdf_data, output_path, detect_tables, sheet_layout,
+                                                      session_manager.get_session_id(), update_progress)
+                
+                progress_bar.empty()
+                status_text.empty()
+                
+                # Verificar se o arquivo tem conteúdo
+                file_size = os.path.getsize(output_path)
+                if file_size == 0:
+                    st.error("❌ Arquivo Excel está vazio!")
+                    return
+                
+                st.success("✅ Conversão para Excel concluída!")
+                st.info(f"📊 **Arquivo gerado**: {output_filename} ({file_size/1024/1024:.1f} MB)")
+                if detect_tables:
+                    st.info(f"🧮 **Tabelas encontradas**: {total_tables}")
+                st.warning("⚠️ **Importante**: Se o arquivo baixar como PDF, renomeie a extensão para .xlsx")
+                
+                with open(output_path, 'rb') as output_file:
+                    st.download_button(
+                        label="📥 Baixar arquivo Excel",
+                        data=output_file,
+                        file_name=output_filename,
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        type="primary"
+                    )
+            finally:
+                # O Streamlit já guardou o conteúdo para o download
+                if os.path.exists(output_path):
+                    os.unlink(output_path)
             
     except Exception as e:
         st.error(f"❌ Erro na conversão para Excel: {str(e)}")
@@ -982,27 +1009,10 @@ def convert_to_xml(pdf_data, filename, include_metadata, extract_tables, preserv
 # Funções auxiliares para OCR
 
 def check_pdf_has_text(pdf_data):
-    """Verifica se o PDF já tem texto pesquisável"""
+    """Verifica se todas as páginas do PDF já têm texto pesquisável"""
     try:
-        import PyPDF2
-        from io import BytesIO
-        
-        pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_data))
-        
-        # Verificar algumas páginas em busca de texto
-        pages_to_check = min(3, len(pdf_reader.pages))  # Verificar até 3 páginas
-        total_text_length = 0
-        
-        for i in range(pages_to_check):
-            try:
-                page_text = pdf_reader.pages[i].extract_text()
-                if page_text:
-                    total_text_length += len(page_text.strip())
-            except:
-                continue
-        
-        # Se encontrou texto significativo (mais de 50 caracteres), considera que tem texto
-        return total_text_length > 50
+        # Mapa de texto por página, calculado uma vez por arquivo e compartilhado
+        return not document_needs_ocr(pdf_data)
         
     except Exception as e:
         print(f"Erro ao verificar texto do PDF: {e}")
@@ -1010,54 +1020,39 @@ def check_pdf_has_text(pdf_data):
 
 
 def apply_ocr_to_pdf(pdf_data, filename):
-    """Aplica OCR no PDF usando a lógica do módulo OCR existente"""
+    """Aplica OCR apenas nas páginas digitalizadas do PDF usando o motor de OCR compartilhado"""
     try:
-        # Salvar arquivo temporário de entrada
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_input:
-            tmp_input.write(pdf_data)
-            input_path = tmp_input.name
-        
-        # Arquivo de saída temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix='_ocr.pdf') as tmp_output:
-            output_path = tmp_output.name
-        
         # Mostrar progresso
         with st.spinner("🧠 Aplicando OCR... Isso pode levar alguns minutos..."):
-            # Comando OCRmyPDF com configurações básicas
-            command = [
-                "ocrmypdf",
-                "--language", "por",  # Português por padrão
-                "--jobs", "2",
-                "--jpeg-quality", "85",
-                "--output-type", "pdf",
-                "--force-ocr",  # Força OCR mesmo se já tiver texto
-                input_path,
-                output_path
-            ]
+            options = OCROptions(
+                language="por",  # Português por padrão
+                jobs=2,
+                jpeg_quality=85,
+                optimize=False,
+                mode=OCR_MODE_SELECTIVE,  # Páginas digitais ficam intactas
+                timeout=300,  # 5 minutos por bloco
+                chunk_size=DEFAULT_CHUNK_SIZE,  # Processos grandes em blocos paralelos
+                engine=OCR_ENGINE_AUTO  # Poucas páginas: OCR em processo, sem subprocesso
+            )
             
             try:
-                # Executar comando
-                result = subprocess.run(
-                    command,
-                    capture_output=True,
-                    text=True,
-                    timeout=300  # 5 minutos timeout
+                queue_placeholder = st.empty()
+                result = ocr_pdf_bytes(
+                    pdf_data,
+                    options,
+                    session_id=get_session_manager().get_session_id(),
+                    on_wait=queue_position_notice(queue_placeholder)
                 )
+                queue_placeholder.empty()
                 
-                if result.returncode == 0:
-                    # Ler arquivo processado
-                    with open(output_path, 'rb') as f:
-                        ocr_pdf_data = f.read()
-                    
-                    # Limpar arquivos temporários
-                    os.unlink(input_path)
-                    os.unlink(output_path)
-                    
-                    return ocr_pdf_data
-                else:
-                    st.error(f"❌ Erro no OCR: {result.stderr}")
-                    return None
+                if result.ocr_pages:
+                    st.info(f"🧠 OCR aplicado em {len(result.ocr_pages)} de {result.total_pages} páginas")
+                
+                return result.data
                     
+            except subprocess.CalledProcessError as e:
+                st.error(f"❌ Erro no OCR: {e.stderr}")
+                return None
             except subprocess.TimeoutExpired:
                 st.error("❌ OCR demorou muito para processar. Tente com um PDF menor.")
                 return None
@@ -1071,12 +1066,3 @@ def apply_ocr_to_pdf(pdf_data, filename):
     except Exception as e:
         st.error(f"❌ Erro ao preparar OCR: {str(e)}")
         return None
-    finally:
-        # Garantir limpeza dos arquivos temporários
-        try:
-            if 'input_path' in locals() and os.path.exists(input_path):
-                os.unlink(input_path)
-            if 'output_path' in locals() and os.path.exists(output_path):
-                os.unlink(output_path)
-        except:
-            pass
\ No newline at end of file
@@ -1,8 +1,10 @@
 import streamlit as st
-import PyPDF2
-from io import BytesIO
-import time
+import os
+import uuid
 from sortable_cards_component.sortable_cards_clean import sortable_cards_clean
+from core.pdf_merge_engine import merge_pdf_bytes, merge_pdf_files, DISK_MERGE_MIN_MB
+from core.pdf_probe import get_pdf_probe
+from core.session_manager import get_session_manager
 
 def pdf_merger_page():
     """
@@ -25,11 +27,8 @@ def pdf_merger_page():
     if uploaded_files:
         st.success(f"{len(uploaded_files)} arquivo(s)")
         
-        # Criar uma assinatura única baseada nos nomes e tamanhos dos arquivos
-        files_signature = []
-        for file in uploaded_files:
-            files_signature.append(f"{file.name}_{file.size}")
-        current_signature = "|".join(sorted(files_signature))
+        # Assinatura barata (id de cada upload): reruns, como arrastar os cards, não releem os arquivos
+        current_signature = "|".join(sorted(uploaded_file_key(file) for file in uploaded_files))
         
         # Processar arquivos se mudou a assinatura (arquivos diferentes)
         if ("pdf_files_data" not in st.session_state or 
@@ -94,7 +93,7 @@ def pdf_merger_page():
         st.markdown("---")
         st.markdown("### ⚙️ Opções")
         
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         with col1:
             add_bookmarks = st.checkbox(
                 "📑 Adicionar marcadores",
@@ -107,6 +106,19 @@ def pdf_merger_page():
                 value=True,
                 help="Preserva metadados do primeiro PDF"
             )
+            deduplicate = st.checkbox(
+                "🧬 Remover recursos repetidos",
+                value=True,
+                help="Mantém uma única cópia de fontes e imagens (brasões, timbres) "
+                     "que se repetem entre os arquivos"
+            )
+        with col3:
+            disk_mode = st.checkbox(
+                "💾 Modo disco",
+                value=sum(f['size'] for f in files) >= DISK_MERGE_MIN_MB,
+                help="Para uniões muito grandes: lê os arquivos do disco e grava o resultado "
+                     "em um arquivo temporário da sessão, com uso de memória limitado"
+            )
         
         # Botão de merge
         st.markdown("---")
@@ -116,11 +128,12 @@ def pdf_merger_page():
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("🔗 Unir PDFs", type="primary", use_container_width=True):
-                    merge_pdfs_final(uploaded_files, st.session_state.ordem, "PDFs_Unidos.pdf", add_bookmarks, preserve_metadata)
+                    merge_pdfs_final(uploaded_files, st.session_state.ordem, "PDFs_Unidos.pdf", add_bookmarks, preserve_metadata, disk_mode, deduplicate)
             with col2:
                 if st.button("🔄 Começar Novamente", type="secondary", use_container_width=True):
                     # Limpar todos os estados relacionados ao merge
-                    keys_to_clear = ['pdf_files_data', 'ordem', 'ultimo_num_arquivos', 'merge_result_final', 'files_signature']
+                    discard_merge_result()
+                    keys_to_clear = ['pdf_files_data', 'pdf_files_info', 'ordem', 'ultimo_num_arquivos', 'merge_result_final', 'files_signature']
                     for key in keys_to_clear:
                         if key in st.session_state:
                             del st.session_state[key]
@@ -137,58 +150,95 @@ def pdf_merger_page():
 def process_uploaded_files(uploaded_files):
     """
     Processa arquivos carregados e extrai informações
+    
+    As informações ficam no session_state por arquivo, então só arquivos
+    recém-adicionados são lidos e inspecionados; o hash do conteúdo fica
+    junto (`content_hash`). A inspeção é sequencial: o probe sem mapa de
+    texto leva poucos milissegundos por arquivo, menos que a partida de um
+    pool de processos, e o PyMuPDF não deve rodar em threads.
     """
-    files_data = []
+    files_info = st.session_state.setdefault('pdf_files_info', {})
+    keys = [uploaded_file_key(file) for file in uploaded_files]
     
-    for i, file in enumerate(uploaded_files):
-        try:
-            # Obter informações do PDF
-            pdf_info = get_pdf_info(file.getvalue())
-            file_size_mb = len(file.getvalue()) / (1024 * 1024)
-            
-            # Nome para exibição (truncado se necessário)
-            display_name = file.name[:25] + "..." if len(file.name) > 25 else file.name
-            
-            files_data.append({
-                'original_name': file.name,
-                'display_name': display_name,
-                'pages': pdf_info['pages'],
-                'size_mb': file_size_mb,
-                'encrypted': pdf_info['encrypted']
-            })
-            
-        except Exception as e:
-            # Arquivo com problema
-            files_data.append({
-                'original_name': file.name,
-                'display_name': f"❌ {file.name[:15]}...",
-                'pages': 0,
-                'size_mb': 0,
-                'encrypted': False,
-                'error': str(e)
-            })
+    for key, file in zip(keys, uploaded_files):
+        if key not in files_info:
+            files_info[key] = inspect_uploaded_file(file)
     
-    return files_data
+    # Esquecer arquivos removidos do upload
+    for key in list(files_info):
+        if key not in keys:
+            del files_info[key]
+    
+    return [files_info[key] for key in keys]
 
 
-def get_pdf_info(file_data):
+def uploaded_file_key(file):
     """
-    Obtém informações básicas do PDF
+    Identificador barato do upload, sem ler o conteúdo: o `file_id` do
+    Streamlit muda a cada envio, inclusive de uma versão editada do mesmo
+    arquivo com o mesmo tamanho
+    """
+    file_id = getattr(file, 'file_id', None)
+    return file_id or f"{file.name}_{file.size}"
+
+
+def inspect_uploaded_file(file):
+    """
+    Informações de um arquivo para os cards
     """
     try:
-        reader = PyPDF2.PdfReader(BytesIO(file_data))
+        # Obter informações do PDF
+        pdf_info = get_pdf_info(file.getvalue())
+        file_size_mb = file.size / (1024 * 1024)
+        
+        # Nome para exibição (truncado se necessário)
+        display_name = file.name[:25] + "..." if len(file.name) > 25 else file.name
+        
         return {
-            'pages': len(reader.pages),
-            'encrypted': reader.is_encrypted,
-            'metadata': reader.metadata if hasattr(reader, 'metadata') else None
+            'original_name': file.name,
+            'display_name': display_name,
+            'pages': pdf_info['pages'],
+            'size_mb': file_size_mb,
+            'encrypted': pdf_info['encrypted'],
+            'content_hash': pdf_info['content_hash']
+        }
+        
+    except Exception as e:
+        # Arquivo com problema
+        return {
+            'original_name': file.name,
+            'display_name': f"❌ {file.name[:15]}...",
+            'pages': 0,
+            'size_mb': 0,
+            'encrypted': False,
+            'content_hash': None,
+            'error': str(e)
         }
-    except:
-        return {'pages': 0, 'encrypted': False, 'metadata': None}
 
 
-def merge_pdfs_final(uploaded_files, file_order, output_filename, add_bookmarks, preserve_metadata):
+def get_pdf_info(file_data):
+    """
+    Obtém informações básicas do PDF
+    """
+    # Probe memoizado por hash: reruns não releem os arquivos
+    probe = get_pdf_probe(file_data, with_text_map=False)
+    if probe.error:
+        raise ValueError(probe.error)
+    return {
+        'pages': probe.page_count,
+        'encrypted': probe.is_encrypted,
+        'metadata': probe.metadata or None,
+        'content_hash': probe.file_hash
+    }
+
+
+def merge_pdfs_final(uploaded_files, file_order, output_filename, add_bookmarks, preserve_metadata,
+                     disk_mode=False, deduplicate=True):
     """
     Une múltiplos PDFs em um único arquivo
+    
+    No modo disco, os arquivos são gravados na pasta da sessão e o resultado
+    fica em um arquivo temporário; o session_state guarda apenas o caminho.
     """
     try:
         # Progress feedback
@@ -201,90 +251,67 @@ def merge_pdfs_final(uploaded_files, file_order, output_filename, add_bookmarks,
             st.error("❌ Nenhum arquivo para processar")
             return
         
-        # Criar merger
-        merger = PyPDF2.PdfMerger()
-        
-        total_files = len(file_order)
-        total_pages = 0
-        
-        # Processar cada arquivo na ordem especificada
-        for i, file_idx_str in enumerate(file_order):
+        # Arquivos na ordem especificada
+        ordered_files = []
+        for file_idx_str in file_order:
             file_idx = int(file_idx_str)  # Converter string para int
-            
-            if file_idx >= len(uploaded_files):
-                continue
-                
-            file = uploaded_files[file_idx]
-            progress = (i + 1) / total_files
-            progress_bar.progress(progress)
-            status_text.text(f"📄 Processando: {file.name} ({i+1}/{total_files})")
-            
-            try:
-                # Ler arquivo PDF
-                pdf_reader = PyPDF2.PdfReader(BytesIO(file.getvalue()))
-                num_pages = len(pdf_reader.pages)
-                total_pages += num_pages
-                
-                # Adicionar ao merger
-                if add_bookmarks:
-                    # Adicionar com bookmark
-                    outline_name = file.name.replace('.pdf', '')
-                    try:
-                        merger.append(pdf_reader, outline_item=outline_name)
-                    except TypeError:
-                        # Fallback para versões antigas do PyPDF2
-                        merger.append(pdf_reader, bookmark=outline_name)
-                else:
-                    # Adicionar sem marcadores
-                    merger.append(pdf_reader)
-                
-                # Pequeno delay para visualização
-                time.sleep(0.1)
-                
-            except Exception as e:
-                st.error(f"❌ Erro ao processar {file.name}: {str(e)}")
-                continue
+            if file_idx < len(uploaded_files):
+                ordered_files.append(uploaded_files[file_idx])
         
-        # Finalizar merge
-        status_text.text("📦 Finalizando merge...")
-        progress_bar.progress(1.0)
+        def update_progress(done, total, name):
+            progress_bar.progress(done / total if total else 1.0)
+            if name:
+                status_text.text(f"📄 Processando: {name} ({done + 1}/{total})")
+            else:
+                status_text.text("📦 Finalizando merge...")
         
-        # Criar arquivo de saída
-        output_buffer = BytesIO()
+        # Resultado anterior (arquivo em disco) não é mais necessário
+        discard_merge_result()
         
-        # Preservar metadados do primeiro arquivo se solicitado
-        if preserve_metadata and uploaded_files and file_order:
+        if disk_mode:
+            session_manager = get_session_manager()
+            status_text.text("💾 Gravando arquivos na pasta da sessão...")
+            sources = [(file.name, session_manager.save_uploaded_file(file)) for file in ordered_files]
+            output_path = str(session_manager.get_session_dir() / "output" /
+                              f"{uuid.uuid4().hex[:8]}_{output_filename}")
             try:
-                first_file_idx = int(file_order[0])
-                first_file = uploaded_files[first_file_idx]
-                first_reader = PyPDF2.PdfReader(BytesIO(first_file.getvalue()))
-                if hasattr(first_reader, 'metadata') and first_reader.metadata:
-                    merger.add_metadata(first_reader.metadata)
-            except:
-                pass  # Ignorar erro de metadados
+                result = merge_pdf_files(sources, output_path, add_bookmarks, preserve_metadata, update_progress,
+                                         deduplicate)
+            finally:
+                for _, path in sources:
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+        else:
+            sources = [(file.name, file.getvalue()) for file in ordered_files]
+            result = merge_pdf_bytes(sources, add_bookmarks, preserve_metadata, update_progress, deduplicate)
         
-        # Escrever resultado
-        merger.write(output_buffer)
-        merger.close()
+        for name, error in result.errors:
+            st.error(f"❌ Erro ao processar {name}: {error}")
         
-        # Obter dados do arquivo final
-        output_buffer.seek(0)
-        merged_data = output_buffer.getvalue()
-        final_size = len(merged_data)
+        if not result.total_pages:
+            st.error("❌ Nenhum arquivo pôde ser unido")
+            return
         
-        # Salvar resultado no session_state
+        # Salvar resultado no session_state (no modo disco, apenas o caminho)
         st.session_state.merge_result_final = {
-            'data': merged_data,
+            'data': result.data,
+            'path': result.output_path,
             'filename': output_filename,
-            'total_files': total_files,
-            'total_pages': total_pages,
-            'final_size': final_size
+            'total_files': result.total_files,
+            'total_pages': result.total_pages,
+            'final_size': result.final_size,
+            'dedup': result.dedup_report.to_dict() if result.dedup_report else None
         }
         
         # Limpar elementos de progresso
         progress_bar.empty()
         status_text.empty()
         
+        if result.errors:
+            return  # Sem rerun: mantém os erros visíveis junto com o resultado
+        
         st.rerun()  # Rerun para mostrar resultado
         
     except Exception as e:
@@ -298,6 +325,12 @@ def show_merge_result():
     """
     result = st.session_state.merge_result_final
     
+    if result.get('path') and not os.path.exists(result['path']):
+        # Arquivo removido pela limpeza de sessões antigas
+        del st.session_state.merge_result_final
+        st.warning("⚠️ O resultado expirou. Una os arquivos novamente.")
+        return
+    
     st.markdown("---")
     st.success("✅ PDFs unidos com sucesso!")
     
@@ -310,24 +343,55 @@ def show_merge_result():
     with col3:
         st.metric("📦 Tamanho Final", f"{result['final_size'] / (1024*1024):.2f} MB")
     
+    dedup = result.get('dedup')
+    if dedup and dedup['bytes_saved']:
+        st.info(f"🧬 Recursos repetidos removidos: {dedup['fonts_removed']} fontes e "
+                f"{dedup['images_removed']} imagens ({dedup['bytes_saved'] / (1024*1024):.2f} MB economizados)")
+    
     # Botões
     col1, col2 = st.columns(2)
     
     with col1:
-        st.download_button(
-            label="📥 Baixar PDF Unido",
-            data=result['data'],
-            file_name=result['filename'],
-            mime="application/pdf",
-            type="primary",
-            use_container_width=True
-        )
+        if result.get('path'):
+            # Lido só no clique: reruns não carregam o PDF unido na memória
+            merged_download_button(merged_file_reader(result['path']), result['filename'])
+        else:
+            merged_download_button(result['data'], result['filename'])
     
     with col2:
         if st.button("🔄 Novo Merge", help="Limpar resultado e fazer novo merge", use_container_width=True):
-            del st.session_state.merge_result_final
+            discard_merge_result()
             st.rerun()
 
 
+def merged_download_button(data, filename):
+    st.download_button(
+        label="📥 Baixar PDF Unido",
+        data=data,
+        file_name=filename,
+        mime="application/pdf",
+        type="primary",
+        use_container_width=True
+    )
+
+
+def merged_file_reader(path):
+    """Função para o `data` do download_button, chamada só quando o usuário clica"""
+    def _read():
+        with open(path, 'rb') as merged_file:
+            return merged_file.read()
+    return _read
+
+
+def discard_merge_result():
+    """Remove o resultado do merge do session_state e o arquivo temporário, se houver"""
+    result = st.session_state.pop('merge_result_final', None)
+    if result and result.get('path'):
+        try:
+            os.unlink(result['path'])
+        except OSError:
+            pass
+
+
 if __name__ == "__main__":
     pdf_merger_page()
\ No newline at end of file
@@ -1,7 +1,20 @@
 import streamlit as st
-import os
-import tempfile
+import io
+import zipfile
 import subprocess
+from core.pdf_optimizer_engine import (
+    optimize_pdf_bytes, optimize_to_target_size, ghostscript_executable, get_page_count,
+    OPTIMIZER_ENGINE_AUTO, OPTIMIZER_ENGINE_GHOSTSCRIPT, OPTIMIZER_ENGINE_INPROCESS,
+    PRESET_EBOOK, PRESET_SCREEN, GS_CHUNK_SIZE, CHUNKED_GS_MIN_PAGES
+)
+from core.session_manager import get_session_manager
+from core.ui_components import queue_position_notice
+
+ENGINE_LABELS = {
+    OPTIMIZER_ENGINE_AUTO: "🤖 Automático",
+    OPTIMIZER_ENGINE_GHOSTSCRIPT: "👻 Ghostscript",
+    OPTIMIZER_ENGINE_INPROCESS: "⚙️ Em processo (PyMuPDF)",
+}
 
 def pdf_optimizer_page():
     st.title("⚡ Otimizar PDF")
@@ -27,13 +40,29 @@ def pdf_optimizer_page():
         with col1:
             compression_mode = st.radio(
                 "Escolha o modo de compressão:",
-                ["🔰 Leve (Ebook)", "🚀 Turbo (Screen)"],
-                help="Leve: melhor qualidade, menor compressão | Turbo: maior compressão, qualidade reduzida"
+                ["🔰 Leve (Ebook)", "🚀 Turbo (Screen)", "🎯 Tamanho máximo"],
+                help="Leve: melhor qualidade, menor compressão | Turbo: maior compressão, qualidade reduzida | "
+                     "Tamanho máximo: melhor qualidade que cabe no limite informado"
             )
         
         with col2:
             st.markdown("**Configurações do modo selecionado:**")
-            if "Leve" in compression_mode:
+            if "Tamanho" in compression_mode:
+                target_mb = st.number_input(
+                    "Limite por arquivo (MB):",
+                    min_value=0.5,
+                    max_value=500.0,
+                    value=10.0,
+                    step=0.5,
+                    help="Ex.: limite de upload do tribunal"
+                )
+                st.info("""
+                🎯 **Modo Tamanho máximo:**
+                - Estima o resultado em uma amostra de páginas
+                - Usa a melhor qualidade prevista para caber
+                - Divide em partes se ainda passar do limite
+                """)
+            elif "Leve" in compression_mode:
                 st.info("""
                 📚 **Modo Leve (Ebook):**
                 - Mantém boa qualidade de texto
@@ -48,9 +77,41 @@ def pdf_optimizer_page():
                 - Ideal para visualização digital
                 """)
         
+        if "Tamanho" in compression_mode:
+            if st.button("⚡ Otimizar PDF", type="primary"):
+                optimize_pdf_to_target(uploaded_file, target_mb)
+            return
+        
+        engine = st.radio(
+            "Motor de otimização:",
+            list(ENGINE_LABELS.keys()),
+            format_func=lambda key: ENGINE_LABELS[key],
+            horizontal=True,
+            help="Automático: PDFs de texto usam o motor em processo (rápido, só recomprime "
+                 "imagens grandes e limpa a estrutura); digitalizações usam o Ghostscript"
+        )
+        
+        # Ghostscript em blocos paralelos para documentos grandes
+        chunked = False
+        chunk_size = GS_CHUNK_SIZE
+        if engine != OPTIMIZER_ENGINE_INPROCESS:
+            total_pages = get_page_count(uploaded_file.getvalue())
+            if total_pages > GS_CHUNK_SIZE:
+                col_chunk, col_size = st.columns(2)
+                with col_chunk:
+                    chunked = st.checkbox(
+                        "🧩 Processar em blocos paralelos",
+                        value=total_pages >= CHUNKED_GS_MIN_PAGES,
+                        help="Divide o PDF em blocos de páginas e executa um Ghostscript por bloco "
+                             "em paralelo, usando vários núcleos"
+                    )
+                with col_size:
+                    if chunked:
+                        chunk_size = st.slider("Páginas por bloco:", 10, 200, GS_CHUNK_SIZE, 10)
+        
         # Botão para otimizar
         if st.button("⚡ Otimizar PDF", type="primary"):
-            optimize_pdf(uploaded_file, compression_mode)
+            optimize_pdf(uploaded_file, compression_mode, engine, chunked, chunk_size)
     else:
         pass
         
@@ -65,6 +126,11 @@ def pdf_optimizer_page():
             - Remoção de metadados desnecessários
             - Simplificação de elementos gráficos
             
+            Para PDFs de texto, o motor em processo (PyMuPDF) é usado no modo
+            automático: recomprime apenas imagens acima da resolução do modo,
+            reduz as fontes aos glifos usados, unifica objetos repetidos e
+            regrava com object streams, sem reinterpretar as páginas.
+            
             **Requisitos:**
             - Ghostscript deve estar instalado no sistema
             - Windows: `gswin64c.exe` deve estar no PATH
@@ -75,151 +141,184 @@ def pdf_optimizer_page():
             - **Turbo (/screen)**: Máxima compressão para visualização
             """)
 
-def optimize_pdf(uploaded_file, compression_mode):
-    """Otimiza o PDF usando Ghostscript"""
-    
-    # Salvar arquivo temporário
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_input:
-        tmp_input.write(uploaded_file.getvalue())
-        input_path = tmp_input.name
+def optimize_pdf(uploaded_file, compression_mode, engine=OPTIMIZER_ENGINE_AUTO,
+                 chunked=False, chunk_size=GS_CHUNK_SIZE):
+    """Otimiza o PDF com o motor escolhido (Ghostscript ou em processo)"""
     
-    # Arquivo de saída temporário
-    with tempfile.NamedTemporaryFile(delete=False, suffix='_otimizado.pdf') as tmp_output:
-        output_path = tmp_output.name
+    # Container para feedback
+    status_container = st.container()
     
-    try:
-        # Container para feedback
-        status_container = st.container()
+    with status_container:
+        st.markdown("### 🔄 Otimizando PDF...")
         
-        with status_container:
-            st.markdown("### 🔄 Otimizando PDF...")
-            
-            # Determinar configuração
-            setting = "/ebook" if "Leve" in compression_mode else "/screen"
-            
-            # Mostrar configuração
-            st.info(f"🛠️ Usando configuração: {setting}")
+        # Determinar configuração
+        setting = PRESET_EBOOK if "Leve" in compression_mode else PRESET_SCREEN
+        
+        # Mostrar configuração
+        st.info(f"🛠️ Usando configuração: {setting}")
+        
+        with st.spinner("⚡ Processando arquivo..."):
+            try:
+                queue_placeholder = st.empty()
+                progress_bar = st.progress(0) if chunked else None
+                status_text = st.empty()
+                
+                def update_progress(done, total):
+                    queue_placeholder.empty()
+                    progress_bar.progress(done / total)
+                    status_text.text(f"🧩 Bloco {done} de {total} concluído")
+                
+                result = optimize_pdf_bytes(
+                    uploaded_file.getvalue(),
+                    setting=setting,
+                    engine=engine,
+                    session_id=get_session_manager().get_session_id(),
+                    on_wait=queue_position_notice(queue_placeholder),
+                    chunked=chunked,
+                    chunk_size=chunk_size,
+                    progress_callback=update_progress if chunked else None
+                )
+                queue_placeholder.empty()
+                status_text.empty()
+                if progress_bar is not None:
+                    progress_bar.empty()
+                
+                # Mostrar resultados
+                engine_name = ENGINE_LABELS.get(result.engine, result.engine)
+                st.success(f"✅ PDF otimizado com sucesso! ({engine_name}, {result.elapsed:.1f}s)")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("📊 Tamanho Original", f"{result.original_size / (1024*1024):.2f} MB")
+                with col2:
+                    st.metric("📉 Tamanho Otimizado", f"{result.optimized_size / (1024*1024):.2f} MB")
+                with col3:
+                    st.metric("💾 Compressão", f"{result.compression_ratio:.1f}%")
+                
+                if result.optimized_size >= result.original_size:
+                    st.info("ℹ️ O arquivo já estava otimizado; o original foi mantido")
+                
+                # Nome do arquivo otimizado
+                original_name = uploaded_file.name
+                optimized_name = original_name.replace('.pdf', '_otimizado.pdf')
+                
+                # Botão de download
+                st.download_button(
+                    label="📥 Baixar PDF Otimizado",
+                    data=result.data,
+                    file_name=optimized_name,
+                    mime="application/pdf",
+                    type="primary"
+                )
+                
             
-            with st.spinner("⚡ Processando arquivo..."):
-                # Comando Ghostscript
-                gs_command = "gswin64c" if os.name == 'nt' else "gs"
+            except subprocess.CalledProcessError as e:
+                st.error(f"❌ Erro ao executar Ghostscript: {e}")
+                st.error("Verifique se o Ghostscript está instalado e disponível no PATH")
                 
-                command = [
-                    gs_command,
-                    "-sDEVICE=pdfwrite",
-                    "-dCompatibilityLevel=1.4",
-                    f"-dPDFSETTINGS={setting}",
-                    "-dNOPAUSE",
-                    "-dQUIET",
-                    "-dBATCH",
-                    "-dPreserveEPSInfo=true",
-                    "-dAutoRotatePages=/None",
-                    f"-sOutputFile={output_path}",
-                    input_path
-                ]
+                # Mostrar detalhes do erro
+                if e.stderr:
+                    with st.expander("🔍 Detalhes do Erro"):
+                        st.code(e.stderr)
+            
+            except FileNotFoundError:
+                st.error("❌ Ghostscript não encontrado")
+                st.error("Instale o Ghostscript ou use o motor \"Em processo (PyMuPDF)\"")
                 
-                # Executar comando
-                try:
-                    if os.name == 'nt':
-                        # Windows
-                        si = subprocess.STARTUPINFO()
-                        si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                        result = subprocess.run(command, check=True, startupinfo=si, 
-                                              capture_output=True, text=True)
-                    else:
-                        # Linux/Mac
-                        result = subprocess.run(command, check=True, capture_output=True, text=True)
-                    
-                    # Verificar se arquivo foi criado
-                    if not os.path.exists(output_path):
-                        st.error("❌ Arquivo otimizado não foi criado")
-                        return
+                with st.expander("📥 Como instalar o Ghostscript"):
+                    st.markdown("""
+                    **Windows:**
+                    1. Baixe o Ghostscript em: https://www.ghostscript.com/download/gsdnld.html
+                    2. Execute o instalador
+                    3. Adicione o diretório bin ao PATH do sistema
                     
-                    # Comparar tamanhos
-                    original_size = len(uploaded_file.getvalue())
-                    optimized_size = os.path.getsize(output_path)
+                    **Linux (Ubuntu/Debian):**
+                    ```bash
+                    sudo apt-get install ghostscript
+                    ```
                     
-                    compression_ratio = ((original_size - optimized_size) / original_size) * 100
+                    **Linux (CentOS/RHEL):**
+                    ```bash
+                    sudo yum install ghostscript
+                    ```
                     
-                    # Mostrar resultados
-                    st.success("✅ PDF otimizado com sucesso!")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("📊 Tamanho Original", f"{original_size / (1024*1024):.2f} MB")
-                    with col2:
-                        st.metric("📉 Tamanho Otimizado", f"{optimized_size / (1024*1024):.2f} MB")
-                    with col3:
-                        st.metric("💾 Compressão", f"{compression_ratio:.1f}%")
-                    
-                    # Ler arquivo otimizado
-                    with open(output_path, 'rb') as f:
-                        optimized_data = f.read()
-                    
-                    # Nome do arquivo otimizado
-                    original_name = uploaded_file.name
-                    optimized_name = original_name.replace('.pdf', '_otimizado.pdf')
-                    
-                    # Botão de download
-                    st.download_button(
-                        label="📥 Baixar PDF Otimizado",
-                        data=optimized_data,
-                        file_name=optimized_name,
-                        mime="application/pdf",
-                        type="primary"
-                    )
-                    
-                
-                except subprocess.CalledProcessError as e:
-                    st.error(f"❌ Erro ao executar Ghostscript: {e}")
-                    st.error("Verifique se o Ghostscript está instalado e disponível no PATH")
-                    
-                    # Mostrar detalhes do erro
-                    if e.stderr:
-                        with st.expander("🔍 Detalhes do Erro"):
-                            st.code(e.stderr)
-                
-                except FileNotFoundError:
-                    st.error("❌ Ghostscript não encontrado")
-                    st.error("Instale o Ghostscript para usar esta funcionalidade")
-                    
-                    with st.expander("📥 Como instalar o Ghostscript"):
-                        st.markdown("""
-                        **Windows:**
-                        1. Baixe o Ghostscript em: https://www.ghostscript.com/download/gsdnld.html
-                        2. Execute o instalador
-                        3. Adicione o diretório bin ao PATH do sistema
-                        
-                        **Linux (Ubuntu/Debian):**
-                        ```bash
-                        sudo apt-get install ghostscript
-                        ```
-                        
-                        **Linux (CentOS/RHEL):**
-                        ```bash
-                        sudo yum install ghostscript
-                        ```
-                        
-                        **macOS:**
-                        ```bash
-                        brew install ghostscript
-                        ```
-                        """)
-                
-    finally:
-        # Limpar arquivos temporários
+                    **macOS:**
+                    ```bash
+                    brew install ghostscript
+                    ```
+                    """)
+            
+            except Exception as e:
+                st.error(f"❌ Erro ao otimizar PDF: {e}")
+
+def optimize_pdf_to_target(uploaded_file, target_mb):
+    """Otimiza o PDF para caber em `target_mb` MB (dividindo se necessário)"""
+    st.markdown("### 🔄 Otimizando PDF...")
+    
+    with st.spinner(f"🎯 Estimando a melhor configuração para {target_mb:.1f} MB..."):
         try:
-            os.unlink(input_path)
-            os.unlink(output_path)
-        except:
-            pass
+            queue_placeholder = st.empty()
+            result = optimize_to_target_size(
+                uploaded_file.getvalue(),
+                target_mb,
+                session_id=get_session_manager().get_session_id(),
+                on_wait=queue_position_notice(queue_placeholder)
+            )
+            queue_placeholder.empty()
+        except Exception as e:
+            st.error(f"❌ Erro ao otimizar PDF: {e}")
+            return
+    
+    st.success(f"✅ PDF otimizado com sucesso! ({result.setting_label}, {result.elapsed:.1f}s)")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("📊 Tamanho Original", f"{result.original_size / (1024*1024):.2f} MB")
+    with col2:
+        st.metric("📉 Tamanho Otimizado", f"{result.optimized_size / (1024*1024):.2f} MB")
+    with col3:
+        st.metric("💾 Compressão", f"{result.compression_ratio:.1f}%")
+    
+    if len(result.estimates) > 1:
+        with st.expander("📐 Estimativas por configuração"):
+            for label, size in result.estimates:
+                fits = "✅" if size <= target_mb * 1024 * 1024 else "❌"
+                st.write(f"{fits} {label}: ~{size / (1024*1024):.2f} MB")
+    
+    base_name = uploaded_file.name.replace('.pdf', '')
+    
+    if not result.parts:
+        st.download_button(
+            label="📥 Baixar PDF Otimizado",
+            data=result.data,
+            file_name=f"{base_name}_otimizado.pdf",
+            mime="application/pdf",
+            type="primary"
+        )
+        return
+    
+    st.warning(f"⚠️ Mesmo na configuração mais forte o arquivo passa de {target_mb:.1f} MB; "
+               f"dividido em {len(result.parts)} partes")
+    
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for i, part in enumerate(result.parts, start=1):
+            zip_file.writestr(f"{base_name}_parte_{i:02d}.pdf", part)
+            st.write(f"📄 Parte {i}: {len(part) / (1024*1024):.2f} MB")
+    
+    st.download_button(
+        label=f"📥 Baixar {len(result.parts)} partes (ZIP)",
+        data=zip_buffer.getvalue(),
+        file_name=f"{base_name}_partes.zip",
+        mime="application/zip",
+        type="primary"
+    )
 
 def check_ghostscript_available():
     """Verifica se o Ghostscript está disponível"""
     try:
-        gs_command = "gswin64c" if os.name == 'nt' else "gs"
-        result = subprocess.run([gs_command, "--version"], 
-                              capture_output=True, text=True)
+        subprocess.run([ghostscript_executable(), "--version"],
+                       capture_output=True, text=True, check=True)
         return True
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
\ No newline at end of file
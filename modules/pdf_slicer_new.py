@@ -5,11 +5,15 @@ import zipfile
 import hashlib
 from core.ui_components import (
     pdf_preview, validate_pdf_structure,
+    analyze_pdf_preview, analyze_pdf_structure,
     status_badge, enhanced_metric
 )
+from core.cache_manager import get_cache_manager
 
-# Cache inteligente para resultados de processamento
-@st.cache_data(ttl=3600, show_spinner=False)  # Cache por 1 hora
+# Cache global limitado por cache_size/cache_ttl das configurações
+cache_manager = get_cache_manager()
+
+@cache_manager.memoize("slicer_processing")
 def process_pdf_cached(pdf_data, filename):
     """Processa PDF com cache baseado no hash do conteúdo"""
     try:
@@ -50,20 +54,19 @@ def process_pdf_cached(pdf_data, filename):
             'error': str(e)
         }
 
-@st.cache_data(ttl=1800, show_spinner=False)  # Cache por 30 min
 def get_pdf_hash(pdf_data):
     """Gera hash do PDF para cache"""
     return hashlib.md5(pdf_data).hexdigest()
 
-@st.cache_data(ttl=3600, show_spinner=False)  # Cache por 1 hora
-def get_pdf_preview_cached(pdf_data, filename):
-    """Preview do PDF com cache"""
-    return pdf_preview(pdf_data, filename)
+@cache_manager.memoize("slicer_preview")
+def get_pdf_preview_cached(pdf_data):
+    """Informações de preview do PDF com cache"""
+    return analyze_pdf_preview(pdf_data)
 
-@st.cache_data(ttl=3600, show_spinner=False)  # Cache por 1 hora
+@cache_manager.memoize("slicer_validation")
 def get_pdf_validation_cached(pdf_data):
     """Validação do PDF com cache"""
-    return validate_pdf_structure(pdf_data)
+    return analyze_pdf_structure(pdf_data)
 
 def pdf_slicer_new_page():
     st.title("✂️ Fatiar PDF")
@@ -150,12 +153,18 @@ def pdf_slicer_new_page():
         # Informações do arquivo e validação em expander (com cache)
         with st.expander("📋 Informações do Arquivo e Validação", expanded=False):
             # Preview do arquivo (cached)
-            preview_info = get_pdf_preview_cached(st.session_state.uploaded_pdf_data, uploaded_file.name)
+            preview_info = pdf_preview(
+                st.session_state.uploaded_pdf_data, uploaded_file.name,
+                get_pdf_preview_cached(st.session_state.uploaded_pdf_data)
+            )
             
             st.markdown("---")
             
             # Validação da estrutura (cached)
-            validation_info = get_pdf_validation_cached(st.session_state.uploaded_pdf_data)
+            validation_info = validate_pdf_structure(
+                st.session_state.uploaded_pdf_data,
+                get_pdf_validation_cached(st.session_state.uploaded_pdf_data)
+            )
         
         #st.markdown("---")
         
@@ -1,10 +1,17 @@
 import streamlit as st
-import PyPDF2
 import fitz  # PyMuPDF
 from io import BytesIO
 import zipfile
 import math
 from core.utils import sanitize_filename
+from core.cache_manager import make_cache_key
+from core.pdf_probe import get_pdf_probe
+from core.pdf_size_planner import split_pdf_to_size
+from core.pdf_split_engine import (
+    write_parts_to_zip, build_pages_document, remove_pages, outline_parts, separator_parts, page_ranges
+)
+from core.pdf_separator_detector import detect_page_ink, find_separator_pages, BLANK_MAX_INK
+from core.session_manager import get_session_manager
 
 def clear_splitter_data():
     """
@@ -13,7 +20,7 @@ def clear_splitter_data():
     # Limpar dados específicos do splitter
     keys_to_clear = [
         'splitter_pdf_data', 'splitter_filename', 'splitter_total_pages',
-        'splitter_file_size_mb', 'splitter_results'
+        'splitter_file_size_mb', 'splitter_results', 'splitter_page_ink'
     ]
     
     for key in keys_to_clear:
@@ -47,9 +54,12 @@ def pdf_splitter_page():
         
         # Obter informações do PDF
         try:
-            pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_data))
-            total_pages = len(pdf_reader.pages)
-            file_size_mb = len(pdf_data) / (1024 * 1024)
+            # Lido uma vez por arquivo e reaproveitado nos reruns
+            probe = get_pdf_probe(pdf_data, with_text_map=False)
+            if probe.error:
+                raise ValueError(probe.error)
+            total_pages = probe.page_count
+            file_size_mb = probe.file_size_mb
             
             # Exibir informações do arquivo
             col1, col2, col3 = st.columns(3)
@@ -63,7 +73,8 @@ def pdf_splitter_page():
             st.markdown("---")
             
             # Tabs para diferentes modos de divisão
-            tab1, tab2, tab3 = st.tabs(["📄 Por Páginas", "✂️ Extrair/Remover", "📦 Por Tamanho"])
+            tab1, tab2, tab3, tab4, tab5 = st.tabs(["📄 Por Páginas", "✂️ Extrair/Remover", "📦 Por Tamanho",
+                                                    "🔖 Por Marcadores", "🧾 Por Separadores"])
             
             with tab1:
                 split_by_pages(pdf_data, total_pages, uploaded_file.name)
@@ -73,6 +84,12 @@ def pdf_splitter_page():
             
             with tab3:
                 split_by_size(pdf_data, total_pages, file_size_mb, uploaded_file.name)
+            
+            with tab4:
+                split_by_outline(pdf_data, total_pages, probe.outline, uploaded_file.name)
+            
+            with tab5:
+                split_by_separators(pdf_data, total_pages, uploaded_file.name)
                 
         except Exception as e:
             st.error(f"❌ Erro ao processar PDF: {str(e)}")
@@ -104,7 +121,17 @@ def pdf_splitter_page():
             📦 **Por Tamanho:**
             - **Limite de tamanho**: Divide quando atingir tamanho máximo
             - **Ideal para email**: Respeita limites de anexo
-            - **Estimativa inteligente**: Calcula número provável de arquivos
+            - **Estimativa inteligente**: Calcula o custo de cada página e grava cada parte uma única vez
+            
+            🔖 **Por Marcadores:**
+            - **Um arquivo por marcador**: Usa o sumário (bookmarks) do próprio PDF
+            - **Nível escolhido**: Divide só nas peças principais ou também nos documentos anexos
+            - **Nomes automáticos**: Cada arquivo recebe o título do marcador
+            
+            🧾 **Por Separadores:**
+            - **Lotes digitalizados**: Separa documentos escaneados juntos
+            - **Detecção automática**: Encontra páginas em branco e folhas com código de barras
+            - **Revisão**: As páginas detectadas podem ser corrigidas antes de dividir
             
             **Recursos especiais:**
             - Interface "for dummies" com exemplos claros
@@ -287,11 +314,22 @@ def extract_remove_pages(pdf_data, total_pages, filename):
                 st.success(f"✅ **Resultado**: PDF final terá {len(pages_to_keep)} páginas")
                 st.info(f"🗑️ **Páginas removidas**: {format_page_list(pages)}")
                 
+                incremental = st.checkbox(
+                    "⚡ Remoção rápida (salvamento incremental)",
+                    value=False,
+                    help="Só grava as alterações no final do arquivo original. Muito mais rápido em PDFs grandes, "
+                         "mas o conteúdo das páginas removidas continua dentro do arquivo e pode ser recuperado. "
+                         "Não use quando as páginas são removidas para não entregar o conteúdo delas."
+                )
+                if incremental:
+                    st.warning("⚠️ Com a remoção rápida, o conteúdo das páginas removidas continua "
+                               "recuperável dentro do PDF baixado.")
+                
                 st.markdown("---")
                 col1, col2 = st.columns(2)
                 with col1:
                     if st.button("🗑️ Remover Páginas", type="primary", use_container_width=True, key="remove_pages"):
-                        extract_specific_pages(pdf_data, pages_to_keep, filename, mode="remove")
+                        remove_specific_pages(pdf_data, pages, filename, len(pages_to_keep), incremental)
                 with col2:
                     if st.button("🔄 Começar Novamente", type="secondary", use_container_width=True, key="restart_remove"):
                         clear_splitter_data()
@@ -360,6 +398,152 @@ def split_by_size(pdf_data, total_pages, file_size_mb, filename):
             st.rerun()
 
 
+def split_by_outline(pdf_data, total_pages, outline, filename):
+    """
+    Dividir PDF pelos marcadores (sumário) do documento
+    """
+    st.markdown("### 🔖 Dividir por Marcadores")
+    st.markdown("💡 **Como funciona**: Gera um arquivo para cada marcador do sumário do PDF")
+    st.markdown("**🎯 Use quando**: O PDF já vem com marcadores (petições, processos exportados do PJe)")
+    
+    if not outline:
+        st.warning("⚠️ Este PDF não possui marcadores. Use a divisão por páginas ou intervalos.")
+        return
+    
+    levels = sorted({level for level, _, _ in outline})
+    if len(levels) > 1:
+        level = st.select_slider(
+            "**Até qual nível de marcador dividir?**",
+            options=levels,
+            value=levels[0],
+            help="Nível 1 = marcadores principais. Níveis maiores também separam os marcadores internos"
+        )
+    else:
+        level = levels[0]
+    
+    base_name = filename.replace('.pdf', '')
+    parts = outline_parts(outline, level, total_pages, base_name)
+    
+    if not parts:
+        st.warning("⚠️ Nenhum marcador deste nível aponta para uma página do documento.")
+        return
+    
+    st.success(f"✅ **Resultado**: Serão gerados {len(parts)} arquivos")
+    
+    with st.expander("📋 Ver detalhes dos arquivos"):
+        for start, end, name in parts:
+            st.write(f"📄 {name}: páginas {start + 1} a {end + 1}")
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("✂️ Dividir PDF", type="primary", use_container_width=True, key="split_by_outline"):
+            split_pdf_by_outline(pdf_data, parts, filename)
+    with col2:
+        if st.button("🔄 Começar Novamente", type="secondary", use_container_width=True, key="restart_outline"):
+            clear_splitter_data()
+            st.rerun()
+
+
+def split_by_separators(pdf_data, total_pages, filename):
+    """
+    Dividir lote digitalizado nas páginas separadoras (em branco ou código de barras)
+    """
+    st.markdown("### 🧾 Dividir por Separadores")
+    st.markdown("💡 **Como funciona**: Encontra as folhas separadoras do lote e divide o PDF nelas")
+    st.markdown("**🎯 Use quando**: Vários documentos foram digitalizados juntos, com folhas em branco "
+                "ou de código de barras entre eles")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        detect_blank = st.checkbox("⬜ Páginas em branco", value=True, key="separator_blank")
+    with col2:
+        detect_barcode = st.checkbox("▮▯ Folhas com código de barras", value=True, key="separator_barcode")
+    
+    blank_tolerance = st.select_slider(
+        "**Tolerância para página em branco:**",
+        options=["Rigorosa", "Normal", "Flexível"],
+        value="Normal",
+        help="Flexível aceita mais sujeira do scanner ou texto do verso aparecendo na folha"
+    )
+    blank_max_ink = {"Rigorosa": BLANK_MAX_INK / 5, "Normal": BLANK_MAX_INK, "Flexível": BLANK_MAX_INK * 4}[blank_tolerance]
+    
+    # Estatísticas calculadas uma vez por arquivo (chave pelo conteúdo: uma versão
+    # editada com o mesmo tamanho não reaproveita a análise); mudar as opções não renderiza de novo
+    file_key = make_cache_key(filename, pdf_data)
+    page_ink = st.session_state.get('splitter_page_ink')
+    
+    if not page_ink or page_ink[0] != file_key:
+        if st.button("🔍 Detectar Separadores", type="primary", use_container_width=True, key="detect_separators"):
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            
+            def update_progress(done, total):
+                progress_bar.progress(done / total)
+                status_text.text(f"🔍 {done} de {total} páginas analisadas")
+            
+            try:
+                infos = detect_page_ink(pdf_data, get_session_manager().get_session_id(), update_progress)
+                st.session_state.splitter_page_ink = (file_key, infos)
+                st.rerun()
+            except Exception as e:
+                st.error(f"❌ Erro ao analisar páginas: {str(e)}")
+            finally:
+                progress_bar.empty()
+                status_text.empty()
+        return
+    
+    separators = find_separator_pages(page_ink[1], detect_blank, detect_barcode, blank_max_ink)
+    if not separators:
+        st.warning("⚠️ Nenhuma página separadora encontrada com estas opções.")
+    else:
+        st.info(f"🧾 **{len(separators)} páginas separadoras encontradas**: {format_page_list(separators)}")
+    
+    separators_input = st.text_input(
+        "**Páginas separadoras (revise se necessário):**",
+        value=compact_page_list(separators),
+        help="Use vírgulas para páginas individuais (1,3,5) e hífen para intervalos (5-10)",
+        key=f"separator_pages_{file_key}_{detect_blank}_{detect_barcode}_{blank_tolerance}"
+    )
+    
+    keep_separators = st.checkbox(
+        "📎 Manter as folhas separadoras",
+        value=False,
+        help="Cada folha separadora fica como primeira página do documento seguinte"
+    )
+    
+    try:
+        separators = parse_page_numbers(separators_input, total_pages) if separators_input.strip() else []
+    except Exception as e:
+        st.error(f"❌ Erro: {str(e)}")
+        return
+    
+    base_name = filename.replace('.pdf', '')
+    parts = separator_parts(separators, total_pages, base_name, keep_separators)
+    
+    if not parts:
+        st.warning("⚠️ Todas as páginas foram marcadas como separadoras.")
+        return
+    
+    st.success(f"✅ **Resultado**: Serão gerados {len(parts)} arquivos")
+    
+    with st.expander("📋 Ver detalhes dos arquivos"):
+        for i, (start, end, _) in enumerate(parts):
+            st.write(f"📄 Arquivo {i+1}: páginas {start + 1} a {end + 1}")
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("✂️ Dividir PDF", type="primary", use_container_width=True, key="split_by_separators"):
+            split_pdf_by_separators(pdf_data, parts, filename)
+    with col2:
+        if st.button("🔄 Começar Novamente", type="secondary", use_container_width=True, key="restart_separators"):
+            clear_splitter_data()
+            st.rerun()
+
+
 # Funções auxiliares de processamento
 
 def split_pdf_by_pages(pdf_data, pages_per_file, filename):
@@ -368,32 +552,18 @@ def split_pdf_by_pages(pdf_data, pages_per_file, filename):
     """
     try:
         with st.spinner("✂️ Dividindo PDF..."):
-            doc = fitz.open(stream=pdf_data, filetype="pdf")
-            total_pages = doc.page_count
+            total_pages = get_pdf_probe(pdf_data, with_text_map=False).page_count
             num_files = math.ceil(total_pages / pages_per_file)
+            base_name = filename.replace('.pdf', '')
             
-            # Criar ZIP para múltiplos arquivos
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                
-                for i in range(num_files):
-                    start_page = i * pages_per_file
-                    end_page = min((i + 1) * pages_per_file, total_pages)
-                    
-                    # Criar novo PDF
-                    new_doc = fitz.open()
-                    for page_num in range(start_page, end_page):
-                        new_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
-                    
-                    # Salvar no ZIP
-                    pdf_bytes = new_doc.tobytes()
-                    base_name = filename.replace('.pdf', '')
-                    part_name = f"{base_name}_parte_{i+1}_pags_{start_page+1}-{end_page}.pdf"
-                    zip_file.writestr(part_name, pdf_bytes)
-                    new_doc.close()
+            parts = []
+            for i in range(num_files):
+                start_page = i * pages_per_file
+                end_page = min((i + 1) * pages_per_file, total_pages)
+                part_name = f"{base_name}_parte_{i+1}_pags_{start_page+1}-{end_page}.pdf"
+                parts.append((start_page, end_page - 1, part_name))
             
-            doc.close()
-            zip_buffer.seek(0)
+            zip_buffer = write_split_zip(pdf_data, parts)
             
             # Download
             st.success(f"✅ PDF dividido em {num_files} partes!")
@@ -415,27 +585,13 @@ def split_pdf_by_intervals(pdf_data, intervals, filename):
     """
     try:
         with st.spinner("✂️ Dividindo PDF por intervalos..."):
-            doc = fitz.open(stream=pdf_data, filetype="pdf")
-            
-            # Criar ZIP
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                
-                for i, (start, end) in enumerate(intervals):
-                    # Criar novo PDF
-                    new_doc = fitz.open()
-                    for page_num in range(start - 1, end):
-                        new_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
-                    
-                    # Salvar no ZIP
-                    pdf_bytes = new_doc.tobytes()
-                    base_name = filename.replace('.pdf', '')
-                    part_name = f"{base_name}_pags_{start}-{end}.pdf"
-                    zip_file.writestr(part_name, pdf_bytes)
-                    new_doc.close()
+            base_name = filename.replace('.pdf', '')
+            parts = [
+                (start - 1, end - 1, f"{base_name}_pags_{start}-{end}.pdf")
+                for start, end in intervals
+            ]
             
-            doc.close()
-            zip_buffer.seek(0)
+            zip_buffer = write_split_zip(pdf_data, parts)
             
             # Download
             st.success(f"✅ PDF dividido em {len(intervals)} partes!")
@@ -451,7 +607,73 @@ def split_pdf_by_intervals(pdf_data, intervals, filename):
         st.error(f"❌ Erro ao dividir PDF: {str(e)}")
 
 
-def extract_specific_pages(pdf_data, page_numbers, filename, mode="extract"):
+def split_pdf_by_outline(pdf_data, parts, filename):
+    """
+    Divide PDF em uma parte por marcador
+    """
+    try:
+        with st.spinner("✂️ Dividindo PDF por marcadores..."):
+            zip_buffer = write_split_zip(pdf_data, parts)
+            
+            # Download
+            st.success(f"✅ PDF dividido em {len(parts)} partes!")
+            st.download_button(
+                label="📥 Baixar Arquivos Divididos (ZIP)",
+                data=zip_buffer.getvalue(),
+                file_name=f"{filename.replace('.pdf', '')}_marcadores.zip",
+                mime="application/zip",
+                type="primary"
+            )
+            
+    except Exception as e:
+        st.error(f"❌ Erro ao dividir PDF: {str(e)}")
+
+
+def split_pdf_by_separators(pdf_data, parts, filename):
+    """
+    Divide lote digitalizado nas páginas separadoras
+    """
+    try:
+        with st.spinner("✂️ Dividindo lote..."):
+            zip_buffer = write_split_zip(pdf_data, parts)
+            
+            # Download
+            st.success(f"✅ Lote dividido em {len(parts)} documentos!")
+            st.download_button(
+                label="📥 Baixar Arquivos Divididos (ZIP)",
+                data=zip_buffer.getvalue(),
+                file_name=f"{filename.replace('.pdf', '')}_separados.zip",
+                mime="application/zip",
+                type="primary"
+            )
+            
+    except Exception as e:
+        st.error(f"❌ Erro ao dividir PDF: {str(e)}")
+
+
+def write_split_zip(pdf_data, parts):
+    """
+    Gera as partes [(início, fim, nome), ...] (0-indexed) em paralelo,
+    gravando cada uma no ZIP assim que fica pronta
+    """
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    def update_progress(done, total):
+        progress_bar.progress(done / total)
+        status_text.text(f"📄 {done} de {total} partes prontas")
+    
+    zip_buffer = BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        write_parts_to_zip(pdf_data, parts, zip_file, get_session_manager().get_session_id(), update_progress)
+    
+    progress_bar.empty()
+    status_text.empty()
+    zip_buffer.seek(0)
+    return zip_buffer
+
+
+def extract_specific_pages(pdf_data, page_numbers, filename):
     """
     Extrai páginas específicas do PDF
     """
@@ -459,27 +681,16 @@ def extract_specific_pages(pdf_data, page_numbers, filename, mode="extract"):
         with st.spinner("📄 Processando páginas..."):
             doc = fitz.open(stream=pdf_data, filetype="pdf")
             
-            # Criar novo PDF
-            new_doc = fitz.open()
-            for page_num in page_numbers:
-                new_doc.insert_pdf(doc, from_page=page_num - 1, to_page=page_num - 1)
-            
-            # Gerar bytes
-            pdf_bytes = new_doc.tobytes()
-            new_doc.close()
+            # Páginas contíguas são copiadas em uma única chamada
+            pdf_bytes = build_pages_document(doc, [page_num - 1 for page_num in page_numbers])
             doc.close()
             
             # Nome do arquivo
             base_name = filename.replace('.pdf', '')
-            if mode == "extract":
-                output_name = f"{base_name}_extraido.pdf"
-                success_msg = f"✅ {len(page_numbers)} páginas extraídas!"
-            else:
-                output_name = f"{base_name}_removido.pdf"
-                success_msg = f"✅ Páginas removidas! PDF resultante tem {len(page_numbers)} páginas."
+            output_name = f"{base_name}_extraido.pdf"
             
             # Download
-            st.success(success_msg)
+            st.success(f"✅ {len(page_numbers)} páginas extraídas!")
             st.download_button(
                 label="📥 Baixar PDF Processado",
                 data=pdf_bytes,
@@ -492,54 +703,71 @@ def extract_specific_pages(pdf_data, page_numbers, filename, mode="extract"):
         st.error(f"❌ Erro ao processar páginas: {str(e)}")
 
 
+def remove_specific_pages(pdf_data, page_numbers, filename, remaining_pages, incremental=False):
+    """
+    Remove páginas do próprio documento (sem recriar as páginas mantidas)
+    """
+    try:
+        with st.spinner("🗑️ Removendo páginas..."):
+            pdf_bytes = remove_pages(pdf_data, [page_num - 1 for page_num in page_numbers], incremental)
+            
+            base_name = filename.replace('.pdf', '')
+            output_name = f"{base_name}_removido.pdf"
+            
+            st.success(f"✅ Páginas removidas! PDF resultante tem {remaining_pages} páginas.")
+            st.download_button(
+                label="📥 Baixar PDF Processado",
+                data=pdf_bytes,
+                file_name=output_name,
+                mime="application/pdf",
+                type="primary"
+            )
+            
+    except Exception as e:
+        st.error(f"❌ Erro ao remover páginas: {str(e)}")
+
+
 def split_pdf_by_size(pdf_data, max_size_mb, filename):
     """
     Divide PDF por tamanho máximo
+    
+    As partes são planejadas a partir do custo estimado de cada página e
+    cada uma é gravada uma única vez (ver core/pdf_size_planner.py).
     """
     try:
         with st.spinner("📦 Dividindo PDF por tamanho..."):
-            doc = fitz.open(stream=pdf_data, filetype="pdf")
-            total_pages = doc.page_count
-            max_size_bytes = max_size_mb * 1024 * 1024
+            max_size_bytes = int(max_size_mb * 1024 * 1024)
+            progress_bar = st.progress(0)
+            
+            def update_progress(done, total):
+                progress_bar.progress(min(done / total, 1.0))
+            
+            parts = split_pdf_to_size(pdf_data, max_size_bytes, update_progress)
+            progress_bar.empty()
             
             # Criar ZIP
             zip_buffer = BytesIO()
             with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                
-                part_num = 1
-                current_doc = fitz.open()
-                current_size = 0
-                start_page = 1
-                
-                for page_num in range(total_pages):
-                    # Adicionar página ao documento atual
-                    current_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
-                    
-                    # Estimar tamanho (aproximado)
-                    temp_bytes = current_doc.tobytes()
-                    current_size = len(temp_bytes)
-                    
-                    # Se excedeu o tamanho ou é a última página
-                    if current_size >= max_size_bytes or page_num == total_pages - 1:
-                        # Salvar parte atual
-                        base_name = filename.replace('.pdf', '')
-                        part_name = f"{base_name}_parte_{part_num}.pdf"
-                        zip_file.writestr(part_name, temp_bytes)
-                        
-                        # Preparar próxima parte
-                        current_doc.close()
-                        current_doc = fitz.open()
-                        part_num += 1
-                        start_page = page_num + 2
-                
-                if current_doc.page_count > 0:
-                    current_doc.close()
+                base_name = filename.replace('.pdf', '')
+                for part_num, (start_page, end_page, part_bytes) in enumerate(parts, start=1):
+                    part_name = f"{base_name}_parte_{part_num}.pdf"
+                    zip_file.writestr(part_name, part_bytes)
             
-            doc.close()
             zip_buffer.seek(0)
             
             # Download
-            st.success(f"✅ PDF dividido em {part_num - 1} partes!")
+            st.success(f"✅ PDF dividido em {len(parts)} partes!")
+            
+            oversized = [(start, end) for start, end, data in parts if len(data) > max_size_bytes]
+            if oversized:
+                pages = ", ".join(f"{start}" for start, _ in oversized)
+                st.warning(f"⚠️ Página(s) {pages} sozinha(s) já passam de {max_size_mb:.2f} MB")
+            
+            with st.expander("📋 Ver detalhes dos arquivos"):
+                for part_num, (start_page, end_page, part_bytes) in enumerate(parts, start=1):
+                    st.write(f"📄 Parte {part_num}: páginas {start_page} a {end_page} "
+                             f"({len(part_bytes) / (1024 * 1024):.2f} MB)")
+            
             st.download_button(
                 label="📥 Baixar Arquivos Divididos (ZIP)",
                 data=zip_buffer.getvalue(),
@@ -614,4 +842,11 @@ def format_page_list(pages):
     if len(pages) <= 10:
         return ', '.join(map(str, pages))
     else:
-        return f"{', '.join(map(str, pages[:5]))}... {', '.join(map(str, pages[-5:]))}"
\ No newline at end of file
+        return f"{', '.join(map(str, pages[:5]))}... {', '.join(map(str, pages[-5:]))}"
+
+
+def compact_page_list(pages):
+    """
+    Lista completa de páginas no formato aceito por parse_page_numbers (1,3,5-10)
+    """
+    return ','.join(f"{start}-{end}" if end > start else str(start) for start, end in page_ranges(pages))
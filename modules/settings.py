@@ -192,8 +192,34 @@ def settings_page():
             "Máximo de threads:",
             min_value=1,
             max_value=16,
-            value=4,
-            help="Número máximo de threads para processamento paralelo"
+            value=current_settings.get("max_threads", 4),
+            help="Total de slots de CPU compartilhados por todos os usuários (OCR, otimização)"
+        )
+        
+        job_nice_level = st.slider(
+            "Prioridade dos processos externos (nice):",
+            min_value=0,
+            max_value=19,
+            value=current_settings.get("job_nice_level", 10),
+            help="0 = prioridade normal, 19 = menor prioridade (Linux/Mac)"
+        )
+        
+        job_memory_limit = st.number_input(
+            "Limite de memória por processo (MB):",
+            min_value=0,
+            max_value=65536,
+            value=current_settings.get("job_memory_limit", 0),
+            step=256,
+            help="Limite de espaço de endereçamento para OCRmyPDF/Ghostscript (via prlimit). "
+                 "0 = sem limite (Linux)"
+        )
+        
+        # Estado atual da fila global
+        from core.job_scheduler import get_job_scheduler
+        queue_stats = get_job_scheduler().get_stats()
+        st.caption(
+            f"Fila: {queue_stats['slots_in_use']}/{queue_stats['capacity']} slots em uso, "
+            f"{queue_stats['waiting_jobs']} job(s) aguardando"
         )
         
         chunk_size = st.slider(
@@ -208,7 +234,7 @@ def settings_page():
         st.markdown("### 💾 Cache")
         enable_cache = st.checkbox(
             "Habilitar cache",
-            value=True,
+            value=current_settings.get("enable_cache", True),
             help="Armazena resultados para acelerar processamentos futuros"
         )
         
@@ -217,9 +243,46 @@ def settings_page():
                 "Tamanho do cache (MB):",
                 min_value=10,
                 max_value=1000,
-                value=100,
-                help="Tamanho máximo do cache em disco"
+                value=max(10, current_settings.get("cache_size", 100)),
+                help="Memória máxima do cache; os itens menos usados são removidos ao atingir o limite"
             )
+            
+            cache_ttl = st.slider(
+                "Validade do cache (minutos):",
+                min_value=1,
+                max_value=1440,
+                value=max(1, current_settings.get("cache_ttl", 3600) // 60),
+                help="Tempo até um item do cache expirar"
+            )
+            
+            ocr_cache_size = st.slider(
+                "Cache de OCR em disco (MB):",
+                min_value=0,
+                max_value=5000,
+                value=current_settings.get("ocr_cache_size", 500),
+                step=50,
+                help="Espaço em disco para PDFs já processados pelo OCR; o mesmo arquivo não passa pelo OCR duas vezes"
+            )
+        
+        # Estatísticas do cache global
+        from core.cache_manager import get_cache_manager
+        cache_stats = get_cache_manager().get_stats()
+        st.caption(
+            f"Cache: {cache_stats['size_mb']:.1f}/{cache_stats['max_size_mb']:.0f} MB, "
+            f"{cache_stats['entries']} itens, "
+            f"{cache_stats['hits']} hits / {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%}), {cache_stats['evictions']} removidos por espaço, "
+            f"{cache_stats['expirations']} expirados"
+        )
+        
+        from core.ocr_cache import get_ocr_cache
+        ocr_cache_stats = get_ocr_cache().get_stats()
+        st.caption(
+            f"Cache de OCR: {ocr_cache_stats['size_mb']:.1f}/{ocr_cache_stats['max_size_mb']:.0f} MB, "
+            f"{ocr_cache_stats['entries']} arquivos, "
+            f"{ocr_cache_stats['hits']} hits / {ocr_cache_stats['misses']} misses, "
+            f"{ocr_cache_stats['coalesced']} execuções agrupadas"
+        )
     
     st.markdown("---")
     
@@ -272,9 +335,13 @@ def settings_page():
                 "compress_output": compress_output,
                 "show_advanced_options": show_advanced,
                 "max_threads": max_threads,
+                "job_nice_level": job_nice_level,
+                "job_memory_limit": int(job_memory_limit),
                 "chunk_size": chunk_size,
                 "enable_cache": enable_cache,
                 "cache_size": cache_size if enable_cache else 0,
+                "cache_ttl": cache_ttl * 60 if enable_cache else current_settings.get("cache_ttl", 3600),
+                "ocr_cache_size": ocr_cache_size if enable_cache else current_settings.get("ocr_cache_size", 500),
                 "log_level": log_level,
                 "log_to_file": log_to_file,
                 "debug_mode": debug_mode
@@ -381,6 +448,14 @@ def save_settings(settings_manager, new_settings):
         for key, value in new_settings.items():
             settings_manager.set(key, value)
         
+        # Aplicar novos limites à fila global de processamento e ao cache
+        from core.job_scheduler import get_job_scheduler
+        from core.cache_manager import get_cache_manager
+        from core.ocr_cache import get_ocr_cache
+        get_job_scheduler().reload_settings()
+        get_cache_manager().reload_settings()
+        get_ocr_cache().reload_settings()
+        
         st.success("✅ Configurações salvas com sucesso!")
         
         # Recarregar página para aplicar mudanças
@@ -393,6 +468,14 @@ def restore_defaults(settings_manager):
     """Restaura configurações padrão"""
     try:
         settings_manager.reset_to_defaults()
+        
+        from core.job_scheduler import get_job_scheduler
+        from core.cache_manager import get_cache_manager
+        from core.ocr_cache import get_ocr_cache
+        get_job_scheduler().reload_settings()
+        get_cache_manager().reload_settings()
+        get_ocr_cache().reload_settings()
+        
         st.success("✅ Configurações restauradas para os padrões!")
         st.rerun()
         
@@ -408,6 +491,15 @@ def clear_cache():
         
         cleared_files = 0
         
+        # Limpar cache em memória
+        from core.cache_manager import get_cache_manager
+        cleared_entries = get_cache_manager().get_stats()['entries']
+        get_cache_manager().clear()
+        
+        # Limpar cache de OCR em disco
+        from core.ocr_cache import get_ocr_cache
+        cleared_files += get_ocr_cache().clear()
+        
         # Limpar arquivos temporários
         if os.path.exists(temp_dir):
             for root, dirs, files in os.walk(temp_dir):
@@ -443,7 +535,7 @@ def clear_cache():
                         except:
                             pass
         
-        st.success(f"✅ Cache e arquivos antigos limpos! {cleared_files} arquivos removidos.")
+        st.success(f"✅ Cache e arquivos antigos limpos! {cleared_entries} itens de cache e {cleared_files} arquivos removidos.")
         
     except Exception as e:
         st.error(f"❌ Erro ao limpar cache: {e}")
@@ -0,0 +1,52 @@
+# tests/test_pdf_merge_engine.py
+
+import fitz  # PyMuPDF
+
+from core.pdf_merge_engine import merge_pdf_bytes, merge_pdf_files
+
+
+def _pdf_with_outline(page_count, toc, dangling_titles=()):
+    """PDF com marcadores; os títulos em `dangling_titles` ficam sem destino"""
+    doc = fitz.open()
+    for _ in range(page_count):
+        doc.new_page()
+    doc.set_toc(toc)
+    for xref in range(1, doc.xref_length()):
+        obj = doc.xref_object(xref)
+        if any(f"({title})" in obj for title in dangling_titles):
+            doc.xref_set_key(xref, "Dest", "null")
+            doc.xref_set_key(xref, "A", "null")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _toc(data):
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return doc.get_toc()
+
+
+def test_dangling_parent_bookmark_does_not_abort_merge():
+    dangling = _pdf_with_outline(4, [[1, "Parent", 1], [2, "Child", 2], [3, "Grandchild", 3], [1, "Other", 4]],
+                                 dangling_titles=["Parent"])
+    plain = _pdf_with_outline(2, [])
+
+    result = merge_pdf_bytes([("a.pdf", dangling), ("b.pdf", plain)], add_bookmarks=False, deduplicate=False)
+
+    assert result.errors == []
+    assert result.total_pages == 6
+    assert _toc(result.data) == [[1, "Child", 2], [2, "Grandchild", 3], [1, "Other", 4]]
+
+
+def test_outline_starting_below_level_one_is_renumbered(tmp_path):
+    source = _pdf_with_outline(3, [[1, "X", 1], [2, "Y", 2]], dangling_titles=["X"])
+
+    result = merge_pdf_bytes([("c.pdf", source)], add_bookmarks=True, deduplicate=False)
+    assert _toc(result.data) == [[1, "c", 1], [2, "Y", 2]]
+
+    path = tmp_path / "c.pdf"
+    path.write_bytes(source)
+    result = merge_pdf_files([("c.pdf", str(path))], str(tmp_path / "out.pdf"),
+                             add_bookmarks=False, deduplicate=False)
+    with fitz.open(result.output_path) as doc:
+        assert doc.get_toc() == [[1, "Y", 2]]